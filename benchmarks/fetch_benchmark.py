@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark sequential vs concurrent statement fetching against the local FMP stand-in
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Allow running from the benchmarks directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from src.financial_data_fetcher import FinancialDataFetcher
+from tools.fmp_standin import FMPStandIn
+
+def run_benchmark(tickers, concurrency: int) -> float:
+    """Fetch all statements for the tickers and return the elapsed time in seconds"""
+    Config.FETCH_CONCURRENCY = concurrency
+    fetcher = FinancialDataFetcher()
+    
+    start = time.perf_counter()
+    results = fetcher.process_tickers(tickers)
+    elapsed = time.perf_counter() - start
+    
+    fetched = sum(len(paths) for paths in results.values())
+    transfer = fetcher.get_transfer_stats()
+    print(f"concurrency={concurrency:<3} statements={fetched:<5} time={elapsed:.2f}s "
+          f"requests={transfer['requests']} wire={transfer['bytes_on_wire']}B "
+          f"decoded={transfer['bytes_decoded']}B")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the concurrent fetch engine')
+    parser.add_argument('--tickers', type=int, default=50, help='Number of synthetic tickers')
+    parser.add_argument('--latency', type=float, default=0.05, help='Stand-in server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of HTTP 429 responses')
+    parser.add_argument('--fixtures', type=Path, help='Serve recorded responses from this directory')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for error injection')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent fetch limit')
+    args = parser.parse_args()
+    
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    server = FMPStandIn(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=0,
+        fixtures_dir=args.fixtures,
+        seed=args.seed
+    ).start()
+    
+    Config.FINANCIAL_MODELING_PREP_BASE_URL = server.base_url
+    Config.FINANCIAL_MODELING_PREP_API_KEY = 'benchmark'
+    
+    # Measure the fetch engine itself, not the provider rate limit
+    Config.API_REQUESTS_PER_SECOND = None
+    Config.API_REQUESTS_PER_MINUTE = None
+    Config.CACHE_ENABLED = False
+    Config.ARCHIVE_ENABLED = False
+    Config.RETRY_DELAY = 0.01
+    
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        Config.OUTPUT_DIR = Path(output_dir)
+        sequential = run_benchmark(tickers, 1)
+        concurrent = run_benchmark(tickers, args.concurrency)
+    
+    server.stop()
+    print(f"server: {server.stats}")
+    print(f"speedup: {sequential / concurrent:.1f}x")
+
+if __name__ == "__main__":
+    main()
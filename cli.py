@@ -6,8 +6,10 @@ Command Line Interface for EquityExplorer
 import argparse
 import sys
 import logging
+from pathlib import Path
 from typing import List
 from src.equity_explorer import EquityExplorer
+from src.raw_archive import RawArchive
 from config import Config
 
 def setup_logging(verbose: bool = False):
@@ -68,6 +70,160 @@ def process_multiple_tickers(tickers: List[str], verbose: bool = False):
         logger.error(f"Error processing tickers: {e}")
         return False
 
+def process_bulk_tickers(tickers: List[str], years: List[int], period: str,
+                         source_files: List[str], verbose: bool = False):
+    """Process multiple tickers from bulk statement files"""
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        # Pre-downloaded files are given as statement_type=path
+        sources = {}
+        for source in source_files or []:
+            statement_type, _, path = source.partition('=')
+            sources.setdefault(statement_type, []).append(Path(path))
+        
+        tickers = tickers or Config.DEFAULT_STOCKS
+        explorer = EquityExplorer()
+        results = explorer.process_bulk_tickers(tickers, years, period, sources)
+        
+        success_count = len([r for r in results.values() if r])
+        logger.info(f"Successfully processed {success_count}/{len(tickers)} tickers")
+        return success_count == len(tickers)
+        
+    except Exception as e:
+        logger.error(f"Error processing bulk tickers: {e}")
+        return False
+
+def compute_ratios(tickers: List[str], verbose: bool = False):
+    """Compute the ratio table from the statement store"""
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        explorer = EquityExplorer()
+        ratios_file = explorer.compute_ratios(tickers or None)
+        
+        if ratios_file:
+            logger.info(f"Ratio table written to {ratios_file}")
+            return True
+        return False
+        
+    except Exception as e:
+        logger.error(f"Error computing ratios: {e}")
+        return False
+
+def run_valuations(tickers: List[str], draws: int = None, verbose: bool = False):
+    """Run the Monte Carlo DCF valuation from the statement store"""
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        if draws:
+            Config.VALUATION_DRAWS = draws
+        
+        explorer = EquityExplorer()
+        valuation_file = explorer.run_valuations(tickers or None)
+        
+        if valuation_file:
+            logger.info(f"Valuations written to {valuation_file}")
+            return True
+        return False
+        
+    except Exception as e:
+        logger.error(f"Error running valuations: {e}")
+        return False
+
+def load_warehouse(force: bool = False, verbose: bool = False):
+    """Load every processed statement file in the output directory into the warehouse"""
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        Config.WAREHOUSE_ENABLED = True
+        explorer = EquityExplorer()
+        values = explorer.warehouse.load_directory(force=force)
+        
+        stats = explorer.warehouse.get_stats()
+        logger.info(f"Loaded {values} values; warehouse holds {stats['statements']} statements "
+                    f"for {stats['tickers']} tickers")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error loading warehouse: {e}")
+        return False
+
+def query_warehouse(ticker: str, statement: str, line_item: str = None, period: str = None,
+                    verbose: bool = False):
+    """Print a statement, or a single value, from the warehouse"""
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        Config.WAREHOUSE_ENABLED = True
+        explorer = EquityExplorer()
+        
+        if line_item and period:
+            print(explorer.warehouse.lookup(ticker.upper(), statement, line_item, period))
+        elif line_item:
+            history = explorer.warehouse.history(ticker.upper(), statement, [line_item])
+            print(history.to_string(index=False) if not history.empty else "No data")
+        else:
+            table = explorer.warehouse.statement(ticker.upper(), statement)
+            print(table.to_string() if not table.empty else "No data")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error querying warehouse: {e}")
+        return False
+
+def list_archive_runs(verbose: bool = False):
+    """List the runs held in the raw archive"""
+    setup_logging(verbose)
+    
+    archive = RawArchive()
+    for run_id in archive.runs():
+        manifest = archive.load_manifest(run_id)
+        print(f"{run_id}  {len(manifest['entries'])} statements  "
+              f"{manifest['stats']['stored']} new objects")
+    
+    stats = archive.get_stats()
+    print(f"{stats['runs']} runs, {stats['objects']} objects, {stats['bytes']} bytes")
+    return True
+
+def restore_archive_run(run_id: str, destination: str = None, verbose: bool = False):
+    """Rebuild the raw statement files of an archived run"""
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        destination = Path(destination) if destination else Config.OUTPUT_DIR / 'restored' / run_id
+        restored = RawArchive().restore(run_id, destination)
+        logger.info(f"Restored {len(restored)} tickers to {destination}")
+        return True
+        
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Error restoring run {run_id}: {e}")
+        return False
+
+def screen_tickers(conditions: List[str], sort_by: str = None, limit: int = None,
+                   verbose: bool = False):
+    """Screen the universe on the latest ratio values"""
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        explorer = EquityExplorer()
+        results = explorer.screen(conditions, sort_by, limit)
+        
+        print(results.to_string(index=False) if not results.empty else "No tickers match")
+        logger.info(f"{len(results)} tickers match")
+        return True
+        
+    except (ValueError, KeyError, RuntimeError) as e:
+        logger.error(f"Screen failed: {e}")
+        return False
+
 def run_full_analysis(verbose: bool = False):
     """Run full analysis with default stocks"""
     setup_logging(verbose)
@@ -105,11 +261,41 @@ Examples:
   
   # Verbose output
   python cli.py --verbose ticker AAPL
+  
+  # Download statements for up to 16 tickers at once
+  python cli.py --concurrency 16 tickers AAPL MSFT GOOGL
+  
+  # Use bulk statement files for 2023 instead of per-ticker requests
+  python cli.py bulk --year 2023 AAPL MSFT GOOGL
+  
+  # Recompute the ratio table from the stored statements
+  python cli.py ratios
+  
+  # Value every stored ticker with 50,000 DCF scenarios each
+  python cli.py value --draws 50000
+  
+  # Load the processed files into the SQLite warehouse and query it
+  python cli.py load-warehouse
+  python cli.py query AAPL income_statement --item revenue --period 2023-09-30
+  
+  # List archived runs and rebuild the raw files of one of them
+  python cli.py archive list
+  python cli.py archive restore 20240102T060000Z-1a2b3c --to backtest/
+  
+  # Screen the latest fiscal year
+  python cli.py screen "net_margin > 20%" "debt_to_equity < 0.5" --sort-by roe
+  
+  # Transform the CSV files on one worker process per core
+  python cli.py --csv-workers 0 bulk --year 2023
         """
     )
     
     parser.add_argument('--verbose', '-v', action='store_true', 
                        help='Enable verbose logging')
+    parser.add_argument('--concurrency', type=int, 
+                       help='Maximum concurrent statement downloads (default: Config.FETCH_CONCURRENCY)')
+    parser.add_argument('--csv-workers', type=int, metavar='N',
+                       help='Transform CSV files on N worker processes (0 = one per core)')
     
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
@@ -124,12 +310,62 @@ Examples:
     # Full analysis command
     full_parser = subparsers.add_parser('full', help='Run full analysis with default stocks')
     
+    # Bulk command
+    bulk_parser = subparsers.add_parser('bulk', help='Process tickers from bulk statement files')
+    bulk_parser.add_argument('symbols', nargs='*', help='Stock ticker symbols (default: configured stocks)')
+    bulk_parser.add_argument('--year', type=int, action='append', required=True,
+                            help='Fiscal year to fetch (repeat for several years)')
+    bulk_parser.add_argument('--period', choices=['annual', 'quarter'], default='annual',
+                            help='Statement period')
+    bulk_parser.add_argument('--from-file', action='append', metavar='STATEMENT=PATH',
+                            help='Use a pre-downloaded bulk file, e.g. income_statement=income.csv')
+    
+    # Ratios command
+    ratios_parser = subparsers.add_parser('ratios', help='Compute financial ratios from the statement store')
+    ratios_parser.add_argument('symbols', nargs='*', help='Stock ticker symbols (default: every stored ticker)')
+    
+    # Valuation command
+    value_parser = subparsers.add_parser('value', help='Run Monte Carlo DCF valuations from the statement store')
+    value_parser.add_argument('symbols', nargs='*', help='Stock ticker symbols (default: every stored ticker)')
+    value_parser.add_argument('--draws', type=int, help='Scenarios sampled per ticker')
+    
+    # Warehouse commands
+    load_parser = subparsers.add_parser('load-warehouse', help='Load the processed statement files into the SQLite warehouse')
+    load_parser.add_argument('--force', action='store_true', help='Reload files that have not changed')
+    
+    query_parser = subparsers.add_parser('query', help='Query a statement from the SQLite warehouse')
+    query_parser.add_argument('symbol', help='Stock ticker symbol')
+    query_parser.add_argument('statement', choices=['income_statement', 'balance_sheet', 'cash_flow'],
+                              help='Statement type')
+    query_parser.add_argument('--item', help='Line item (e.g. revenue)')
+    query_parser.add_argument('--period', help='Period (e.g. 2023-09-30); requires --item')
+    
+    # Archive command
+    archive_parser = subparsers.add_parser('archive', help='List or restore runs from the raw archive')
+    archive_parser.add_argument('action', choices=['list', 'restore'], help='Action to perform')
+    archive_parser.add_argument('run_id', nargs='?', help='Run to restore')
+    archive_parser.add_argument('--to', dest='destination',
+                                help='Directory for the restored files (default: output/restored/<run id>)')
+    
+    # Screen command
+    screen_parser = subparsers.add_parser('screen', help='Screen tickers on their latest ratios')
+    screen_parser.add_argument('conditions', nargs='*',
+                              help='Conditions that must all hold, e.g. "roe >= 15%%" or "current_ratio between 1 and 3"')
+    screen_parser.add_argument('--sort-by', help='Ratio to order the results by (descending)')
+    screen_parser.add_argument('--limit', type=int, help='Maximum number of results')
+    
     args = parser.parse_args()
     
     if not args.command:
         parser.print_help()
         sys.exit(1)
     
+    if args.concurrency:
+        Config.FETCH_CONCURRENCY = args.concurrency
+    if args.csv_workers is not None:
+        Config.PARALLEL_CSV = True
+        Config.CSV_WORKERS = args.csv_workers or None
+    
     try:
         success = False
         
@@ -139,6 +375,26 @@ Examples:
             success = process_multiple_tickers(args.symbols, args.verbose)
         elif args.command == 'full':
             success = run_full_analysis(args.verbose)
+        elif args.command == 'bulk':
+            success = process_bulk_tickers(args.symbols, args.year, args.period,
+                                           args.from_file, args.verbose)
+        elif args.command == 'ratios':
+            success = compute_ratios(args.symbols, args.verbose)
+        elif args.command == 'value':
+            success = run_valuations(args.symbols, args.draws, args.verbose)
+        elif args.command == 'load-warehouse':
+            success = load_warehouse(args.force, args.verbose)
+        elif args.command == 'query':
+            success = query_warehouse(args.symbol, args.statement, args.item, args.period, args.verbose)
+        elif args.command == 'archive':
+            if args.action == 'restore':
+                if not args.run_id:
+                    parser.error('archive restore requires a run id')
+                success = restore_archive_run(args.run_id, args.destination, args.verbose)
+            else:
+                success = list_archive_runs(args.verbose)
+        elif args.command == 'screen':
+            success = screen_tickers(args.conditions, args.sort_by, args.limit, args.verbose)
         
         sys.exit(0 if success else 1)
         
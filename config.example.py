@@ -1,4 +1,5 @@
 # Example configuration file - copy this to config.py and fill in your values
+# Settings missing from an existing config.py take the defaults in src/config_defaults.py
 import os
 from pathlib import Path
 
@@ -8,11 +9,13 @@ class Config:
     # API Configuration
     FINANCIAL_MODELING_PREP_API_KEY = 'your_api_key_here'  # Get from https://financialmodelingprep.com/
     FINANCIAL_MODELING_PREP_BASE_URL = 'https://financialmodelingprep.com/api/v3'
+    FINANCIAL_MODELING_PREP_BULK_URL = 'https://financialmodelingprep.com/api/v4'
     
     # Anaplan Configuration
     ANAPLAN_SERVICE_URL = 'https://api.anaplan.com'
     ANAPLAN_AUTH_URL = 'https://auth.anaplan.com'
     ANAPLAN_USER = 'your_username'
+    ANAPLAN_PASSWORD = os.environ.get('ANAPLAN_PASSWORD', '')  # needed for REST uploads
     ANAPLAN_WORKSPACE_ID = 'your_workspace_id'
     ANAPLAN_MODEL_ID = 'your_model_id'
     
@@ -20,6 +23,7 @@ class Config:
     BASE_DIR = Path(__file__).parent
     OUTPUT_DIR = BASE_DIR / 'output'
     TEMPLATE_DIR = BASE_DIR / 'templates'
+    BULK_DIR = OUTPUT_DIR / 'bulk'
     
     # Batch Script Templates
     BATCH_SCRIPTS = {
@@ -44,10 +48,143 @@ class Config:
     
     # Retry Configuration
     MAX_RETRIES = 3
-    RETRY_DELAY = 2  # seconds
+    RETRY_DELAY = 2  # seconds, doubled on each attempt
+    RETRY_MAX_DELAY = 60  # seconds, also caps Retry-After
+    RETRY_JITTER = 0.5  # fraction of each delay that is randomized
+    
+    # Circuit Breaker (per API host)
+    CIRCUIT_FAILURE_THRESHOLD = 0.5  # error rate that stops further requests
+    CIRCUIT_WINDOW_SIZE = 20  # recent requests the error rate is measured over
+    CIRCUIT_MIN_REQUESTS = 10
+    CIRCUIT_RESET_TIMEOUT = 60  # seconds before a trial request is let through
+    
+    # Rate Limiting (match your Financial Modeling Prep plan)
+    API_REQUESTS_PER_SECOND = 10
+    API_REQUESTS_PER_MINUTE = 300
+    ANAPLAN_REQUESTS_PER_MINUTE = 60  # batch script launches against the Anaplan API
+    
+    # Anaplan Uploads
+    ANAPLAN_UPLOAD_METHOD = 'batch'  # 'batch' launches Anaplan Connect per file; 'rest' (opt-in) uploads in-process
+    ANAPLAN_BATCH_FALLBACK = True  # retry a failed REST upload through its batch script
+    ANAPLAN_TASK_TIMEOUT = 600  # seconds to wait for an import process
+    ANAPLAN_TASK_POLL_INTERVAL = 2  # seconds between process status checks
+    
+    # Consolidated Uploads (one ticker-keyed file per statement type, so each process runs once
+    # per batch; the Anaplan imports must read the long Ticker/Line/Line Item/Period/Value layout)
+    CONSOLIDATED_UPLOADS = False
+    CONSOLIDATED_UPLOAD_NAME = 'ALL'  # stands in for the ticker in the combined file names
+    
+    # Upload Jobs (each upload runs its own copy of the batch script template)
+    UPLOAD_WORKERS = 4  # uploads running at once
+    UPLOAD_JOB_DIR = OUTPUT_DIR / 'jobs'  # rendered job scripts; failed jobs are kept here
+    JOB_TIMEOUT = 1800  # seconds before a hung script is killed; 0 waits forever
+    JOB_MAX_CONCURRENT = None  # scripts running at once; None matches UPLOAD_WORKERS
+    KEEP_JOB_LOGS = False  # also keep the output logs of successful jobs
+    
+    # Response Cache
+    CACHE_ENABLED = False
+    CACHE_DIR = BASE_DIR / 'cache'
+    CACHE_TTL = 24 * 60 * 60  # seconds before a cached statement is revalidated
+    CACHE_MAX_BYTES = 500 * 1024 * 1024
+    
+    # Raw Archive (every fetched statement kept once under its content hash, one manifest per run)
+    ARCHIVE_ENABLED = False
+    ARCHIVE_DIR = BASE_DIR / 'archive'
+    ARCHIVE_COMPRESSION_LEVEL = 6  # gzip level for new objects
+    
+    # Concurrent Fetching
+    FETCH_CONCURRENCY = 8  # maximum statement downloads in flight at once
+    
+    # Parallel CSV Processing
+    PARALLEL_CSV = False  # transform statement files on a process pool
+    CSV_WORKERS = None  # worker processes; None uses every available core
+    CSV_CHUNKSIZE = None  # files per task sent to a worker; None splits evenly
+    
+    # HTTP Transport
+    HTTP_POOL_SIZE = None  # connections kept per host; None matches FETCH_CONCURRENCY
+    CONNECT_TIMEOUT = 5  # seconds
+    READ_TIMEOUT = 30  # seconds
+    HTTP_COMPRESSION = True  # ask for gzip/deflate encoded responses
+    HTTP_KEEPALIVE_STATS = False  # report connection reuse with the transfer stats
+    
+    # Downloads
+    STREAM_DOWNLOADS = False  # write statements to disk in chunks instead of buffering them
+    PERSIST_RAW_STATEMENTS = True  # False hands responses to the CSV processor in memory (incremental fetching always persists)
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes
+    ERROR_SNIFF_BYTES = 4096  # leading bytes checked for API error messages
+    
+    # Incremental Fetching (only request the latest periods and merge new ones)
+    INCREMENTAL_FETCH = False
+    INCREMENTAL_PERIODS = 2  # most recent periods requested per statement
+    STATEMENT_PERIOD = 'annual'  # 'annual' or 'quarter'; must match the files on disk
+    
+    # Bulk Downloads (one whole-universe file per statement type and year)
+    BULK_ENDPOINTS = {
+        'income_statement': 'income-statement-bulk',
+        'cash_flow': 'cash-flow-statement-bulk',
+        'balance_sheet': 'balance-sheet-statement-bulk'
+    }
+    BULK_MAX_OPEN_FILES = 256  # per-ticker files kept open while splitting
+    
+    # Skip Unchanged (statements whose raw payload hash matches the last processed one are not reprocessed or uploaded)
+    SKIP_UNCHANGED = False
+    PIPELINE_STATE_FILE = OUTPUT_DIR / 'pipeline_state.json'
+    
+    # Delta Uploads (only the period columns changed since the last successful upload are sent;
+    # the Anaplan imports must map the period columns by header, not by position)
+    DELTA_UPLOADS = False
+    UPLOAD_SNAPSHOT_DIR = OUTPUT_DIR / 'uploaded'
+    
+    # Statement Store (long-format Parquet copy of every fetched statement)
+    STORE_ENABLED = False
+    STORE_DIR = OUTPUT_DIR / 'store'
+    STORE_COMPACT_PARTS = 64  # part files per statement before they are merged
+    
+    # Financial Ratios (expressions over line item names, evaluated per ticker and period)
+    RATIOS = {
+        'gross_margin': 'grossProfit / revenue',
+        'operating_margin': 'operatingIncome / revenue',
+        'net_margin': 'netIncome / revenue',
+        'roe': 'netIncome / totalStockholdersEquity',
+        'roa': 'netIncome / totalAssets',
+        'roic': 'operatingIncome * (1 - incomeTaxExpense / incomeBeforeTax) / (totalDebt + totalStockholdersEquity - cashAndCashEquivalents)',
+        'debt_to_equity': 'totalDebt / totalStockholdersEquity',
+        'net_debt_to_equity': 'netDebt / totalStockholdersEquity',
+        'current_ratio': 'totalCurrentAssets / totalCurrentLiabilities',
+        'fcf_margin': 'freeCashFlow / revenue',
+        'fcf_conversion': 'freeCashFlow / netIncome',
+        'capex_to_revenue': '-capitalExpenditure / revenue'
+    }
+    RATIOS_FILE = OUTPUT_DIR / 'ratios.csv'
+    SCREEN_INDEX_FILE = OUTPUT_DIR / 'screen_index.npz'
+    
+    # SQLite Warehouse (indexed copy of the processed statement files)
+    WAREHOUSE_ENABLED = False
+    WAREHOUSE_PATH = OUTPUT_DIR / 'warehouse.db'
+    
+    # DCF Valuation (Monte Carlo over growth, FCF margin and discount rate)
+    VALUATION_ENABLED = False  # run after each batch of tickers
+    VALUATION_DRAWS = 20000  # scenarios per ticker
+    VALUATION_HORIZON = 5  # forecast years before the terminal value
+    VALUATION_CHUNK_TICKERS = 64  # tickers sampled at once; bounds memory to about chunk x draws x 80 bytes
+    VALUATION_SEED = None
+    VALUATION_ASSUMPTIONS = {
+        'growth': 0.05,  # revenue growth when there is no history to derive it from
+        'growth_sd': 0.05,
+        'growth_min': -0.30,
+        'growth_max': 0.40,
+        'fcf_margin': 0.10,  # FCF margin when free cash flow is not reported
+        'fcf_margin_sd': 0.03,
+        'discount_rate': 0.09,
+        'discount_rate_sd': 0.015,
+        'terminal_growth': 0.025,
+        'min_spread': 0.01  # minimum discount rate above terminal growth
+    }
+    VALUATION_PERCENTILES = [5, 25, 50, 75, 95]
+    VALUATION_FILE = OUTPUT_DIR / 'valuations.csv'
     
     # File Processing
-    CHUNK_SIZE = 1
+    CHUNK_SIZE = 1  # Anaplan upload chunk size in MB
     
     @classmethod
     def create_directories(cls):
@@ -77,6 +77,9 @@ def get_status():
             'explorer_ready': True,
             'output_directory': str(output_dir),
             'latest_files': latest_files,
+            'cache': explorer.data_fetcher.get_cache_stats(),
+            'transfer': explorer.data_fetcher.get_transfer_stats(),
+            'warehouse': explorer.warehouse.get_stats() if explorer.warehouse else None,
             'config_ready': True
         })
         
@@ -132,6 +135,7 @@ def process_ticker():
                 'results': {
                     'ticker': ticker,
                     'statements': list(results.keys()),
+                    'unchanged': explorer.unchanged.get(ticker, []),
                     'files': {k: str(v) for k, v in results.items()}
                 }
             })
@@ -172,6 +176,7 @@ def process_tickers():
         results = explorer.process_multiple_tickers(tickers)
         
         success_count = len([r for r in results.values() if r])
+        unchanged_count = sum(len(explorer.unchanged.get(ticker, [])) for ticker, result in results.items() if result)
         
         return jsonify({
             'status': 'success',
@@ -180,10 +185,12 @@ def process_tickers():
                 'total': len(tickers),
                 'successful': success_count,
                 'failed': len(tickers) - success_count,
+                'unchanged_statements': unchanged_count,
                 'details': {
                     ticker: {
                         'success': bool(result),
-                        'statements': list(result.keys()) if result else []
+                        'statements': list(result.keys()) if result else [],
+                        'unchanged': explorer.unchanged.get(ticker, []) if result else []
                     }
                     for ticker, result in results.items()
                 }
@@ -197,6 +204,93 @@ def process_tickers():
             'message': str(e)
         })
 
+@app.route('/api/screen', methods=['GET', 'POST'])
+def screen():
+    """Screen tickers on their latest ratio values"""
+    try:
+        if request.method == 'POST':
+            data = request.get_json() or {}
+            conditions = data.get('conditions', [])
+            sort_by = data.get('sort_by')
+            limit = data.get('limit')
+        else:
+            conditions = request.args.getlist('where')
+            sort_by = request.args.get('sort_by')
+            limit = request.args.get('limit', type=int)
+        
+        explorer = get_explorer()
+        if explorer is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'EquityExplorer not initialized'
+            })
+        
+        results = explorer.screen(conditions, sort_by, limit)
+        results['period'] = results['period'].dt.strftime('%Y-%m-%d')
+        
+        return jsonify({
+            'status': 'success',
+            'count': len(results),
+            'columns': results.columns.tolist(),
+            'rows': results.astype(object).where(results.notna(), None).values.tolist()
+        })
+        
+    except (ValueError, KeyError, RuntimeError) as e:
+        return jsonify({
+            'status': 'error',
+            'message': e.args[0] if e.args else str(e)
+        })
+    except Exception as e:
+        logger.error(f"Error screening tickers: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        })
+
+@app.route('/api/statements/<ticker>/<statement>')
+def get_statement(ticker, statement):
+    """Get a statement, or a single value, from the warehouse"""
+    try:
+        explorer = get_explorer()
+        if explorer is None or explorer.warehouse is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Warehouse not enabled'
+            })
+        
+        ticker = ticker.upper()
+        line_item = request.args.get('item')
+        period = request.args.get('period')
+        
+        if line_item and period:
+            return jsonify({
+                'status': 'success',
+                'value': explorer.warehouse.lookup(ticker, statement, line_item, period)
+            })
+        
+        table = explorer.warehouse.statement(ticker, statement)
+        if table.empty:
+            return jsonify({
+                'status': 'error',
+                'message': f'No {statement} for {ticker} in the warehouse'
+            })
+        
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'columns': table.columns.tolist(),
+                'index': table.index.tolist(),
+                'rows': table.astype(object).where(table.notna(), None).values.tolist()
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Error reading {statement} for {ticker} from the warehouse: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        })
+
 @app.route('/api/files')
 def get_files():
     """Get list of available files"""
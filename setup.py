@@ -18,7 +18,7 @@ setup(
     description="A modern financial data analysis tool with Anaplan integration",
     long_description=long_description,
     long_description_content_type="text/markdown",
-    packages=find_packages(),
+    packages=find_packages(exclude=['tools']),
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Financial and Insurance Industry",
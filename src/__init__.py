@@ -2,5 +2,10 @@
 EquityExplorer Core Package
 """
 
+from src.config_defaults import apply_defaults
+
 __version__ = "1.0.0"
-__author__ = "EquityExplorer Team" 
\ No newline at end of file
+__author__ = "EquityExplorer Team"
+
+# A config.py copied from an older config.example.py lacks the newer settings
+apply_defaults()
@@ -0,0 +1,286 @@
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict
+import requests
+from config import Config
+from src.retry_policy import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+class AnaplanClient:
+    """
+    In-process client for the Anaplan Integration API (v2)
+    
+    One authenticated session serves every upload, in place of a JVM launch
+    of Anaplan Connect per file. Files are uploaded in chunks of
+    Config.CHUNK_SIZE MB and import processes are run as tasks whose
+    completion is polled. File and process ids are looked up by name once
+    and cached; the token is refreshed shortly before it expires.
+    """
+    
+    # Lifetime of an Anaplan token, used when the response has no expiresAt
+    TOKEN_LIFETIME = 35 * 60
+    
+    def __init__(self, service_url: str = None, auth_url: str = None, user: str = None,
+                 password: str = None, workspace_id: str = None, model_id: str = None,
+                 chunk_size: float = None):
+        """
+        Initialize the client
+        
+        Args:
+            service_url: Integration API root. If None, uses Config.ANAPLAN_SERVICE_URL
+            auth_url: Authentication service root. If None, uses Config.ANAPLAN_AUTH_URL
+            user: Anaplan user. If None, uses Config.ANAPLAN_USER
+            password: Password of the user. If None, uses Config.ANAPLAN_PASSWORD
+            workspace_id: Workspace id. If None, uses Config.ANAPLAN_WORKSPACE_ID
+            model_id: Model id. If None, uses Config.ANAPLAN_MODEL_ID
+            chunk_size: Upload chunk size in MB. If None, uses Config.CHUNK_SIZE
+        """
+        self.service_url = (service_url or Config.ANAPLAN_SERVICE_URL).rstrip('/')
+        self.auth_url = (auth_url or Config.ANAPLAN_AUTH_URL).rstrip('/')
+        self.user = user or Config.ANAPLAN_USER
+        self.password = password if password is not None else Config.ANAPLAN_PASSWORD
+        self.workspace_id = workspace_id or Config.ANAPLAN_WORKSPACE_ID
+        self.model_id = model_id or Config.ANAPLAN_MODEL_ID
+        self.chunk_bytes = max(1, int((chunk_size or Config.CHUNK_SIZE) * 1024 * 1024))
+        
+        self.session = requests.Session()
+        self.retry_policy = RetryPolicy()
+        self.timeout = (Config.CONNECT_TIMEOUT, Config.READ_TIMEOUT)
+        
+        self.lock = threading.Lock()
+        self.auth_lock = threading.Lock()
+        self.token = None
+        self.token_expires = 0.0
+        self.ids: Dict[tuple, str] = {}
+        self.stats = {'authentications': 0, 'files': 0, 'chunks': 0, 'bytes': 0, 'processes': 0}
+    
+    @property
+    def model_url(self) -> str:
+        """Root of the model's Integration API resources"""
+        return f"{self.service_url}/2/0/workspaces/{self.workspace_id}/models/{self.model_id}"
+    
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += amount
+    
+    def authenticate(self) -> str:
+        """
+        Get a new token with basic authentication
+        
+        Returns:
+            Token value
+        
+        Raises:
+            RuntimeError: If authentication fails
+        """
+        response = self.session.post(f"{self.auth_url}/token/authenticate",
+                                     auth=(self.user, self.password), timeout=self.timeout)
+        if not response.ok:
+            raise RuntimeError(f"Anaplan authentication failed with HTTP {response.status_code}")
+        
+        token_info = response.json()['tokenInfo']
+        with self.lock:
+            self.token = token_info['tokenValue']
+            # expiresAt is in milliseconds; renew a minute early
+            expires_at = token_info.get('expiresAt')
+            expires_at = expires_at / 1000 if expires_at else time.time() + self.TOKEN_LIFETIME
+            self.token_expires = expires_at - 60
+            self.stats['authentications'] += 1
+            logger.info("Authenticated with Anaplan")
+            return self.token
+    
+    def _get_token(self) -> str:
+        # Workers starting together wait for one authentication instead of each logging in
+        with self.auth_lock:
+            with self.lock:
+                if self.token is not None and time.time() < self.token_expires:
+                    return self.token
+            return self.authenticate()
+    
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send a request to the model, retrying retryable failures
+        
+        A 401 response is answered by authenticating again once.
+        
+        Args:
+            method: HTTP method
+            path: Path below model_url
+            **kwargs: Extra arguments for requests (json, data, headers, ...)
+        
+        Returns:
+            Successful response
+        
+        Raises:
+            RuntimeError: If the request fails permanently or runs out of retries
+        """
+        url = f"{self.model_url}/{path}"
+        headers = kwargs.pop('headers', {})
+        reauthenticated = False
+        error = None
+        
+        attempt = 0
+        while attempt < self.retry_policy.max_retries:
+            retry_after = None
+            try:
+                response = self.session.request(
+                    method, url, timeout=self.timeout,
+                    headers={**headers, 'Authorization': f"AnaplanAuthToken {self._get_token()}"},
+                    **kwargs
+                )
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if response.ok:
+                    return response
+                if response.status_code == 401 and not reauthenticated:
+                    reauthenticated = True
+                    with self.lock:
+                        self.token = None
+                    continue
+                
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if not self.retry_policy.is_retryable(response.status_code):
+                    break
+                retry_after = response.headers.get('Retry-After')
+            
+            attempt += 1
+            if attempt < self.retry_policy.max_retries:
+                time.sleep(self.retry_policy.get_delay(attempt - 1, retry_after))
+        
+        raise RuntimeError(f"{method} {path} failed: {error}")
+    
+    def _lookup(self, kind: str, name: str) -> str:
+        """
+        Get the id of a model file or process by name
+        
+        Args:
+            kind: 'files' or 'processes'
+            name: Name as shown in the model
+        
+        Returns:
+            Id of the resource
+        
+        Raises:
+            RuntimeError: If the model has no resource of that name
+        """
+        with self.lock:
+            if (kind, name) in self.ids:
+                return self.ids[(kind, name)]
+        
+        resources = self._request('GET', kind).json().get(kind, [])
+        with self.lock:
+            for resource in resources:
+                self.ids[(kind, resource['name'])] = resource['id']
+            if (kind, name) not in self.ids:
+                kind_name = 'file' if kind == 'files' else 'process'
+                raise RuntimeError(f"The model has no {kind_name} named {name!r}")
+            return self.ids[(kind, name)]
+    
+    def upload_file(self, file_path: Path, name: str = None) -> int:
+        """
+        Upload a file to an import data source of the model in chunks
+        
+        Args:
+            file_path: Local file to upload
+            name: Name of the file in the model. If None, uses the local file name
+        
+        Returns:
+            Number of chunks uploaded
+        """
+        file_path = Path(file_path)
+        name = name or file_path.name
+        file_id = self._lookup('files', name)
+        
+        self._request('PUT', f"files/{file_id}", json={'id': file_id, 'name': name, 'chunkCount': -1})
+        
+        chunk_count = 0
+        size = 0
+        with open(file_path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_bytes)
+                # An empty file is still sent as one (empty) chunk
+                if not chunk and chunk_count:
+                    break
+                self._request('PUT', f"files/{file_id}/chunks/{chunk_count}", data=chunk,
+                              headers={'Content-Type': 'application/octet-stream'})
+                chunk_count += 1
+                size += len(chunk)
+                if not chunk:
+                    break
+        
+        self._request('POST', f"files/{file_id}/complete",
+                      json={'id': file_id, 'name': name, 'chunkCount': chunk_count})
+        
+        self._count('files')
+        self._count('chunks', chunk_count)
+        self._count('bytes', size)
+        logger.info(f"Uploaded {file_path.name} to Anaplan as {name!r} in {chunk_count} chunks")
+        return chunk_count
+    
+    def run_process(self, name: str, timeout: float = None) -> Dict:
+        """
+        Run an import process and wait for it to finish
+        
+        Args:
+            name: Name of the process in the model
+            timeout: Seconds to wait for the task. If None, uses Config.ANAPLAN_TASK_TIMEOUT
+        
+        Returns:
+            Result of the task
+        
+        Raises:
+            RuntimeError: If the task fails or does not finish in time
+        """
+        process_id = self._lookup('processes', name)
+        task_id = self._request('POST', f"processes/{process_id}/tasks",
+                                json={'localeName': 'en_US'}).json()['task']['taskId']
+        
+        deadline = time.monotonic() + (timeout or Config.ANAPLAN_TASK_TIMEOUT)
+        while True:
+            task = self._request('GET', f"processes/{process_id}/tasks/{task_id}").json()['task']
+            if task.get('taskState') == 'COMPLETE':
+                break
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Process {name!r} did not finish within the timeout")
+            time.sleep(Config.ANAPLAN_TASK_POLL_INTERVAL)
+        
+        self._count('processes')
+        result = task.get('result', {})
+        if not result.get('successful', False):
+            raise RuntimeError(f"Process {name!r} failed: {result.get('details') or result}")
+        
+        logger.info(f"Process {name!r} completed")
+        return result
+    
+    def upload(self, file_path: Path, name: str, process_name: str) -> Dict:
+        """
+        Upload a file and run the import process reading it
+        
+        Args:
+            file_path: Local file to upload
+            name: Name of the file in the model
+            process_name: Name of the process to run
+        
+        Returns:
+            Result of the process task
+        """
+        self.upload_file(file_path, name)
+        return self.run_process(process_name)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get upload counters
+        
+        Returns:
+            Dictionary with authentications, files, chunks, bytes and processes run
+        """
+        with self.lock:
+            return dict(self.stats)
+    
+    def close(self) -> None:
+        """Close pooled connections"""
+        self.session.close()
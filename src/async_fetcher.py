@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class AsyncFetchEngine:
+    """Downloads financial statements for many tickers concurrently"""
+    
+    def __init__(self, fetcher, concurrency: int = None):
+        """
+        Initialize the fetch engine
+        
+        Args:
+            fetcher: FinancialDataFetcher used to download and save each statement
+            concurrency: Maximum number of statement downloads in flight at once.
+                If None, uses Config.FETCH_CONCURRENCY
+        """
+        self.fetcher = fetcher
+        self.concurrency = max(1, concurrency or Config.FETCH_CONCURRENCY)
+    
+    async def _fetch_statement(self, ticker: str, statement_type: str, endpoint: str,
+                               semaphore: asyncio.Semaphore,
+                               executor: ThreadPoolExecutor) -> Tuple[str, str, Optional[Union[Path, bytes]]]:
+        """
+        Fetch one statement, waiting for a free slot first
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement name used in the output filename
+            endpoint: API endpoint for the statement
+            semaphore: Semaphore bounding the number of downloads in flight
+            executor: Thread pool running the blocking HTTP calls
+        
+        Returns:
+            Tuple of ticker, statement type and saved file path or raw content (None if failed)
+        """
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            try:
+                filepath = await loop.run_in_executor(
+                    executor,
+                    self.fetcher.fetch_statement,
+                    ticker,
+                    statement_type,
+                    endpoint
+                )
+            except Exception as e:
+                logger.error(f"Error fetching {statement_type} for {ticker}: {e}")
+                filepath = None
+        
+        return ticker, statement_type, filepath
+    
+    async def process_tickers_async(self, tickers: List[str]) -> Dict[str, Dict[str, Union[Path, bytes]]]:
+        """
+        Fetch all statements for a list of tickers concurrently
+        
+        Args:
+            tickers: List of stock ticker symbols
+        
+        Returns:
+            Dictionary mapping tickers to their statement file paths (or raw content
+            when Config.PERSIST_RAW_STATEMENTS is off)
+        """
+        logger.info(f"Fetching statements for {len(tickers)} tickers "
+                    f"(concurrency {self.concurrency})")
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = {ticker: {} for ticker in tickers}
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            tasks = [
+                self._fetch_statement(ticker, statement_type, endpoint, semaphore, executor)
+                for ticker in results
+                for statement_type, endpoint in self.fetcher.STATEMENT_ENDPOINTS.items()
+            ]
+            
+            for ticker, statement_type, filepath in await asyncio.gather(*tasks):
+                if filepath:
+                    results[ticker][statement_type] = filepath
+                else:
+                    logger.error(f"Failed to fetch {statement_type} for {ticker}")
+        
+        return results
+    
+    def process_tickers(self, tickers: List[str]) -> Dict[str, Dict[str, Union[Path, bytes]]]:
+        """
+        Synchronous wrapper around process_tickers_async
+        
+        Args:
+            tickers: List of stock ticker symbols
+        
+        Returns:
+            Dictionary mapping tickers to their statement file paths
+        """
+        return asyncio.run(self.process_tickers_async(tickers))
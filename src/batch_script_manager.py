@@ -1,43 +1,108 @@
 import os
 import platform
-import subprocess
+import threading
+import uuid
 import logging
-import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict
 from config import Config
+from src.rate_limiter import get_rate_limiter
+from src.anaplan_client import AnaplanClient
+from src.subprocess_executor import SubprocessExecutor
 
 logger = logging.getLogger(__name__)
 
 class BatchScriptManager:
-    """Manages batch script operations in a cross-platform way"""
+    """
+    Manages batch script operations in a cross-platform way
+    
+    The scripts in scripts/ are read-only templates: every upload job renders
+    its own copy into Config.UPLOAD_JOB_DIR, so any number of uploads can run
+    at once on a bounded pool of Config.UPLOAD_WORKERS workers. Scripts are run
+    by a SubprocessExecutor, which kills them after Config.JOB_TIMEOUT and
+    writes their output to a log next to the rendered script.
+    
+    With Config.ANAPLAN_UPLOAD_METHOD set to 'rest', statements are uploaded
+    in-process by AnaplanClient instead, and the batch scripts are only run
+    when a REST upload fails (Config.ANAPLAN_BATCH_FALLBACK).
+    """
     
     def __init__(self):
         self.system = platform.system().lower()
         self.is_windows = self.system == 'windows'
+        self.scripts_dir = Config.BASE_DIR / 'scripts'
+        self.job_dir = Path(Config.UPLOAD_JOB_DIR)
+        self.workers = Config.UPLOAD_WORKERS
+        self.rate_limiter = get_rate_limiter(
+            'anaplan',
+            requests_per_minute=Config.ANAPLAN_REQUESTS_PER_MINUTE
+        )
+        self.executor = None
+        self.executor_lock = threading.Lock()
+        self.subprocesses = SubprocessExecutor(log_dir=self.job_dir)
         
+        self.client = None
+        if Config.ANAPLAN_UPLOAD_METHOD == 'rest':
+            if Config.ANAPLAN_PASSWORD:
+                self.client = AnaplanClient()
+            else:
+                logger.warning("ANAPLAN_PASSWORD is not set; uploading with batch scripts")
+        if not Config.ANAPLAN_PASSWORD:
+            # Jobs have no console, so Anaplan Connect cannot prompt for the password
+            logger.warning("ANAPLAN_PASSWORD is not set; batch scripts signing in with -user will fail")
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """The upload worker pool, shared by every ticker"""
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='upload')
+            return self.executor
+    
     def update_batch_script(self, script_name: str, ticker: str, file_path: Path, 
                            statement_type: str = None) -> Path:
         """
-        Update a batch script with new file paths and ticker information
+        Render a batch script for one upload job with new file paths and ticker information
+        
+        The template in scripts/ is left unchanged; the job's copy is written to
+        Config.UPLOAD_JOB_DIR under a unique name. A POSIX shell template with the
+        same name is rendered alongside it when one exists. The user is set to
+        Config.ANAPLAN_USER and a -user sign-in reads its password from the
+        job's ANAPLAN_PASSWORD environment variable, so it is never written out.
         
         Args:
-            script_name: Name of the batch script to update
+            script_name: Name of the batch script template
             ticker: Stock ticker symbol
             file_path: Path to the file to be processed
             statement_type: Type of financial statement (for process naming)
             
         Returns:
-            Path to updated batch script
+            Path to the rendered batch script
         """
-        script_path = Config.BASE_DIR / 'scripts' / script_name
+        script_path = self.scripts_dir / script_name
         
         if not script_path.exists():
             raise FileNotFoundError(f"Batch script not found: {script_path}")
         
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        job_name = f"{ticker}_{statement_type or 'utility'}_{uuid.uuid4().hex[:8]}"
+        
+        rendered = None
+        for template in (script_path, script_path.with_suffix('.sh')):
+            if template.exists():
+                job_path = self.job_dir / f"{job_name}{template.suffix}"
+                self._render_template(template, job_path, ticker, file_path, statement_type)
+                rendered = rendered or job_path
+        
+        logger.info(f"Rendered batch script {script_name} for ticker {ticker}")
+        return rendered
+    
+    def _render_template(self, template: Path, job_path: Path, ticker: str, file_path: Path,
+                         statement_type: str = None) -> None:
+        """Write a job's copy of a script template with its settings filled in"""
         try:
-            # Read the original script
-            with open(script_path, 'r', encoding='utf-8') as f:
+            # Read the template
+            with open(template, 'r', encoding='utf-8') as f:
                 lines = f.readlines()
             
             # Update the script content
@@ -54,113 +119,198 @@ class BatchScriptManager:
                     # Update file path
                     new_line = f'set FilePath="{file_path.absolute()}"\n'
                     updated_lines.append(new_line)
+                elif line.strip().lower().startswith('set user='):
+                    new_line = f'set User="{Config.ANAPLAN_USER}"\n'
+                    updated_lines.append(new_line)
+                elif (line.strip().lower().startswith('set credentials=') and '-user' in line
+                      and '-password' not in line):
+                    # Jobs run without a console, so the password cannot be prompted for
+                    new_line = f'{line.rstrip()} -password %ANAPLAN_PASSWORD%\n'
+                    updated_lines.append(new_line)
                 elif 'set ProcessName=' in line and statement_type:
                     # Update process name if statement type is provided
-                    process_name = Config.PROCESS_NAMES.get(statement_type.lower().replace(' ', '_'), 'Load Data')
-                    new_line = f'set ProcessName="{process_name}"\n'
+                    new_line = f'set ProcessName="{self._process_name(statement_type)}"\n'
                     updated_lines.append(new_line)
+                elif line.strip().lower().startswith('cd %~dp0'):
+                    # The job runs from UPLOAD_JOB_DIR but AnaplanClient lives next to the templates
+                    updated_lines.append(f'cd /d "{self.scripts_dir.absolute()}"\n')
+                elif line.strip().lower() == 'pause':
+                    # Jobs run unattended; waiting for a key press would hold a worker forever
+                    continue
                 else:
                     updated_lines.append(line)
             
-            # Write updated script
-            with open(script_path, 'w', encoding='utf-8') as f:
+            # Write the job's script
+            with open(job_path, 'w', encoding='utf-8') as f:
                 f.writelines(updated_lines)
             
-            logger.info(f"Updated batch script {script_name} for ticker {ticker}")
-            return script_path
-            
         except Exception as e:
-            logger.error(f"Error updating batch script {script_name}: {e}")
+            logger.error(f"Error rendering batch script {template.name}: {e}")
             raise
     
-    def execute_batch_script(self, script_path: Path, wait: bool = True) -> Optional[subprocess.Popen]:
+    @staticmethod
+    def _process_name(statement_type: str) -> str:
+        """Name of the Anaplan process importing a statement type"""
+        return Config.PROCESS_NAMES.get(statement_type.lower().replace(' ', '_'), 'Load Data')
+    
+    def execute_batch_script(self, script_path: Path) -> Dict:
         """
-        Execute a batch script
+        Execute a batch script and wait for it to finish or time out
         
         Args:
             script_path: Path to the batch script
-            wait: Whether to wait for execution to complete
             
         Returns:
-            Subprocess object if not waiting, None otherwise
+            Job result from SubprocessExecutor.run (returncode, duration, timed_out, log)
         """
-        try:
-            if self.is_windows:
-                # Windows: use start command
-                cmd = ["start", "cmd", "/k", str(script_path)]
-                process = subprocess.Popen(cmd, shell=True)
-            else:
-                # Unix-like systems: execute directly
-                if script_path.suffix == '.bat':
-                    # Convert .bat to .sh if needed
-                    sh_script = script_path.with_suffix('.sh')
-                    if sh_script.exists():
-                        script_path = sh_script
-                
+        if self.is_windows:
+            # Windows: run in this console so the job can be waited on
+            args = ["cmd", "/c", script_path]
+        else:
+            # Unix-like systems: execute directly
+            if script_path.suffix == '.bat':
+                # Convert .bat to .sh if needed
+                sh_script = script_path.with_suffix('.sh')
+                if sh_script.exists():
+                    script_path = sh_script
+            
+            if script_path.suffix == '.sh':
                 # Make script executable
                 os.chmod(script_path, 0o755)
-                process = subprocess.Popen([str(script_path)], shell=True)
-            
-            if wait:
-                process.wait()
-                logger.info(f"Executed batch script {script_path.name}")
-                return None
+                args = [script_path]
             else:
-                logger.info(f"Started batch script {script_path.name}")
-                return process
-                
+                args = ["sh", script_path]
+        
+        # The rendered script reads the password from its environment
+        env = {**os.environ, 'ANAPLAN_PASSWORD': Config.ANAPLAN_PASSWORD or ''}
+        
+        logger.info(f"Started batch script {script_path.name}")
+        return self.subprocesses.run(args, script_path.stem, env=env)
+    
+    def run_job(self, script_name: str, ticker: str, file_path: Path, statement_type: str = None) -> bool:
+        """
+        Render a script for one upload, run it and wait for it to finish
+        
+        The rendered script and its log are removed once the upload succeeds
+        (the log is kept with Config.KEEP_JOB_LOGS) and kept in
+        Config.UPLOAD_JOB_DIR for inspection when it fails or times out.
+        
+        Args:
+            script_name: Name of the batch script template
+            ticker: Stock ticker symbol
+            file_path: Path to the file to upload
+            statement_type: Type of financial statement (for process naming)
+            
+        Returns:
+            True if the script exited successfully
+        """
+        label = statement_type or script_name
+        try:
+            job_script = self.update_batch_script(script_name, ticker, file_path, statement_type)
+            
+            # Execute the script once the Anaplan rate limit allows it
+            self.rate_limiter.acquire()
+            result = self.execute_batch_script(job_script)
+            
         except Exception as e:
-            logger.error(f"Error executing batch script {script_path.name}: {e}")
-            raise
+            logger.error(f"Failed to execute {label} script for {ticker}: {e}")
+            return False
+        
+        if result['timed_out'] or result['returncode'] != 0:
+            logger.error(f"{label} script for {ticker} failed (kept {job_script})")
+            return False
+        
+        for rendered in self.job_dir.glob(f"{job_script.stem}.*"):
+            if rendered.suffix != '.log' or not Config.KEEP_JOB_LOGS:
+                rendered.unlink()
+        return True
     
-    def execute_statement_scripts(self, ticker: str, file_paths: Dict[str, Path]) -> None:
+    def upload_statement(self, ticker: str, file_path: Path, statement_type: str) -> bool:
         """
-        Execute all statement processing scripts for a ticker
+        Upload one statement file to Anaplan and run its import process
+        
+        Args:
+            ticker: Stock ticker symbol
+            file_path: Path to the file to upload
+            statement_type: Type of financial statement
+            
+        Returns:
+            True if the upload and import succeeded
+        """
+        script_name = Config.BATCH_SCRIPTS[statement_type]
+        if self.client is None:
+            return self.run_job(script_name, ticker, file_path, statement_type)
+        
+        try:
+            self.rate_limiter.acquire()
+            self.client.upload(file_path, f"{ticker} {statement_type}.csv", self._process_name(statement_type))
+            return True
+        except Exception as e:
+            logger.error(f"REST upload of {statement_type} for {ticker} failed: {e}")
+        
+        if not Config.ANAPLAN_BATCH_FALLBACK:
+            return False
+        logger.info(f"Falling back to the {statement_type} batch script for {ticker}")
+        return self.run_job(script_name, ticker, file_path, statement_type)
+    
+    def submit_statement_scripts(self, ticker: str, file_paths: Dict[str, Path]) -> Dict[str, Future]:
+        """
+        Queue the statement uploads of a ticker on the worker pool
         
         Args:
             ticker: Stock ticker symbol
             file_paths: Dictionary mapping statement types to file paths
+            
+        Returns:
+            Dictionary mapping statement types to futures resolving to whether the upload succeeded
         """
-        script_mapping = {
-            'balance_sheet': Config.BATCH_SCRIPTS['balance_sheet'],
-            'income_statement': Config.BATCH_SCRIPTS['income_statement'],
-            'cash_flow': Config.BATCH_SCRIPTS['cash_flow']
-        }
+        statement_types = ['balance_sheet', 'income_statement', 'cash_flow']
+        executor = self._get_executor()
         
-        processes = []
+        return {
+            statement_type: executor.submit(self.upload_statement, ticker, file_path, statement_type)
+            for statement_type, file_path in file_paths.items()
+            if statement_type in statement_types
+        }
+    
+    def execute_statement_scripts(self, ticker: str, file_paths: Dict[str, Path]) -> Dict[str, bool]:
+        """
+        Execute all statement processing scripts for a ticker
         
-        for statement_type, file_path in file_paths.items():
-            if statement_type in script_mapping:
-                script_name = script_mapping[statement_type]
-                
-                try:
-                    # Update the batch script
-                    updated_script = self.update_batch_script(
-                        script_name, 
-                        ticker, 
-                        file_path, 
-                        statement_type
-                    )
-                    
-                    # Execute the script
-                    process = self.execute_batch_script(updated_script, wait=False)
-                    if process:
-                        processes.append(process)
-                    
-                    # Small delay between script executions
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to execute {statement_type} script for {ticker}: {e}")
-        
-        # Wait for all processes to complete
-        for process in processes:
-            try:
-                process.wait()
-            except Exception as e:
-                logger.error(f"Error waiting for process: {e}")
+        Args:
+            ticker: Stock ticker symbol
+            file_paths: Dictionary mapping statement types to file paths
+            
+        Returns:
+            Dictionary mapping statement types to whether their script exited successfully
+        """
+        futures = self.submit_statement_scripts(ticker, file_paths)
+        results = {statement_type: future.result() for statement_type, future in futures.items()}
         
         logger.info(f"Completed all statement scripts for {ticker}")
+        return results
+    
+    def get_job_stats(self) -> Dict:
+        """
+        Get the exit codes and durations of the scripts run since the last reset_job_stats()
+        
+        Returns:
+            Job summary from SubprocessExecutor.get_stats
+        """
+        return self.subprocesses.get_stats()
+    
+    def reset_job_stats(self) -> None:
+        """Start a new run for the script job summary"""
+        self.subprocesses.reset_stats()
+    
+    def close(self) -> None:
+        """Wait for queued uploads and stop the worker pool"""
+        with self.executor_lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+        if self.client is not None:
+            self.client.close()
     
     def execute_utility_scripts(self) -> None:
         """Execute utility scripts for stocks and date data"""
@@ -170,16 +320,14 @@ class BatchScriptManager:
             stocks_path = Config.BASE_DIR / 'Stocks.csv'
             
             if stocks_path.exists():
-                updated_script = self.update_batch_script(stocks_script, 'Stocks', stocks_path)
-                self.execute_batch_script(updated_script, wait=True)
+                self.run_job(stocks_script, 'Stocks', stocks_path)
             
             # Execute date script
             date_script = Config.BATCH_SCRIPTS['date']
             date_path = Config.BASE_DIR / 'Today Date.csv'
             
             if date_path.exists():
-                updated_script = self.update_batch_script(date_script, 'Date', date_path)
-                self.execute_batch_script(updated_script, wait=True)
+                self.run_job(date_script, 'Date', date_path)
                 
         except Exception as e:
             logger.error(f"Error executing utility scripts: {e}")
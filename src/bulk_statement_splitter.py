@@ -0,0 +1,150 @@
+import csv
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class BulkStatementSplitter:
+    """Splits whole-universe statement files into per-ticker statement files"""
+    
+    def __init__(self, output_dir: Path = None, max_open_files: int = None):
+        """
+        Initialize the splitter
+        
+        Args:
+            output_dir: Directory for the per-ticker files. If None, uses Config.OUTPUT_DIR
+            max_open_files: Maximum number of per-ticker files kept open while splitting.
+                If None, uses Config.BULK_MAX_OPEN_FILES
+        """
+        self.output_dir = Path(output_dir or Config.OUTPUT_DIR)
+        self.max_open_files = max_open_files or Config.BULK_MAX_OPEN_FILES
+    
+    def split(self, sources: List[Path], statement_type: str,
+              tickers: Optional[Iterable[str]] = None) -> Dict[str, Path]:
+        """
+        Split bulk statement files into "{ticker} {statement_type}.csv" files
+        
+        Bulk files hold one row per ticker and period with a 'symbol' column.
+        They are read once, row by row, and each row is appended to a scratch
+        file for its ticker. Each scratch file is then rewritten in the
+        per-ticker layout (one row per line item, one column per period, newest
+        first), so memory use is bounded by a single ticker's history rather
+        than by the size of the bulk file.
+        
+        Args:
+            sources: Bulk CSV files for the statement type (e.g. one per fiscal year)
+            statement_type: Statement name used in the output filenames
+            tickers: Only keep these tickers. If None, keeps every ticker in the files
+        
+        Returns:
+            Dictionary mapping tickers to their statement file paths
+        """
+        wanted = {t.upper() for t in tickers} if tickers is not None else None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        scratch_dir = Path(tempfile.mkdtemp(prefix='bulk-', dir=self.output_dir))
+        
+        try:
+            header, scratch_files = self._partition(sources, scratch_dir, wanted)
+            
+            results = {}
+            for ticker, scratch_file in scratch_files.items():
+                results[ticker] = self._write_ticker_file(ticker, statement_type, header, scratch_file)
+            
+            logger.info(f"Split {statement_type} bulk data into {len(results)} ticker files")
+            return results
+        
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+    
+    def _partition(self, sources: List[Path], scratch_dir: Path,
+                   wanted: Optional[set]) -> Tuple[List[str], Dict[str, Path]]:
+        """Stream the bulk rows into one scratch file per ticker"""
+        header = None
+        scratch_files = {}
+        handles = OrderedDict()
+        
+        try:
+            for source in sources:
+                with open(source, 'r', newline='', encoding='utf-8-sig') as f:
+                    reader = csv.reader(f)
+                    source_header = next(reader, None)
+                    if source_header is None:
+                        continue
+                    
+                    if header is None:
+                        header = source_header
+                    elif source_header != header:
+                        raise ValueError(f"Bulk file {source.name} has a different header")
+                    
+                    symbol_index = header.index('symbol')
+                    
+                    for row in reader:
+                        if len(row) <= symbol_index:
+                            continue
+                        
+                        ticker = row[symbol_index].upper()
+                        if not ticker or os.sep in ticker or (wanted is not None and ticker not in wanted):
+                            continue
+                        
+                        writer = self._get_writer(ticker, scratch_dir, scratch_files, handles)
+                        writer.writerow(row)
+        finally:
+            for handle, _ in handles.values():
+                handle.close()
+        
+        return header or [], scratch_files
+    
+    def _get_writer(self, ticker: str, scratch_dir: Path, scratch_files: Dict[str, Path],
+                    handles: OrderedDict):
+        """Get an append writer for a ticker's scratch file, keeping a bounded set open"""
+        if ticker in handles:
+            handles.move_to_end(ticker)
+            return handles[ticker][1]
+        
+        if len(handles) >= self.max_open_files:
+            _, (oldest, _) = handles.popitem(last=False)
+            oldest.close()
+        
+        scratch_file = scratch_files.setdefault(ticker, scratch_dir / f"{len(scratch_files)}.csv")
+        handle = open(scratch_file, 'a', newline='', encoding='utf-8')
+        writer = csv.writer(handle)
+        handles[ticker] = (handle, writer)
+        return writer
+    
+    @staticmethod
+    def _row_order(header: List[str]) -> List[int]:
+        """
+        Column indexes of the bulk header in the order of a per-ticker statement
+        
+        Per-ticker downloads start with the 'date' row followed by the 'symbol'
+        row, while bulk files start with the 'symbol' column; the remaining
+        fields keep their bulk order.
+        """
+        leading = [header.index(field) for field in ('date', 'symbol') if field in header]
+        return leading + [i for i in range(len(header)) if i not in leading]
+    
+    def _write_ticker_file(self, ticker: str, statement_type: str, header: List[str],
+                           scratch_file: Path) -> Path:
+        """Rewrite a ticker's scratch rows in the per-ticker statement layout"""
+        with open(scratch_file, 'r', newline='', encoding='utf-8') as f:
+            records = list(csv.reader(f))
+        
+        if 'date' in header:
+            date_index = header.index('date')
+            records.sort(key=lambda record: record[date_index], reverse=True)
+        
+        filepath = self.output_dir / f"{ticker} {statement_type}.csv"
+        temp_path = filepath.with_name(f".{filepath.name}.part")
+        with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            for i in self._row_order(header):
+                writer.writerow([header[i]] + [record[i] if i < len(record) else '' for record in records])
+        os.replace(temp_path, filepath)
+        
+        return filepath
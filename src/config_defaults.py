@@ -0,0 +1,156 @@
+import os
+from config import Config
+
+# Settings added to config.example.py since a config.py may have been copied from it.
+# Paths are functions of the user's Config, so they follow its own OUTPUT_DIR and BASE_DIR.
+DEFAULTS = {
+    # API Configuration
+    'FINANCIAL_MODELING_PREP_BULK_URL': 'https://financialmodelingprep.com/api/v4',
+    'ANAPLAN_PASSWORD': lambda c: os.environ.get('ANAPLAN_PASSWORD', ''),
+    'BULK_DIR': lambda c: c.OUTPUT_DIR / 'bulk',
+    
+    # Retry Configuration
+    'RETRY_MAX_DELAY': 60,
+    'RETRY_JITTER': 0.5,
+    
+    # Circuit Breaker
+    'CIRCUIT_FAILURE_THRESHOLD': 0.5,
+    'CIRCUIT_WINDOW_SIZE': 20,
+    'CIRCUIT_MIN_REQUESTS': 10,
+    'CIRCUIT_RESET_TIMEOUT': 60,
+    
+    # Rate Limiting
+    'API_REQUESTS_PER_SECOND': 10,
+    'API_REQUESTS_PER_MINUTE': 300,
+    'ANAPLAN_REQUESTS_PER_MINUTE': 60,
+    
+    # Anaplan Uploads
+    'ANAPLAN_UPLOAD_METHOD': 'batch',
+    'ANAPLAN_BATCH_FALLBACK': True,
+    'ANAPLAN_TASK_TIMEOUT': 600,
+    'ANAPLAN_TASK_POLL_INTERVAL': 2,
+    
+    # Consolidated Uploads
+    'CONSOLIDATED_UPLOADS': False,
+    'CONSOLIDATED_UPLOAD_NAME': 'ALL',
+    
+    # Upload Jobs
+    'UPLOAD_WORKERS': 4,
+    'UPLOAD_JOB_DIR': lambda c: c.OUTPUT_DIR / 'jobs',
+    'JOB_TIMEOUT': 1800,
+    'JOB_MAX_CONCURRENT': None,
+    'KEEP_JOB_LOGS': False,
+    
+    # Response Cache
+    'CACHE_ENABLED': False,
+    'CACHE_DIR': lambda c: c.BASE_DIR / 'cache',
+    'CACHE_TTL': 24 * 60 * 60,
+    'CACHE_MAX_BYTES': 500 * 1024 * 1024,
+    
+    # Raw Archive
+    'ARCHIVE_ENABLED': False,
+    'ARCHIVE_DIR': lambda c: c.BASE_DIR / 'archive',
+    'ARCHIVE_COMPRESSION_LEVEL': 6,
+    
+    # Concurrent Fetching
+    'FETCH_CONCURRENCY': 8,
+    
+    # Parallel CSV Processing
+    'PARALLEL_CSV': False,
+    'CSV_WORKERS': None,
+    'CSV_CHUNKSIZE': None,
+    
+    # HTTP Transport
+    'HTTP_POOL_SIZE': None,
+    'CONNECT_TIMEOUT': 5,
+    'READ_TIMEOUT': 30,
+    'HTTP_COMPRESSION': True,
+    'HTTP_KEEPALIVE_STATS': False,
+    
+    # Downloads
+    'STREAM_DOWNLOADS': False,
+    'PERSIST_RAW_STATEMENTS': True,
+    'DOWNLOAD_CHUNK_SIZE': 64 * 1024,
+    'ERROR_SNIFF_BYTES': 4096,
+    
+    # Incremental Fetching
+    'INCREMENTAL_FETCH': False,
+    'INCREMENTAL_PERIODS': 2,
+    'STATEMENT_PERIOD': 'annual',
+    
+    # Bulk Downloads
+    'BULK_ENDPOINTS': {
+        'income_statement': 'income-statement-bulk',
+        'cash_flow': 'cash-flow-statement-bulk',
+        'balance_sheet': 'balance-sheet-statement-bulk'
+    },
+    'BULK_MAX_OPEN_FILES': 256,
+    
+    # Skip Unchanged
+    'SKIP_UNCHANGED': False,
+    'PIPELINE_STATE_FILE': lambda c: c.OUTPUT_DIR / 'pipeline_state.json',
+    
+    # Delta Uploads
+    'DELTA_UPLOADS': False,
+    'UPLOAD_SNAPSHOT_DIR': lambda c: c.OUTPUT_DIR / 'uploaded',
+    
+    # Statement Store
+    'STORE_ENABLED': False,
+    'STORE_DIR': lambda c: c.OUTPUT_DIR / 'store',
+    'STORE_COMPACT_PARTS': 64,
+    
+    # Financial Ratios
+    'RATIOS': {
+        'gross_margin': 'grossProfit / revenue',
+        'operating_margin': 'operatingIncome / revenue',
+        'net_margin': 'netIncome / revenue',
+        'roe': 'netIncome / totalStockholdersEquity',
+        'roa': 'netIncome / totalAssets',
+        'roic': ('operatingIncome * (1 - incomeTaxExpense / incomeBeforeTax) / '
+                 '(totalDebt + totalStockholdersEquity - cashAndCashEquivalents)'),
+        'debt_to_equity': 'totalDebt / totalStockholdersEquity',
+        'net_debt_to_equity': 'netDebt / totalStockholdersEquity',
+        'current_ratio': 'totalCurrentAssets / totalCurrentLiabilities',
+        'fcf_margin': 'freeCashFlow / revenue',
+        'fcf_conversion': 'freeCashFlow / netIncome',
+        'capex_to_revenue': '-capitalExpenditure / revenue'
+    },
+    'RATIOS_FILE': lambda c: c.OUTPUT_DIR / 'ratios.csv',
+    'SCREEN_INDEX_FILE': lambda c: c.OUTPUT_DIR / 'screen_index.npz',
+    
+    # SQLite Warehouse
+    'WAREHOUSE_ENABLED': False,
+    'WAREHOUSE_PATH': lambda c: c.OUTPUT_DIR / 'warehouse.db',
+    
+    # DCF Valuation
+    'VALUATION_ENABLED': False,
+    'VALUATION_DRAWS': 20000,
+    'VALUATION_HORIZON': 5,
+    'VALUATION_CHUNK_TICKERS': 64,
+    'VALUATION_SEED': None,
+    'VALUATION_ASSUMPTIONS': {
+        'growth': 0.05,
+        'growth_sd': 0.05,
+        'growth_min': -0.30,
+        'growth_max': 0.40,
+        'fcf_margin': 0.10,
+        'fcf_margin_sd': 0.03,
+        'discount_rate': 0.09,
+        'discount_rate_sd': 0.015,
+        'terminal_growth': 0.025,
+        'min_spread': 0.01
+    },
+    'VALUATION_PERCENTILES': [5, 25, 50, 75, 95],
+    'VALUATION_FILE': lambda c: c.OUTPUT_DIR / 'valuations.csv'
+}
+
+def apply_defaults(config=Config) -> None:
+    """
+    Fill in the settings a configuration class does not define
+    
+    Args:
+        config: Configuration class to complete. Settings it defines are left as they are
+    """
+    for name, default in DEFAULTS.items():
+        if not hasattr(config, name):
+            setattr(config, name, default(config) if callable(default) else default)
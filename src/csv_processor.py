@@ -1,8 +1,10 @@
-import csv
 import logging
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Union
 from config import Config
+from src.csv_transforms import (
+    TransformPipeline, RowTransform, DropColumn, SubstituteText, NormalizeHeader, CleanNumeric
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +25,7 @@ class CSVProcessor:
             Path to processed file
         """
         try:
-            with open(input_file, 'r', newline='', encoding='utf-8') as source:
-                reader = csv.reader(source)
-                
-                with open(output_file, 'w', newline='', encoding='utf-8') as result:
-                    writer = csv.writer(result)
-                    
-                    for row in reader:
-                        if len(row) > column_index:
-                            del row[column_index]
-                        writer.writerow(row)
+            TransformPipeline([DropColumn(column_index)]).run(input_file, output_file)
             
             logger.info(f"Removed column {column_index} from {input_file.name}")
             return output_file
@@ -42,69 +35,76 @@ class CSVProcessor:
             raise
     
     @staticmethod
-    def replace_text_in_file(file_path: Path, old_text: str, new_text: str) -> None:
+    def build_statement_pipeline(ticker: str, statement: str) -> List[RowTransform]:
         """
-        Replace text in a file
+        Build the cleaning steps that turn a raw statement into its "New" file
         
         Args:
-            file_path: Path to file to modify
-            old_text: Text to replace
-            new_text: New text to insert
-        """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            ticker: Stock ticker symbol
+            statement: Statement type
             
-            if old_text in content:
-                content = content.replace(old_text, new_text)
-                
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                
-                logger.info(f"Replaced '{old_text}' with '{new_text}' in {file_path.name}")
-            else:
-                logger.warning(f"Text '{old_text}' not found in {file_path.name}")
-                
-        except Exception as e:
-            logger.error(f"Error replacing text in {file_path.name}: {e}")
-            raise
+        Returns:
+            Row transforms, applied in order
+        """
+        steps = [
+            # Remove first column (index 0)
+            DropColumn(0),
+            NormalizeHeader(),
+            CleanNumeric()
+        ]
+        
+        # Replace ticker reference in Income Statement
+        if statement == 'income_statement':
+            steps.append(SubstituteText(ticker, "Ticker:"))
+        
+        return steps
     
     @staticmethod
-    def process_statement_files(ticker: str, base_dir: Path) -> Dict[str, Path]:
+    def process_statement_files(ticker: str, base_dir: Path, statements: List[str] = None,
+                                contents: Dict[str, bytes] = None) -> Dict[str, Path]:
         """
         Process all statement files for a ticker
         
+        Each statement is cleaned in a single streaming pass: the raw data is
+        read once, every step of build_statement_pipeline() is applied per row,
+        and the "New" file is written once. The raw file is left unchanged.
+        
         Args:
             ticker: Stock ticker symbol
             base_dir: Base directory containing the files
+            statements: Statement types to process. If None, processes all three
+            contents: Raw statement content already in memory (e.g. from the fetcher),
+                used instead of reading the raw files
             
         Returns:
             Dictionary mapping statement types to processed file paths
         """
-        statements = ['balance_sheet', 'cash_flow', 'income_statement']
+        if statements is None:
+            statements = ['balance_sheet', 'cash_flow', 'income_statement']
+        contents = contents or {}
         processed_files = {}
         
         for statement in statements:
             input_file = base_dir / f"{ticker} {statement}.csv"
             output_file = base_dir / f"{ticker} {statement} New.csv"
             
-            if input_file.exists():
+            source: Union[Path, bytes, None] = contents.get(statement)
+            if source is None and input_file.exists():
+                source = input_file
+            
+            if source is not None:
                 try:
-                    # Remove first column (index 0)
-                    processed_file = CSVProcessor.remove_column(input_file, output_file, 0)
-                    processed_files[statement] = processed_file
-                    
-                    # Replace ticker reference in Income Statement
-                    if statement == 'income_statement':
-                        CSVProcessor.replace_text_in_file(
-                            input_file, 
-                            ticker, 
-                            "Ticker:"
-                        )
+                    steps = CSVProcessor.build_statement_pipeline(ticker, statement)
+                    processed_files[statement] = TransformPipeline(steps).run(source, output_file)
+                    logger.info(f"Processed {statement} for {ticker} into {output_file.name}")
                         
                 except Exception as e:
                     logger.error(f"Failed to process {statement} for {ticker}: {e}")
-                    processed_files[statement.lower().replace(' ', '_')] = input_file
+                    if not isinstance(source, Path):
+                        # A raw file already on disk is from an earlier fetch
+                        input_file.write_bytes(source)
+                    if input_file.exists():
+                        processed_files[statement.lower().replace(' ', '_')] = input_file
             else:
                 logger.warning(f"File not found: {input_file}")
         
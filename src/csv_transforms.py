@@ -0,0 +1,139 @@
+import csv
+import io
+import os
+import tempfile
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+class RowTransform(ABC):
+    """A cleaning step applied to each CSV row as it streams through a TransformPipeline"""
+    
+    @abstractmethod
+    def __call__(self, row: List[str], row_number: int) -> Optional[List[str]]:
+        """
+        Transform one row
+        
+        Args:
+            row: Cells of the row (may be modified in place)
+            row_number: Zero-based row number, 0 being the header row
+        
+        Returns:
+            Transformed row, or None to drop it
+        """
+
+class DropColumn(RowTransform):
+    """Removes the column at a given index"""
+    
+    def __init__(self, column_index: int):
+        self.column_index = column_index
+    
+    def __call__(self, row, row_number):
+        if len(row) > self.column_index:
+            del row[self.column_index]
+        return row
+
+class SubstituteText(RowTransform):
+    """
+    Replaces every cell holding exactly the given text (e.g. the ticker symbol with a placeholder)
+    
+    Only whole cells are matched, so a short ticker such as 'A' or 'T' leaves
+    currencies, links and line item labels that merely contain it untouched.
+    """
+    
+    def __init__(self, old_text: str, new_text: str):
+        self.old_text = old_text
+        self.new_text = new_text
+        self.replacements = 0
+    
+    def __call__(self, row, row_number):
+        for i, cell in enumerate(row):
+            if cell.strip() == self.old_text:
+                row[i] = self.new_text
+                self.replacements += 1
+        return row
+
+class NormalizeHeader(RowTransform):
+    """Strips stray whitespace and byte order marks from the header row"""
+    
+    def __call__(self, row, row_number):
+        if row_number == 0:
+            row = [cell.replace('\ufeff', '').strip() for cell in row]
+        return row
+
+class CleanNumeric(RowTransform):
+    """Trims value cells and blanks out null markers so numeric columns load cleanly"""
+    
+    NULL_VALUES = {'none', 'null', 'nan', 'n/a'}
+    
+    def __call__(self, row, row_number):
+        if row_number == 0:
+            return row
+        
+        for i, cell in enumerate(row):
+            value = cell.strip()
+            if value.lower() in self.NULL_VALUES:
+                value = ''
+            row[i] = value
+        return row
+
+class TransformPipeline:
+    """Runs a sequence of row transforms over a CSV in a single streaming pass"""
+    
+    def __init__(self, steps: List[RowTransform]):
+        """
+        Initialize the pipeline
+        
+        Args:
+            steps: Transforms applied to each row, in order
+        """
+        self.steps = steps
+    
+    def run(self, source: Union[Path, bytes, memoryview], output_file: Path) -> Path:
+        """
+        Read the source once, apply every step to each row and write the result once
+        
+        The output is written to a uniquely named temporary file and renamed into
+        place, so readers never see a partially written file and concurrent runs
+        for the same output do not share a temporary file.
+        
+        Args:
+            source: Path to the input CSV file, or its content as bytes or memoryview
+            output_file: Path to the output CSV file
+        
+        Returns:
+            Path to the output file
+        """
+        result = tempfile.NamedTemporaryFile('w', newline='', encoding='utf-8', delete=False,
+                                             dir=output_file.parent, prefix=f".{output_file.name}.",
+                                             suffix='.part')
+        temp_path = Path(result.name)
+        
+        try:
+            with self._open_source(source) as reader_file, result:
+                writer = csv.writer(result)
+                
+                for row_number, row in enumerate(csv.reader(reader_file)):
+                    for step in self.steps:
+                        row = step(row, row_number)
+                        if row is None:
+                            break
+                    else:
+                        writer.writerow(row)
+            
+            os.replace(temp_path, output_file)
+            return output_file
+        
+        except BaseException:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+    
+    @staticmethod
+    def _open_source(source: Union[Path, bytes, memoryview]):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return io.StringIO(str(source, 'utf-8-sig'), newline='')
+        return open(source, 'r', newline='', encoding='utf-8-sig')
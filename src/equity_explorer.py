@@ -1,11 +1,20 @@
 import logging
-import time
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 from config import Config
 from src.financial_data_fetcher import FinancialDataFetcher
 from src.csv_processor import CSVProcessor
+from src.parallel_csv_processor import ParallelCSVProcessor
 from src.batch_script_manager import BatchScriptManager
+from src.single_flight import SingleFlight
+from src.statement_store import StatementStore
+from src.ratio_engine import RatioEngine
+from src.screener import Screener
+from src.valuation import DCFValuation
+from src.warehouse import StatementWarehouse
+from src.pipeline_state import PipelineState
+from src.upload_delta import UploadDelta
+from src.upload_consolidator import UploadConsolidator
 
 # Set up logging
 logging.basicConfig(
@@ -23,6 +32,19 @@ class EquityExplorer:
     
     def __init__(self):
         """Initialize the EquityExplorer"""
+        self.in_flight = SingleFlight()
+        self.csv_stats = {}
+        self.statement_store = self._create_statement_store()
+        self.warehouse = StatementWarehouse() if Config.WAREHOUSE_ENABLED else None
+        self.screener = None
+        # Incremental fetching also needs the state, to tell which statements were uploaded
+        tracked = Config.SKIP_UNCHANGED or Config.INCREMENTAL_FETCH
+        self.pipeline_state = PipelineState() if tracked else None
+        # Statements found unchanged the last time each ticker was processed
+        self.unchanged = {}
+        # Statements whose last upload failed, and so must be processed again next run
+        self.failed_uploads = {}
+        
         try:
             # Validate configuration
             Config.validate_config()
@@ -32,6 +54,8 @@ class EquityExplorer:
             self.data_fetcher = FinancialDataFetcher()
             self.csv_processor = CSVProcessor()
             self.batch_manager = BatchScriptManager()
+            self.upload_delta = UploadDelta() if Config.DELTA_UPLOADS else None
+            self.upload_consolidator = UploadConsolidator() if Config.CONSOLIDATED_UPLOADS else None
             
             logger.info("EquityExplorer initialized successfully")
             
@@ -44,10 +68,24 @@ class EquityExplorer:
                 self.data_fetcher = FinancialDataFetcher()
                 self.csv_processor = CSVProcessor()
                 self.batch_manager = None  # No batch processing without Anaplan
+                self.upload_delta = None
+                self.upload_consolidator = None
                 logger.info("EquityExplorer initialized with basic functionality (no Anaplan)")
             else:
                 raise
     
+    @staticmethod
+    def _create_statement_store():
+        """Create the statement store, or None if it is disabled or pyarrow is missing"""
+        if not Config.STORE_ENABLED:
+            return None
+        
+        try:
+            return StatementStore()
+        except ImportError:
+            logger.warning("pyarrow not installed - continuing without the statement store")
+            return None
+    
     def process_single_ticker(self, ticker: str) -> Dict[str, Path]:
         """
         Process a single ticker completely
@@ -58,6 +96,11 @@ class EquityExplorer:
         Returns:
             Dictionary mapping statement types to processed file paths
         """
+        # Duplicate requests for a ticker (e.g. from the web dashboard) wait for
+        # the run already in progress and share its result
+        return dict(self.in_flight.do(ticker, self._process_single_ticker, ticker))
+    
+    def _process_single_ticker(self, ticker: str) -> Dict[str, Path]:
         logger.info(f"Starting processing for ticker: {ticker}")
         
         try:
@@ -65,63 +108,484 @@ class EquityExplorer:
             logger.info(f"Fetching financial data for {ticker}")
             file_paths = self.data_fetcher.process_ticker(ticker)
             
-            if not file_paths:
-                logger.error(f"No data fetched for {ticker}")
-                return {}
+            processed_files = self._process_fetched_ticker(ticker, file_paths)
+            self._store_statements({ticker: file_paths})
+            self._value_batch([ticker])
+            self._load_warehouse({ticker: processed_files}, {ticker: file_paths})
+            self._record_processed({ticker: file_paths}, {ticker: processed_files})
+            return processed_files
             
+        except Exception as e:
+            logger.error(f"Error processing ticker {ticker}: {e}")
+            return {}
+    
+    def _split_unchanged(self, ticker: str, file_paths: Dict[str, Union[Path, bytes]]):
+        """
+        Separate statements that need no processing from those to process
+        
+        A statement is unchanged when its processed file exists, its raw payload
+        hashes the same as the one it was last processed and uploaded from, and
+        either Config.SKIP_UNCHANGED is set or an incremental fetch found no new
+        periods.
+        
+        Args:
+            ticker: Stock ticker symbol
+            file_paths: Dictionary mapping statement types to fetched file paths or content
+            
+        Returns:
+            Tuple of the unchanged statements' processed file paths and the changed statements
+        """
+        unchanged_files = {}
+        for statement_type in file_paths:
+            processed_path = Config.OUTPUT_DIR / f"{ticker} {statement_type} New.csv"
+            if not processed_path.exists():
+                continue
+            
+            source = file_paths[statement_type]
+            recorded = (self.pipeline_state
+                        and self.pipeline_state.is_unchanged(ticker, statement_type, source))
+            if recorded and (Config.SKIP_UNCHANGED
+                             or self.data_fetcher.is_unchanged(ticker, statement_type)):
+                unchanged_files[statement_type] = processed_path
+        
+        changed = {s: v for s, v in file_paths.items() if s not in unchanged_files}
+        return unchanged_files, changed
+    
+    def _process_fetched_ticker(self, ticker: str, file_paths: Dict[str, Union[Path, bytes]],
+                                processed_files: Dict[str, Path] = None,
+                                pending_uploads: List = None) -> Dict[str, Path]:
+        """
+        Process the CSV files and run the batch scripts for an already fetched ticker
+        
+        Args:
+            ticker: Stock ticker symbol
+            file_paths: Dictionary mapping statement types to fetched file paths, or to
+                the raw content when raw statements are kept in memory
+            processed_files: Statements already transformed (e.g. by the parallel
+                processor). If None, the changed statements are processed here
+            pending_uploads: If given, the uploads are queued on the upload pool and
+                appended here instead of being waited for (see _finish_uploads). With
+                consolidated uploads, they are only prepared, to be combined with the
+                rest of the batch (see _upload_consolidated)
+            
+        Returns:
+            Dictionary mapping statement types to processed file paths
+        """
+        if not file_paths:
+            logger.error(f"No data fetched for {ticker}")
+            return {}
+        
+        # Unchanged statements keep their processed files and are not uploaded again
+        unchanged_files, changed = self._split_unchanged(ticker, file_paths)
+        self.unchanged[ticker] = list(unchanged_files)
+        if unchanged_files:
+            logger.info(f"Unchanged statements for {ticker}: {', '.join(unchanged_files)}")
+        
+        if not changed:
+            processed_files = {}
+        elif processed_files is None:
             # Step 2: Process CSV files
             logger.info(f"Processing CSV files for {ticker}")
+            contents = {s: v for s, v in changed.items() if not isinstance(v, Path)}
             processed_files = self.csv_processor.process_statement_files(
                 ticker, 
-                Config.OUTPUT_DIR
+                Config.OUTPUT_DIR,
+                list(changed),
+                contents
             )
-            
+        
+        if changed:
             # Step 3: Execute batch scripts (if Anaplan is configured)
             if self.batch_manager:
-                logger.info(f"Executing batch scripts for {ticker}")
-                self.batch_manager.execute_statement_scripts(ticker, processed_files)
+                consolidate = pending_uploads is not None and self.upload_consolidator is not None
+                upload = self._start_uploads(ticker, processed_files, submit=not consolidate)
+                if pending_uploads is not None:
+                    pending_uploads.append(upload)
+                else:
+                    self._finish_uploads([upload])
             else:
                 logger.info(f"Skipping batch scripts for {ticker} (Anaplan not configured)")
+        
+        logger.info(f"Completed processing for {ticker}")
+        return {**unchanged_files, **processed_files}
+    
+    def _start_uploads(self, ticker: str, processed_files: Dict[str, Path], submit: bool = True):
+        """
+        Queue the batch scripts for a ticker's processed statements on the upload pool
+        
+        With delta uploads, each script is pointed at a file holding only the
+        periods changed since the last successful upload, and statements with
+        no changes are not uploaded at all.
+        
+        Args:
+            ticker: Stock ticker symbol
+            processed_files: Dictionary mapping statement types to processed file paths
+            submit: Queue the uploads. If False, only the upload files are prepared
             
-            logger.info(f"Completed processing for {ticker}")
-            return processed_files
+        Returns:
+            Tuple of the ticker, its processed files, its upload files and the futures of
+            its uploads
+        """
+        uploads = processed_files
+        if self.upload_delta:
+            uploads = self.upload_delta.build_all(processed_files)
+        
+        futures = {}
+        if uploads and submit:
+            logger.info(f"Executing batch scripts for {ticker}")
+            futures = self.batch_manager.submit_statement_scripts(ticker, uploads)
+        return ticker, processed_files, uploads, futures
+    
+    def _upload_consolidated(self, pending_uploads: List,
+                             raw: Dict[str, Dict[str, Union[Path, bytes]]]) -> List:
+        """
+        Upload a batch's statements as one combined file per statement type
+        
+        Each import process then runs once for the batch instead of once per
+        ticker. Upload files that are not processed statements (a raw file
+        handed on after a failed transform) are still uploaded on their own.
+        
+        Args:
+            pending_uploads: Results of _start_uploads with submit=False
+            raw: Dictionary mapping tickers to their raw statements, for the line item labels
             
-        except Exception as e:
-            logger.error(f"Error processing ticker {ticker}: {e}")
-            return {}
+        Returns:
+            The pending uploads, each with the futures of the uploads holding its statements
+        """
+        combinable = {
+            ticker: {s: p for s, p in uploads.items()
+                     if p.name.endswith((' New.csv', ' Delta.csv'))}
+            for ticker, _, uploads, _ in pending_uploads
+        }
+        
+        combined_futures = {}
+        if any(combinable.values()):
+            combined = self.upload_consolidator.consolidate(combinable, raw)
+            logger.info(f"Executing batch scripts for {len(combined)} combined statement files")
+            combined_futures = self.batch_manager.submit_statement_scripts(
+                self.upload_consolidator.name, combined)
+        
+        queued = []
+        for ticker, processed_files, uploads, _ in pending_uploads:
+            own = {s: p for s, p in uploads.items() if s not in combinable[ticker]}
+            futures = self.batch_manager.submit_statement_scripts(ticker, own) if own else {}
+            futures.update({s: combined_futures[s] for s in combinable[ticker]
+                            if s in combined_futures})
+            queued.append((ticker, processed_files, uploads, futures))
+        return queued
+    
+    def _finish_uploads(self, uploads: List) -> None:
+        """
+        Wait for queued uploads and record which statements were uploaded
+        
+        Args:
+            uploads: Results of _start_uploads
+        """
+        for ticker, processed_files, _, futures in uploads:
+            failed = []
+            for statement_type, future in futures.items():
+                try:
+                    if not future.result():
+                        failed.append(statement_type)
+                except Exception as e:
+                    logger.error(f"Upload of {statement_type} for {ticker} failed: {e}")
+                    failed.append(statement_type)
+            self.failed_uploads[ticker] = failed
+            if self.pipeline_state:
+                # Not skipped by a later run, even if it fetches the same payload
+                for statement_type in failed:
+                    self.pipeline_state.discard(ticker, statement_type)
+            
+            if self.upload_delta:
+                for statement_type, processed_file in processed_files.items():
+                    if statement_type not in failed:
+                        self.upload_delta.commit(processed_file)
     
-    def process_multiple_tickers(self, tickers: List[str]) -> Dict[str, Dict[str, Path]]:
+    def process_multiple_tickers(self, tickers: List[str],
+                                 parallel: bool = None) -> Dict[str, Dict[str, Path]]:
         """
         Process multiple tickers
         
+        Statements for all tickers are downloaded concurrently first, then each
+        ticker's files are processed in turn while their uploads run on the upload pool.
+        
         Args:
             tickers: List of stock ticker symbols
+            parallel: Transform the CSV files of all tickers on a process pool before
+                uploading. If None, uses Config.PARALLEL_CSV
             
         Returns:
             Dictionary mapping tickers to their processed file paths
         """
         logger.info(f"Starting batch processing for {len(tickers)} tickers")
         
+        # Step 1: Fetch financial data for every ticker at once
+        fetched = self.data_fetcher.process_tickers(tickers)
+        
+        return self._process_fetched_tickers(tickers, fetched, parallel)
+    
+    def process_bulk_tickers(self, tickers: List[str], years: List[int], period: str = 'annual',
+                             source_files: Dict[str, List[Path]] = None,
+                             parallel: bool = None) -> Dict[str, Dict[str, Path]]:
+        """
+        Process multiple tickers using whole-universe bulk statement files
+        
+        Args:
+            tickers: List of stock ticker symbols
+            years: Fiscal years to fetch
+            period: 'annual' or 'quarter'
+            source_files: Pre-downloaded bulk files per statement type
+            parallel: Transform the CSV files on a process pool. If None, uses Config.PARALLEL_CSV
+            
+        Returns:
+            Dictionary mapping tickers to their processed file paths
+        """
+        logger.info(f"Starting bulk processing for {len(tickers)} tickers")
+        # Bulk files list tickers in upper case
+        tickers = [ticker.upper() for ticker in tickers]
+        
+        # Step 1: Fetch one bulk file per statement type and split it per ticker
+        fetched = self.data_fetcher.fetch_bulk_statements(years, period, tickers, source_files)
+        
+        return self._process_fetched_tickers(tickers, fetched, parallel)
+    
+    def process_csv_parallel(self, fetched: Dict[str, Dict[str, Union[Path, bytes]]]
+                             ) -> Dict[str, Dict[str, Path]]:
+        """
+        Transform the changed statement files of many tickers on a process pool
+        
+        Args:
+            fetched: Dictionary mapping tickers to their fetched statement file paths or content
+            
+        Returns:
+            Dictionary mapping tickers to their processed file paths
+        """
+        changed = {ticker: self._split_unchanged(ticker, file_paths)[1]
+                   for ticker, file_paths in fetched.items()}
+        
+        processor = ParallelCSVProcessor()
+        results = processor.process(changed, Config.OUTPUT_DIR)
+        self.csv_stats = processor.last_run
+        return results
+    
+    def _process_fetched_tickers(self, tickers: List[str],
+                                 fetched: Dict[str, Dict[str, Union[Path, bytes]]],
+                                 parallel: bool = None) -> Dict[str, Dict[str, Path]]:
+        """
+        Process the fetched statement files of each ticker in turn and upload them on the
+        upload pool
+        
+        Args:
+            tickers: List of stock ticker symbols
+            fetched: Dictionary mapping tickers to their fetched statement file paths
+            parallel: Transform all CSV files on a process pool first. If None, uses
+                Config.PARALLEL_CSV
+            
+        Returns:
+            Dictionary mapping tickers to their processed file paths
+        """
         results = {}
+        if parallel is None:
+            parallel = Config.PARALLEL_CSV
         
+        # Step 2 for every ticker at once, leaving only the uploads to the loop
+        processed = None
+        if parallel:
+            processed = self.process_csv_parallel({t: fetched.get(t, {}) for t in tickers})
+        
+        # Uploads of all tickers run on the upload pool while later tickers are processed
+        pending_uploads = []
         for i, ticker in enumerate(tickers, 1):
             logger.info(f"Processing ticker {i}/{len(tickers)}: {ticker}")
             
             try:
-                file_paths = self.process_single_ticker(ticker)
+                file_paths = self._process_fetched_ticker(
+                    ticker,
+                    fetched.get(ticker, {}),
+                    processed.get(ticker) if processed is not None else None,
+                    pending_uploads
+                )
                 results[ticker] = file_paths
                 
-                # Add delay between tickers to be respectful to APIs
-                if i < len(tickers):
-                    time.sleep(Config.RETRY_DELAY)
-                    
             except Exception as e:
                 logger.error(f"Failed to process {ticker}: {e}")
                 results[ticker] = {}
         
-        logger.info(f"Completed batch processing. Successfully processed {len([r for r in results.values() if r])} tickers")
+        if self.upload_consolidator is not None and pending_uploads:
+            pending_uploads = self._upload_consolidated(pending_uploads, fetched)
+        self._finish_uploads(pending_uploads)
+        
+        self._store_statements({ticker: fetched.get(ticker, {}) for ticker in tickers})
+        self._value_batch(tickers)
+        self._load_warehouse(results, fetched)
+        self._record_processed(fetched, results)
+        
+        succeeded = [ticker for ticker in results if results[ticker]]
+        unchanged_count = sum(len(self.unchanged.get(ticker, [])) for ticker in succeeded)
+        statement_count = sum(len(files) for files in results.values())
+        logger.info(f"Completed batch processing. Successfully processed {len(succeeded)} tickers "
+                    f"({statement_count - unchanged_count} statements processed, "
+                    f"{unchanged_count} unchanged)")
         return results
     
+    def _store_statements(self, fetched: Dict[str, Dict[str, Union[Path, bytes]]]) -> None:
+        """
+        Append the changed statements of the given tickers to the statement store
+        
+        Args:
+            fetched: Dictionary mapping tickers to their fetched statement file paths or content
+        """
+        if not self.statement_store:
+            return
+        
+        changed = {ticker: self._split_unchanged(ticker, file_paths)[1]
+                   for ticker, file_paths in fetched.items()}
+        try:
+            if self.statement_store.ingest(changed):
+                # Keep the ratio table and screener indexes in step with the store
+                self.compute_ratios([ticker for ticker, sources in changed.items() if sources])
+        except Exception as e:
+            logger.error(f"Error updating statement store: {e}")
+    
+    def _value_batch(self, tickers: List[str]) -> None:
+        """
+        Value a batch of tickers from the statement store when Config.VALUATION_ENABLED is set
+        
+        Args:
+            tickers: List of stock ticker symbols in the batch
+        """
+        if not Config.VALUATION_ENABLED:
+            return
+        
+        try:
+            self.run_valuations(tickers)
+        except Exception as e:
+            logger.error(f"Error running valuations: {e}")
+    
+    def _load_warehouse(self, processed: Dict[str, Dict[str, Path]],
+                        fetched: Dict[str, Dict[str, Union[Path, bytes]]]) -> None:
+        """
+        Bulk-load the processed statement files of a batch into the warehouse
+        
+        Args:
+            processed: Dictionary mapping tickers to their processed file paths
+            fetched: Dictionary mapping tickers to their raw statements, for the line item labels
+        """
+        if not self.warehouse:
+            return
+        
+        try:
+            self.warehouse.load(processed, fetched)
+        except Exception as e:
+            logger.error(f"Error loading the warehouse: {e}")
+    
+    def _record_processed(self, fetched: Dict[str, Dict[str, Union[Path, bytes]]],
+                          processed: Dict[str, Dict[str, Path]]) -> None:
+        """
+        Remember the raw payloads that the newly processed and uploaded statements came from
+        
+        Statements whose upload failed are left out, so they are retried. Called
+        once the batch is fully processed, so the unchanged checks made while
+        processing it all see the previous state.
+        
+        Args:
+            fetched: Dictionary mapping tickers to their raw statement file paths or content
+            processed: Dictionary mapping tickers to their processed file paths
+        """
+        if not self.pipeline_state:
+            return
+        
+        for ticker, file_paths in processed.items():
+            skipped = self.unchanged.get(ticker, []) + self.failed_uploads.get(ticker, [])
+            for statement_type, processed_path in file_paths.items():
+                source = fetched.get(ticker, {}).get(statement_type)
+                # A failed transform falls back to the raw file, which must be processed again
+                if (source is None or statement_type in skipped
+                        or not processed_path.name.endswith(' New.csv')):
+                    continue
+                self.pipeline_state.update(ticker, statement_type, source)
+        
+        try:
+            self.pipeline_state.save()
+        except OSError as e:
+            logger.error(f"Error saving pipeline state: {e}")
+    
+    def compute_ratios(self, tickers: List[str] = None) -> Optional[Path]:
+        """
+        Compute the ratio table from the statement store and write it to Config.RATIOS_FILE
+        
+        The screener indexes are rebuilt from the table as well.
+        
+        Args:
+            tickers: Only recompute these tickers, keeping the other tickers' saved rows.
+                If None, recomputes every ticker in the store
+            
+        Returns:
+            Path to the ratio table, or None if the statement store is not available
+        """
+        if not self.statement_store:
+            logger.warning("Statement store not available - skipping ratio computation")
+            return None
+        
+        engine = RatioEngine()
+        ratios = engine.compute_from_store(self.statement_store, tickers)
+        if tickers is not None:
+            ratios = engine.merge(ratios, tickers)
+        
+        screener = Screener.build(ratios)
+        screener.save()
+        self.screener = screener
+        
+        return engine.save(ratios)
+    
+    def run_valuations(self, tickers: List[str] = None) -> Optional[Path]:
+        """
+        Run the Monte Carlo DCF valuation from the statement store and write it to
+        Config.VALUATION_FILE
+        
+        Args:
+            tickers: Only value these tickers, keeping the other tickers' saved rows.
+                If None, values every ticker in the store
+            
+        Returns:
+            Path to the valuation table, or None if the statement store is not available
+        """
+        if not self.statement_store:
+            logger.warning("Statement store not available - skipping valuations")
+            return None
+        
+        valuation = DCFValuation()
+        results = valuation.value_from_store(self.statement_store, tickers)
+        if tickers is not None:
+            results = valuation.merge(results, tickers)
+        return valuation.save(results)
+    
+    def screen(self, conditions: List[str], sort_by: str = None, limit: int = None):
+        """
+        Screen the universe on the latest ratio values
+        
+        Args:
+            conditions: Conditions that must all hold,
+                e.g. ['net_margin > 20%', 'debt_to_equity < 0.5']
+            sort_by: Ratio to order the result by (descending)
+            limit: Maximum number of rows returned
+            
+        Returns:
+            DataFrame with ticker, period and the ratios used in the query
+            
+        Raises:
+            RuntimeError: If no screener index has been built yet
+            ValueError: If a condition cannot be parsed
+            KeyError: If a condition uses an unknown ratio
+        """
+        if self.screener is None:
+            self.screener = Screener.load()
+            if self.screener is None:
+                raise RuntimeError("No screener index yet - fetch some tickers "
+                                   "or run 'cli.py ratios' first")
+        
+        return self.screener.screen(conditions, sort_by, limit)
+    
     def process_utility_files(self) -> None:
         """Process utility files (stocks and date)"""
         logger.info("Processing utility files")
@@ -169,6 +633,9 @@ class EquityExplorer:
             tickers = Config.DEFAULT_STOCKS
         
         logger.info(f"Starting full equity analysis for {len(tickers)} tickers")
+        self.data_fetcher.reset_transfer_stats()
+        if self.batch_manager:
+            self.batch_manager.reset_job_stats()
         
         try:
             # Process all tickers
@@ -177,6 +644,30 @@ class EquityExplorer:
             # Process utility files
             self.process_utility_files()
             
+            cache_stats = self.data_fetcher.get_cache_stats()
+            if cache_stats:
+                logger.info(f"Response cache: {cache_stats['hits']} hits, "
+                            f"{cache_stats['misses']} misses, "
+                            f"{cache_stats['revalidated']} revalidated")
+            
+            transfer_stats = self.data_fetcher.get_transfer_stats()
+            logger.info(f"HTTP transfer: {transfer_stats['requests']} requests, "
+                        f"{transfer_stats['bytes_on_wire']} bytes on the wire, "
+                        f"{transfer_stats['bytes_decoded']} bytes decoded")
+            if 'connections_opened' in transfer_stats:
+                logger.info(f"HTTP connections: {transfer_stats['connections_opened']} opened, "
+                            f"{transfer_stats['connections_reused']} reused")
+            
+            job_stats = self.batch_manager.get_job_stats() if self.batch_manager else {}
+            if job_stats.get('jobs'):
+                logger.info(f"Script jobs: {job_stats['jobs']} run, "
+                            f"{job_stats['succeeded']} succeeded, {job_stats['failed']} failed, "
+                            f"{job_stats['timed_out']} timed out; "
+                            f"{job_stats['total_seconds']:.1f}s total, "
+                            f"{job_stats['mean_seconds']:.1f}s mean, "
+                            f"{job_stats['max_seconds']:.1f}s longest; "
+                            f"exit codes {job_stats['exit_codes']}")
+            
             logger.info("Full equity analysis completed successfully")
             return results
             
@@ -1,9 +1,23 @@
-import requests
+import os
+import shutil
+import tempfile
+import threading
 import time
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
+from urllib.parse import urlparse
 from config import Config
+import requests
+from src.async_fetcher import AsyncFetchEngine
+from src.http_transport import HttpTransport
+from src.rate_limiter import get_rate_limiter
+from src.raw_archive import RawArchive
+from src.response_cache import ResponseCache
+from src.retry_policy import RetryPolicy, get_circuit_breaker
+from src.bulk_statement_splitter import BulkStatementSplitter
+from src.statement_history import StatementHistory
+from src.single_flight import SingleFlight
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -12,54 +26,244 @@ logger = logging.getLogger(__name__)
 class FinancialDataFetcher:
     """Handles fetching financial data from Financial Modeling Prep API"""
     
+    # Statement names used in filenames mapped to their API endpoints
+    STATEMENT_ENDPOINTS = {
+        'income_statement': 'income-statement',
+        'cash_flow': 'cash-flow-statement',
+        'balance_sheet': 'balance-sheet-statement'
+    }
+    
     def __init__(self):
         self.api_key = Config.FINANCIAL_MODELING_PREP_API_KEY
         self.base_url = Config.FINANCIAL_MODELING_PREP_BASE_URL
-        self.session = requests.Session()
+        self.transport = HttpTransport()
+        self.session = self.transport.session
+        self.rate_limiter = get_rate_limiter(
+            'fmp',
+            Config.API_REQUESTS_PER_SECOND,
+            Config.API_REQUESTS_PER_MINUTE
+        )
+        self.cache = ResponseCache() if Config.CACHE_ENABLED else None
+        self.archive = RawArchive() if Config.ARCHIVE_ENABLED else None
+        self.retry_policy = RetryPolicy()
+        self.host = urlparse(self.base_url).netloc
+        self.circuit_breaker = get_circuit_breaker(self.host)
+        self.unchanged_statements = set()
+        self.unchanged_lock = threading.Lock()
+        self.in_flight = SingleFlight()
         
-    def fetch_financial_statement(self, ticker: str, statement_type: str) -> Optional[bytes]:
+    def fetch_financial_statement(self, ticker: str, statement_type: str,
+                                  params: Dict[str, str] = None) -> Optional[bytes]:
         """
         Fetch financial statement data for a given ticker
         
+        Responses are served from the on-disk cache while fresh and revalidated
+        with ETag/Last-Modified once they expire.
+        
         Args:
             ticker: Stock ticker symbol
             statement_type: Type of statement ('income-statement', 'cash-flow-statement', 'balance-sheet-statement')
+            params: Extra query parameters (e.g. 'period', 'limit')
             
         Returns:
             Response content as bytes or None if failed
         """
-        url = f"{self.base_url}/{statement_type}/{ticker}"
+        return self._fetch(ticker, statement_type, params)
+    
+    def download_financial_statement(self, ticker: str, statement_type: str, destination: Path,
+                                     params: Dict[str, str] = None) -> Optional[Path]:
+        """
+        Stream financial statement data for a given ticker straight to disk
+        
+        The body is written in chunks to a temporary file next to the destination
+        and renamed into place once complete, so memory use does not grow with
+        the size of the statement and readers never see a partial file.
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Type of statement ('income-statement', 'cash-flow-statement', 'balance-sheet-statement')
+            destination: Path of the file to create
+            params: Extra query parameters (e.g. 'period', 'limit')
+            
+        Returns:
+            Path to the downloaded file or None if failed
+        """
+        return self._fetch(ticker, statement_type, params, destination)
+    
+    def _fetch(self, ticker: str, statement_type: str, params: Dict[str, str] = None,
+               destination: Path = None, url: str = None):
+        """
+        Run a cached, rate limited and retried statement request
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Type of statement
+            params: Extra query parameters
+            destination: File to stream the body into. If None, the body is returned as bytes
+            url: Request URL. If None, uses the per-ticker statement endpoint
+            
+        Returns:
+            Body as bytes (or destination path when streaming), None if failed
+        """
+        url = url or f"{self.base_url}/{statement_type}/{ticker}"
         params = {
             'datatype': 'csv',
+            **(params or {}),
             'apikey': self.api_key
         }
         
-        for attempt in range(Config.MAX_RETRIES):
+        cache_key = None
+        headers = {}
+        if self.cache:
+            cache_key = self.cache.make_key(ticker, statement_type, params)
+            cached_path = self.cache.get_file(cache_key)
+            if cached_path is not None:
+                logger.info(f"Using cached {statement_type} for {ticker}")
+                return self._from_cache(cached_path, destination)
+            headers = self.cache.validation_headers(cache_key)
+        
+        for attempt in range(self.retry_policy.max_retries):
+            if not self.circuit_breaker.allow_request():
+                logger.error(f"Circuit breaker open for {self.host}, "
+                             f"skipping {statement_type} for {ticker}")
+                return None
+            
+            retry_after = None
             try:
                 logger.info(f"Fetching {statement_type} for {ticker} (attempt {attempt + 1})")
-                response = self.session.get(url, params=params, timeout=30)
-                response.raise_for_status()
-                
-                # Check if response contains error message
-                if 'contact' in response.text.lower():
-                    logger.warning(f"API returned error message for {ticker} {statement_type}")
-                    if attempt < Config.MAX_RETRIES - 1:
-                        time.sleep(Config.RETRY_DELAY)
+                self.rate_limiter.acquire()
+                with self.transport.get(url, params=params, headers=headers) as response:
+                    
+                    if response.status_code == 304 and cache_key:
+                        self.circuit_breaker.record_success()
+                        cached_path = self.cache.revalidate_file(cache_key)
+                        if cached_path is not None:
+                            logger.info(f"{statement_type} for {ticker} not modified, using cache")
+                            return self._from_cache(cached_path, destination)
+                        headers = {}
                         continue
-                    return None
-                
-                logger.info(f"Successfully fetched {statement_type} for {ticker}")
-                return response.content
+                    
+                    if response.status_code >= 400:
+                        if not self.retry_policy.is_retryable(response.status_code):
+                            # The API is healthy, this request just cannot succeed
+                            self.circuit_breaker.record_success()
+                            logger.error(f"HTTP {response.status_code} fetching {statement_type} "
+                                         f"for {ticker}, not retrying")
+                            return None
+                        
+                        self.circuit_breaker.record_failure()
+                        retry_after = response.headers.get('Retry-After')
+                        logger.warning(f"HTTP {response.status_code} fetching {statement_type} "
+                                       f"for {ticker}")
+                    
+                    else:
+                        if destination is None:
+                            result = response.content
+                            is_error = self._is_error_payload(result[:Config.ERROR_SNIFF_BYTES])
+                            size = len(result)
+                        else:
+                            result = self._stream_to_file(response, destination)
+                            is_error = result is None
+                            size = 0 if is_error else destination.stat().st_size
+                        self.transport.record_decoded(size)
+                        
+                        # Check if response contains error message
+                        if is_error:
+                            self.circuit_breaker.record_failure()
+                            logger.warning(
+                                f"API returned error message for {ticker} {statement_type}")
+                        else:
+                            self.circuit_breaker.record_success()
+                            logger.info(f"Successfully fetched {statement_type} for {ticker}")
+                            if cache_key:
+                                self._store_in_cache(cache_key, result, response)
+                            return result
                 
             except requests.exceptions.RequestException as e:
+                self.circuit_breaker.record_failure()
                 logger.error(f"Error fetching {statement_type} for {ticker}: {e}")
-                if attempt < Config.MAX_RETRIES - 1:
-                    time.sleep(Config.RETRY_DELAY)
-                    continue
-                return None
+            except Exception:
+                # Any other error still ends the request, so a half-open trial is released
+                self.circuit_breaker.record_failure()
+                raise
+            
+            if attempt < self.retry_policy.max_retries - 1:
+                time.sleep(self.retry_policy.get_delay(attempt, retry_after))
         
         return None
     
+    @staticmethod
+    def _is_error_payload(head: bytes) -> bool:
+        """Check the start of a response body for an API error message"""
+        return b'contact' in head.lower()
+    
+    def _stream_to_file(self, response: requests.Response, destination: Path) -> Optional[Path]:
+        """
+        Write a response body to a temporary file and atomically rename it into place
+        
+        Args:
+            response: Streaming response
+            destination: Final path of the file
+            
+        Returns:
+            Destination path, or None if the body is an API error message
+        """
+        temp_name = self._temp_path_for(destination)
+        try:
+            with open(temp_name, 'wb') as f:
+                head = b''
+                checked = False
+                for chunk in response.iter_content(chunk_size=Config.DOWNLOAD_CHUNK_SIZE):
+                    if not checked:
+                        head += chunk
+                        if len(head) >= Config.ERROR_SNIFF_BYTES:
+                            if self._is_error_payload(head):
+                                os.unlink(temp_name)
+                                return None
+                            checked = True
+                    f.write(chunk)
+                
+                if not checked and self._is_error_payload(head):
+                    os.unlink(temp_name)
+                    return None
+            
+            os.replace(temp_name, destination)
+            return destination
+            
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+            raise
+    
+    def _from_cache(self, cached_path: Path, destination: Path = None):
+        """Return a cached body as bytes, or copy it to the destination file"""
+        if destination is None:
+            with open(cached_path, 'rb') as f:
+                return f.read()
+        
+        temp_path = self._temp_path_for(destination)
+        shutil.copyfile(cached_path, temp_path)
+        os.replace(temp_path, destination)
+        return destination
+    
+    @staticmethod
+    def _temp_path_for(destination: Path) -> str:
+        """Create a unique temporary file next to the destination for an atomic rename"""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=destination.parent, prefix=f".{destination.name}.",
+                                         suffix='.part')
+        os.close(fd)
+        return temp_name
+    
+    def _store_in_cache(self, cache_key: str, result, response: requests.Response) -> None:
+        """Store a successful body (bytes or downloaded file) in the response cache"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if isinstance(result, Path):
+            self.cache.put_file(cache_key, result, etag=etag, last_modified=last_modified)
+        else:
+            self.cache.put(cache_key, result, etag=etag, last_modified=last_modified)
+    
     def fetch_all_statements(self, ticker: str) -> Dict[str, Optional[bytes]]:
         """
         Fetch all three financial statements for a ticker
@@ -70,19 +274,77 @@ class FinancialDataFetcher:
         Returns:
             Dictionary with statement types as keys and content as values
         """
-        statements = {
-            'income_statement': 'income-statement',
-            'cash_flow': 'cash-flow-statement',
-            'balance_sheet': 'balance-sheet-statement'
-        }
-        
         results = {}
-        for name, endpoint in statements.items():
+        for name, endpoint in self.STATEMENT_ENDPOINTS.items():
             content = self.fetch_financial_statement(ticker, endpoint)
             results[name] = content
             
         return results
     
+    def fetch_bulk_statements(self, years: List[int], period: str = 'annual',
+                              tickers: Optional[List[str]] = None,
+                              source_files: Optional[Dict[str, List[Path]]] = None
+                              ) -> Dict[str, Dict[str, Path]]:
+        """
+        Fetch whole-universe statement files and split them into per-ticker files
+        
+        One bulk file is downloaded per statement type and year instead of one
+        request per ticker and statement, then split in a single streaming pass
+        into the usual "{ticker} {statement_type}.csv" files.
+        
+        Args:
+            years: Fiscal years to fetch
+            period: 'annual' or 'quarter'
+            tickers: Only write files for these tickers. If None, writes every ticker in the
+                bulk files
+            source_files: Pre-downloaded bulk files per statement type; these types are not fetched
+            
+        Returns:
+            Dictionary mapping tickers, upper-cased as in the bulk files, to their statement
+            file paths
+        """
+        source_files = source_files or {}
+        splitter = BulkStatementSplitter(Config.OUTPUT_DIR)
+        results = {ticker.upper(): {} for ticker in tickers} if tickers is not None else {}
+        
+        for statement_type, endpoint in Config.BULK_ENDPOINTS.items():
+            sources = source_files.get(statement_type)
+            
+            if sources is None:
+                sources = []
+                for year in years:
+                    destination = Config.BULK_DIR / f"{endpoint}-{year}-{period}.csv"
+                    logger.info(f"Fetching {endpoint} for {year} ({period})")
+                    filepath = self._fetch(
+                        'bulk',
+                        endpoint,
+                        {'year': year, 'period': period},
+                        destination,
+                        url=f"{Config.FINANCIAL_MODELING_PREP_BULK_URL}/{endpoint}"
+                    )
+                    if filepath:
+                        sources.append(filepath)
+                    else:
+                        logger.error(f"Failed to fetch {endpoint} for {year}")
+            
+            if not sources:
+                continue
+            
+            try:
+                split_files = splitter.split(sources, statement_type, tickers)
+            except Exception as e:
+                logger.error(f"Error splitting {statement_type} bulk data: {e}")
+                continue
+            
+            for ticker, filepath in split_files.items():
+                results.setdefault(ticker, {})[statement_type] = filepath
+                if self.archive:
+                    self.archive.record(ticker, statement_type, filepath)
+        
+        self._flush()
+        
+        return results
+    
     def save_statement(self, ticker: str, statement_type: str, content: bytes) -> Path:
         """
         Save financial statement content to a CSV file
@@ -96,63 +358,244 @@ class FinancialDataFetcher:
             Path to saved file
         """
         Config.create_directories()
-        filename = f"{ticker} {statement_type}.csv"
-        filepath = Config.OUTPUT_DIR / filename
+        filepath = self.get_statement_path(ticker, statement_type)
         
-        with open(filepath, 'wb') as f:
+        temp_path = self._temp_path_for(filepath)
+        with open(temp_path, 'wb') as f:
             f.write(content)
+        os.replace(temp_path, filepath)
+        
+        logger.info(f"Saved {filepath.name} to {filepath}")
+        return filepath
+    
+    @staticmethod
+    def get_statement_path(ticker: str, statement_type: str) -> Path:
+        """
+        Get the output path of a raw statement file
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Type of statement
+            
+        Returns:
+            Path in the output directory
+        """
+        return Config.OUTPUT_DIR / f"{ticker} {statement_type}.csv"
+    
+    def fetch_statement(self, ticker: str, statement_type: str,
+                        endpoint: str) -> Optional[Union[Path, bytes]]:
+        """
+        Fetch a single statement for the CSV processor
+        
+        With Config.PERSIST_RAW_STATEMENTS the raw statement is saved to the
+        output directory and its path returned; otherwise the response is
+        returned as bytes and never written to disk. Incremental fetching
+        merges into the files on disk, so it always persists them. With
+        Config.ARCHIVE_ENABLED the statement is also added to the raw archive.
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement name used in the output filename
+            endpoint: API endpoint for the statement
+            
+        Returns:
+            Path to the saved file or the raw content, None if the fetch failed
+        """
+        if Config.PERSIST_RAW_STATEMENTS or Config.INCREMENTAL_FETCH:
+            result = self.fetch_and_save_statement(ticker, statement_type, endpoint)
+        else:
+            self._mark_unchanged(ticker, statement_type, False)
+            result = self.in_flight.do(
+                ('content', ticker, statement_type),
+                self.fetch_financial_statement,
+                ticker,
+                endpoint
+            )
+        
+        if result and self.archive:
+            self.archive.record(ticker, statement_type, result)
+        return result
+    
+    def fetch_and_save_statement(self, ticker: str, statement_type: str,
+                                 endpoint: str) -> Optional[Path]:
+        """
+        Fetch a single statement and save it to the output directory
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement name used in the output filename
+            endpoint: API endpoint for the statement
+            
+        Returns:
+            Path to saved file or None if the fetch failed
+        """
+        # Concurrent callers asking for the same statement share one download
+        return self.in_flight.do(
+            ('statement', ticker, statement_type),
+            self._fetch_and_save_statement,
+            ticker,
+            statement_type,
+            endpoint
+        )
+    
+    def _fetch_and_save_statement(self, ticker: str, statement_type: str,
+                                  endpoint: str) -> Optional[Path]:
+        if Config.INCREMENTAL_FETCH:
+            return self.fetch_incremental_statement(ticker, statement_type, endpoint)
+        
+        self._mark_unchanged(ticker, statement_type, False)
+        
+        if Config.STREAM_DOWNLOADS:
+            filepath = self.download_financial_statement(
+                ticker,
+                endpoint,
+                self.get_statement_path(ticker, statement_type)
+            )
+            if filepath:
+                logger.info(f"Saved {filepath.name} to {filepath}")
+            return filepath
+        
+        content = self.fetch_financial_statement(ticker, endpoint)
+        if not content:
+            return None
+        
+        return self.save_statement(ticker, statement_type, content)
+    
+    def fetch_incremental_statement(self, ticker: str, statement_type: str,
+                                    endpoint: str) -> Optional[Path]:
+        """
+        Fetch only the most recent periods of a statement and merge new ones into the file on disk
+        
+        When no history exists yet, the full statement is fetched instead.
+        Statements that gained no new period are reported by is_unchanged().
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement name used in the output filename
+            endpoint: API endpoint for the statement
+            
+        Returns:
+            Path to the up-to-date statement file or None if the fetch failed
+        """
+        filepath = self.get_statement_path(ticker, statement_type)
+        params = {'period': Config.STATEMENT_PERIOD}
+        
+        latest = StatementHistory.latest_period(filepath)
+        if not latest:
+            self._mark_unchanged(ticker, statement_type, False)
+            content = self.fetch_financial_statement(ticker, endpoint, params)
+            return self.save_statement(ticker, statement_type, content) if content else None
+        
+        logger.info(f"Latest {statement_type} period on disk for {ticker}: {latest}")
+        params['limit'] = Config.INCREMENTAL_PERIODS
+        content = self.fetch_financial_statement(ticker, endpoint, params)
+        if not content:
+            return None
+        
+        new_periods = StatementHistory.merge(filepath, content)
+        self._mark_unchanged(ticker, statement_type, not new_periods)
+        if not new_periods:
+            logger.info(f"No new {statement_type} periods for {ticker}")
         
-        logger.info(f"Saved {filename} to {filepath}")
         return filepath
     
-    def process_ticker(self, ticker: str) -> Dict[str, Path]:
+    def is_unchanged(self, ticker: str, statement_type: str) -> bool:
+        """
+        Check whether the last incremental fetch of a statement found no new periods
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement name used in the output filename
+            
+        Returns:
+            True if the statement file on disk was left as it was
+        """
+        with self.unchanged_lock:
+            return (ticker, statement_type) in self.unchanged_statements
+    
+    def _mark_unchanged(self, ticker: str, statement_type: str, unchanged: bool) -> None:
+        with self.unchanged_lock:
+            if unchanged:
+                self.unchanged_statements.add((ticker, statement_type))
+            else:
+                self.unchanged_statements.discard((ticker, statement_type))
+    
+    def process_ticker(self, ticker: str) -> Dict[str, Union[Path, bytes]]:
         """
         Process a single ticker by fetching and saving all statements
         
+        Concurrent calls for the same ticker wait for the one already running
+        and share its result instead of fetching and writing the files again.
+        
         Args:
             ticker: Stock ticker symbol
             
         Returns:
-            Dictionary mapping statement types to file paths
+            Dictionary mapping statement types to file paths (or raw content
+            when Config.PERSIST_RAW_STATEMENTS is off)
         """
+        return dict(self.in_flight.do(('ticker', ticker), self._process_ticker, ticker))
+    
+    def _process_ticker(self, ticker: str) -> Dict[str, Union[Path, bytes]]:
         logger.info(f"Processing ticker: {ticker}")
         
-        # Fetch all statements
-        statements = self.fetch_all_statements(ticker)
-        
-        # Save statements and collect file paths
+        # Fetch all statements, collecting file paths (or content)
         file_paths = {}
-        for statement_type, content in statements.items():
-            if content:
-                filepath = self.save_statement(ticker, statement_type, content)
+        for statement_type, endpoint in self.STATEMENT_ENDPOINTS.items():
+            filepath = self.fetch_statement(ticker, statement_type, endpoint)
+            if filepath:
                 file_paths[statement_type] = filepath
             else:
                 logger.error(f"Failed to fetch {statement_type} for {ticker}")
         
+        self._flush()
+        
         return file_paths
     
-    def process_tickers(self, tickers: List[str]) -> Dict[str, Dict[str, Path]]:
+    def process_tickers(self, tickers: List[str]) -> Dict[str, Dict[str, Union[Path, bytes]]]:
         """
-        Process multiple tickers
+        Process multiple tickers, downloading statements concurrently
         
         Args:
             tickers: List of stock ticker symbols
             
         Returns:
-            Dictionary mapping tickers to their statement file paths
+            Dictionary mapping tickers to their statement file paths (or raw
+            content when Config.PERSIST_RAW_STATEMENTS is off)
         """
-        results = {}
+        try:
+            return AsyncFetchEngine(self).process_tickers(tickers)
+        except Exception as e:
+            logger.error(f"Error processing tickers: {e}")
+            return {ticker: {} for ticker in tickers}
+        finally:
+            self._flush()
+    
+    def _flush(self) -> None:
+        """Persist the cache index and close the archive run at the end of a fetch"""
+        if self.cache:
+            self.cache.flush()
+        if self.archive:
+            self.archive.flush()
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """
+        Get response cache counters
         
-        for ticker in tickers:
-            try:
-                file_paths = self.process_ticker(ticker)
-                results[ticker] = file_paths
-                
-                # Add delay between requests to be respectful to API
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error processing ticker {ticker}: {e}")
-                results[ticker] = {}
+        Returns:
+            Dictionary of hit/miss counters, empty if caching is disabled
+        """
+        return self.cache.get_stats() if self.cache else {}
+    
+    def get_transfer_stats(self) -> Dict[str, int]:
+        """
+        Get HTTP transfer counters since the last reset_transfer_stats()
         
-        return results 
\ No newline at end of file
+        Returns:
+            Dictionary with requests sent, bytes on the wire and decoded bytes
+        """
+        return self.transport.get_stats()
+    
+    def reset_transfer_stats(self) -> None:
+        """Start a new run for the HTTP transfer counters"""
+        self.transport.reset_stats()
@@ -0,0 +1,124 @@
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class HttpTransport:
+    """Pooled, compressed HTTP session with per-run transfer statistics"""
+    
+    def __init__(self, pool_size: int = None, connect_timeout: float = None,
+                 read_timeout: float = None, compression: bool = None):
+        """
+        Initialize the transport
+        
+        Args:
+            pool_size: Connections kept open per host. If None, uses Config.HTTP_POOL_SIZE,
+                falling back to Config.FETCH_CONCURRENCY
+            connect_timeout: Seconds to wait for a connection. If None, uses Config.CONNECT_TIMEOUT
+            read_timeout: Seconds to wait between bytes of the response. If None, uses Config.READ_TIMEOUT
+            compression: Ask for gzip/deflate encoded responses. If None, uses Config.HTTP_COMPRESSION
+        """
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE or Config.FETCH_CONCURRENCY
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else Config.CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else Config.READ_TIMEOUT
+        )
+        compression = compression if compression is not None else Config.HTTP_COMPRESSION
+        
+        # Retries are handled by RetryPolicy, so the adapter never retries on its own
+        self.adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size,
+                                   max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate' if compression else 'identity'
+        
+        self.lock = threading.Lock()
+        self.pool_baseline = (0, 0)
+        self.stats = {
+            'requests': 0,
+            'bytes_on_wire': 0,
+            'bytes_decoded': 0
+        }
+    
+    @contextmanager
+    def get(self, url: str, **kwargs) -> Iterator[requests.Response]:
+        """
+        Send a streaming GET request and count the body bytes read from the socket
+        
+        Args:
+            url: Request URL
+            **kwargs: Extra arguments for requests (params, headers, ...)
+        
+        Yields:
+            Response, closed (and its connection returned to the pool) on exit
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        response = self.session.get(url, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            wire_bytes = response.raw.tell() if response.raw is not None else 0
+            response.close()
+            with self.lock:
+                self.stats['requests'] += 1
+                self.stats['bytes_on_wire'] += wire_bytes
+    
+    def record_decoded(self, size: int) -> None:
+        """
+        Count the size of a body after decompression
+        
+        Args:
+            size: Decoded body size in bytes
+        """
+        with self.lock:
+            self.stats['bytes_decoded'] += size
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get transfer counters
+        
+        With Config.HTTP_KEEPALIVE_STATS, also reports how many connections were
+        opened for the requests sent, as read from the connection pools.
+        
+        Returns:
+            Dictionary of request and byte counters
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        
+        if Config.HTTP_KEEPALIVE_STATS:
+            opened, sent = self._pool_counters()
+            opened -= self.pool_baseline[0]
+            sent -= self.pool_baseline[1]
+            stats['connections_opened'] = opened
+            stats['connections_reused'] = max(0, sent - opened)
+        
+        return stats
+    
+    def reset_stats(self) -> None:
+        """Reset the byte and request counters at the start of a run"""
+        with self.lock:
+            for name in self.stats:
+                self.stats[name] = 0
+            self.pool_baseline = self._pool_counters()
+    
+    def _pool_counters(self):
+        """Total connections opened and requests sent across the host pools"""
+        pools = self.adapter.poolmanager.pools
+        opened = sent = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                sent += pool.num_requests
+        return opened, sent
+    
+    def close(self) -> None:
+        """Close pooled connections"""
+        self.session.close()
@@ -0,0 +1,97 @@
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+from config import Config
+from src.csv_processor import CSVProcessor
+
+logger = logging.getLogger(__name__)
+
+# (ticker, statement, raw content or None to read the raw file)
+StatementJob = Tuple[str, str, Union[bytes, None]]
+
+def _process_job(job: StatementJob, base_dir: Path) -> Dict[str, Path]:
+    """Transform one statement file in a worker process"""
+    ticker, statement, content = job
+    contents = {statement: content} if content is not None else None
+    return CSVProcessor.process_statement_files(ticker, base_dir, [statement], contents)
+
+class ParallelCSVProcessor:
+    """Spreads per-file statement transforms over a pool of worker processes"""
+    
+    def __init__(self, workers: int = None, chunksize: int = None):
+        """
+        Initialize the processor
+        
+        Args:
+            workers: Number of worker processes. If None, uses Config.CSV_WORKERS,
+                falling back to the number of available cores
+            chunksize: Files sent to a worker per task. If None, uses Config.CSV_CHUNKSIZE,
+                falling back to an even split of about four tasks per worker
+        """
+        self.workers = workers or Config.CSV_WORKERS or self.available_cores()
+        self.chunksize = chunksize or Config.CSV_CHUNKSIZE
+        self.last_run = {}
+    
+    @staticmethod
+    def available_cores() -> int:
+        """Number of cores this process may run on"""
+        if hasattr(os, 'sched_getaffinity'):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+    
+    def process(self, statements: Dict[str, Dict[str, Union[Path, bytes]]],
+                base_dir: Path) -> Dict[str, Dict[str, Path]]:
+        """
+        Transform the statements of many tickers in parallel
+        
+        Files are submitted to the pool in chunks and the results are collected
+        in submission order.
+        
+        Args:
+            statements: Dictionary mapping tickers to the statements to process, each
+                given as the raw file path or the raw content
+            base_dir: Directory containing the raw files and receiving the "New" files
+        
+        Returns:
+            Dictionary mapping tickers to their processed file paths
+        """
+        jobs: List[StatementJob] = [
+            (ticker, statement, None if isinstance(source, Path) else bytes(source))
+            for ticker, sources in statements.items()
+            for statement, source in sources.items()
+        ]
+        results = {ticker: {} for ticker in statements}
+        if not jobs:
+            return results
+        
+        workers = min(self.workers, len(jobs))
+        chunksize = self.chunksize or max(1, len(jobs) // (workers * 4))
+        process_job = partial(_process_job, base_dir=base_dir)
+        
+        start = time.perf_counter()
+        if workers == 1:
+            outputs = [process_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                outputs = list(executor.map(process_job, jobs, chunksize=chunksize))
+        elapsed = time.perf_counter() - start
+        
+        processed = 0
+        for job, output in zip(jobs, outputs):
+            results[job[0]].update(output)
+            processed += len(output)
+        
+        self.last_run = {
+            'files': processed,
+            'seconds': elapsed,
+            'files_per_second': processed / elapsed if elapsed > 0 else 0.0,
+            'workers': workers
+        }
+        logger.info(f"Processed {processed} files in {elapsed:.2f}s "
+                    f"({self.last_run['files_per_second']:.1f} files/sec, {workers} workers)")
+        
+        return results
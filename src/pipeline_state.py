@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class PipelineState:
+    """
+    Persistent record of the raw payload each statement was last processed from
+    
+    The state file maps "ticker/statement" to the SHA-256 of the raw statement
+    that produced the current "New" file and its uploads. A fetched statement
+    with the same hash needs neither processing nor uploading again. A
+    statement whose upload failed has no entry, so it is always redone.
+    """
+    
+    def __init__(self, state_file: Path = None):
+        """
+        Initialize the state, loading it from a previous run if present
+        
+        Args:
+            state_file: JSON state file. If None, uses Config.PIPELINE_STATE_FILE
+        """
+        self.state_file = Path(state_file or Config.PIPELINE_STATE_FILE)
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.statements = self._load()
+    
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        if not self.state_file.exists():
+            return {}
+        
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('statements', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable pipeline state {self.state_file}: {e}")
+            return {}
+    
+    @staticmethod
+    def digest(source: Union[Path, bytes]) -> str:
+        """
+        Hash a raw statement
+        
+        Args:
+            source: Raw statement file path, or its content as bytes
+        
+        Returns:
+            SHA-256 hex digest of the content
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return hashlib.sha256(source).hexdigest()
+        
+        sha = hashlib.sha256()
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(Config.DOWNLOAD_CHUNK_SIZE), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+    
+    def get(self, ticker: str, statement_type: str) -> Optional[str]:
+        """
+        Get the hash a statement was last processed from
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement type
+        
+        Returns:
+            SHA-256 hex digest, or None if the statement was never processed
+        """
+        with self.lock:
+            entry = self.statements.get(f"{ticker}/{statement_type}")
+        return entry['sha256'] if entry else None
+    
+    def is_unchanged(self, ticker: str, statement_type: str, source: Union[Path, bytes]) -> bool:
+        """
+        Check whether a fetched statement matches the one last processed
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement type
+            source: Fetched raw statement file path or content
+        
+        Returns:
+            True if the payload is byte-identical to the last processed one
+        """
+        previous = self.get(ticker, statement_type)
+        return previous is not None and previous == self.digest(source)
+    
+    def update(self, ticker: str, statement_type: str, source: Union[Path, bytes]) -> None:
+        """
+        Record the payload a statement was processed from
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement type
+            source: Raw statement file path or content
+        """
+        entry = {
+            'sha256': self.digest(source),
+            'processed_at': datetime.now(timezone.utc).isoformat()
+        }
+        with self.lock:
+            self.statements[f"{ticker}/{statement_type}"] = entry
+            self.dirty = True
+    
+    def discard(self, ticker: str, statement_type: str) -> None:
+        """
+        Forget the payload a statement was processed from, so it is processed and uploaded again
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement type
+        """
+        with self.lock:
+            if self.statements.pop(f"{ticker}/{statement_type}", None) is not None:
+                self.dirty = True
+    
+    def save(self) -> None:
+        """Write the state file if anything changed"""
+        with self.lock:
+            if not self.dirty:
+                return
+            
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.state_file.with_name(f".{self.state_file.name}.part")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'statements': self.statements}, f, indent=1, sort_keys=True)
+            os.replace(temp_path, self.state_file)
+            self.dirty = False
@@ -0,0 +1,115 @@
+import threading
+import time
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Token bucket that refills continuously at a fixed rate"""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the bucket
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens the bucket can hold (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+    
+    def refill(self) -> None:
+        """Add the tokens accumulated since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def wait_time(self, tokens: float = 1) -> float:
+        """
+        Get the number of seconds until the requested tokens are available
+        
+        Args:
+            tokens: Number of tokens needed
+        
+        Returns:
+            Seconds to wait, 0 if the tokens are available now
+        """
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+class RateLimiter:
+    """Thread-safe rate limiter combining per-second and per-minute token buckets"""
+    
+    def __init__(self, requests_per_second: Optional[float] = None,
+                 requests_per_minute: Optional[float] = None):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            requests_per_second: Maximum requests per second (None for no limit)
+            requests_per_minute: Maximum requests per minute (None for no limit)
+        """
+        # A bucket holds at least one token, otherwise a rate below one
+        # request per period would never allow a request
+        self.buckets = []
+        if requests_per_second:
+            self.buckets.append(TokenBucket(requests_per_second, max(1.0, requests_per_second)))
+        if requests_per_minute:
+            self.buckets.append(TokenBucket(requests_per_minute / 60.0, max(1.0, requests_per_minute)))
+        
+        self.lock = threading.Lock()
+        self.total_wait = 0.0
+    
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Block until a request is allowed by every bucket
+        
+        Args:
+            tokens: Number of tokens to take from each bucket
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        
+        while True:
+            with self.lock:
+                for bucket in self.buckets:
+                    bucket.refill()
+                
+                wait = max((bucket.wait_time(tokens) for bucket in self.buckets), default=0.0)
+                if wait == 0:
+                    for bucket in self.buckets:
+                        bucket.tokens -= tokens
+                    self.total_wait += waited
+                    return waited
+            
+            time.sleep(wait)
+            waited += wait
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(name: str, requests_per_second: Optional[float] = None,
+                     requests_per_minute: Optional[float] = None) -> RateLimiter:
+    """
+    Get the process-wide rate limiter for a provider, creating it on first use
+    
+    Args:
+        name: Provider name (e.g. 'fmp', 'anaplan')
+        requests_per_second: Maximum requests per second used when creating the limiter
+        requests_per_minute: Maximum requests per minute used when creating the limiter
+    
+    Returns:
+        Shared RateLimiter instance
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(requests_per_second, requests_per_minute)
+            logger.info(f"Created {name} rate limiter "
+                        f"({requests_per_second}/s, {requests_per_minute}/min)")
+        return _limiters[name]
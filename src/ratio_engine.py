@@ -0,0 +1,175 @@
+import re
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class RatioEngine:
+    """Computes a library of financial ratios for every ticker and period at once"""
+    
+    # Line items reported on several statements are taken from the first one listed
+    STATEMENT_PRECEDENCE = ['income_statement', 'balance_sheet', 'cash_flow']
+    
+    IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+    
+    def __init__(self, ratios: Dict[str, str] = None):
+        """
+        Initialize the engine
+        
+        Args:
+            ratios: Ratio names mapped to arithmetic expressions over line item names
+                (e.g. 'netIncome / revenue'). If None, uses Config.RATIOS
+        """
+        self.ratios = ratios or Config.RATIOS
+    
+    def pivot(self, values: pd.DataFrame) -> pd.DataFrame:
+        """
+        Turn long-format statement values into one row per ticker and period
+        
+        Args:
+            values: DataFrame with ticker, statement, line_item, period and value columns
+        
+        Returns:
+            DataFrame indexed by (ticker, period) with one column per line item
+        """
+        ticker_codes, tickers = pd.factorize(values['ticker'], sort=True)
+        period_codes, periods = pd.factorize(values['period'], sort=True)
+        item_codes, items = pd.factorize(values['line_item'])
+        statement_codes, statements = pd.factorize(values['statement'])
+        
+        # Higher precedence first, so the first occurrence of each cell is the one kept
+        precedence = {name: i for i, name in enumerate(self.STATEMENT_PRECEDENCE)}
+        rank = np.array([precedence.get(s, len(precedence)) for s in statements])[statement_codes]
+        order = np.argsort(rank, kind='stable')
+        
+        # One grid row per ticker/period combination that has data; fiscal year ends
+        # differ between tickers, so most of the full ticker x period grid would be empty
+        present, rows = np.unique(ticker_codes.astype(np.int64) * len(periods) + period_codes,
+                                  return_inverse=True)
+        cells = rows * len(items) + item_codes
+        _, first = np.unique(cells[order], return_index=True)
+        keep = order[first]
+        
+        grid = np.full((len(present), len(items)), np.nan)
+        grid[rows[keep], item_codes[keep]] = values['value'].to_numpy(dtype='float64')[keep]
+        
+        index = pd.MultiIndex.from_arrays(
+            [tickers[present // len(periods)], periods[present % len(periods)]],
+            names=['ticker', 'period']
+        )
+        return pd.DataFrame(grid, index=index, columns=list(items))
+    
+    def compute(self, values: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compute every ratio in the library
+        
+        Each ratio is evaluated once over whole columns, so the cost does not
+        depend on the number of tickers and periods in Python terms. Line items
+        missing from the data yield NaN, as do divisions by zero.
+        
+        Args:
+            values: DataFrame with ticker, statement, line_item, period and value columns
+                (e.g. StatementStore.read())
+        
+        Returns:
+            Ratio table with ticker and period columns and one column per ratio,
+            newest period first for each ticker
+        """
+        start = time.perf_counter()
+        wide = self.pivot(values)
+        
+        columns = {item: wide[item].to_numpy() for item in wide.columns}
+        
+        ratios = {}
+        for name, expression in self.ratios.items():
+            missing = [item for item in self.IDENTIFIER.findall(expression) if item not in columns]
+            if missing:
+                logger.warning(f"Ratio {name} uses line items not in the data: {', '.join(sorted(set(missing)))}")
+                ratios[name] = np.full(len(wide), np.nan)
+                continue
+            
+            try:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    # Expressions come from Config and only see the line item columns
+                    result = eval(compile(expression, name, 'eval'), {'__builtins__': {}}, columns)
+                ratios[name] = np.where(np.isfinite(result), result, np.nan)
+            except Exception as e:
+                logger.error(f"Failed to compute ratio {name} ({expression}): {e}")
+                ratios[name] = np.full(len(wide), np.nan)
+        
+        ratios = pd.DataFrame(ratios, index=wide.index).reset_index()
+        ratios = ratios.sort_values(['ticker', 'period'], ascending=[True, False], ignore_index=True)
+        
+        logger.info(f"Computed {len(self.ratios)} ratios for {len(ratios)} ticker periods "
+                    f"in {time.perf_counter() - start:.3f}s")
+        return ratios
+    
+    def compute_from_store(self, store, tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Compute the ratio table from a StatementStore
+        
+        Args:
+            store: StatementStore holding the normalized statements
+            tickers: Only compute ratios for these tickers. If None, uses every ticker in the store
+        
+        Returns:
+            Ratio table
+        """
+        return self.compute(store.read(tickers=tickers))
+    
+    @staticmethod
+    def merge(ratios: pd.DataFrame, tickers: Iterable[str], ratio_file: Path = None) -> pd.DataFrame:
+        """
+        Replace the rows of recomputed tickers in the saved ratio table
+        
+        Args:
+            ratios: Ratio table of the recomputed tickers
+            tickers: Recomputed tickers; their saved rows are dropped even if they have no data now
+            ratio_file: Saved table (.csv or .parquet). If None, uses Config.RATIOS_FILE
+        
+        Returns:
+            Ratio table of every ticker, newest period first for each ticker
+        """
+        ratio_file = Path(ratio_file or Config.RATIOS_FILE)
+        if not ratio_file.exists():
+            return ratios
+        
+        if ratio_file.suffix == '.parquet':
+            saved = pd.read_parquet(ratio_file)
+        else:
+            # Tickers such as NA stay strings
+            saved = pd.read_csv(ratio_file, parse_dates=['period'], dtype={'ticker': str},
+                                keep_default_na=False, na_values=[''])
+        saved = saved[~saved['ticker'].isin(set(tickers))]
+        merged = pd.concat([saved, ratios], ignore_index=True)
+        return merged.sort_values(['ticker', 'period'], ascending=[True, False], ignore_index=True)
+    
+    @staticmethod
+    def save(ratios: pd.DataFrame, output_file: Path = None) -> Path:
+        """
+        Write the ratio table to disk
+        
+        Args:
+            ratios: Ratio table from compute()
+            output_file: Destination (.csv or .parquet). If None, uses Config.RATIOS_FILE
+        
+        Returns:
+            Path to the written file
+        """
+        output_file = Path(output_file or Config.RATIOS_FILE)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        temp_path = output_file.with_name(f".{output_file.name}.part")
+        if output_file.suffix == '.parquet':
+            ratios.to_parquet(temp_path, index=False)
+        else:
+            ratios.to_csv(temp_path, index=False)
+        temp_path.replace(output_file)
+        
+        logger.info(f"Saved ratio table to {output_file}")
+        return output_file
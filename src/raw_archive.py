@@ -0,0 +1,244 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class RawArchive:
+    """
+    Content-addressed archive of raw statement payloads
+    
+    Each payload is stored once, gzip-compressed, under the SHA-256 of its
+    uncompressed content (objects/ab/abcdef....csv.gz), so a statement that
+    did not change between runs costs no extra bytes. Every run writes a
+    manifest (manifests/<run id>.json) mapping each ticker and statement to
+    its hash, from which the raw files of any past run can be restored exactly.
+    """
+    
+    def __init__(self, archive_dir: Path = None, compression_level: int = None):
+        """
+        Initialize the archive and start a run
+        
+        Args:
+            archive_dir: Root directory of the archive. If None, uses Config.ARCHIVE_DIR
+            compression_level: gzip level for new objects. If None, uses Config.ARCHIVE_COMPRESSION_LEVEL
+        """
+        self.archive_dir = Path(archive_dir or Config.ARCHIVE_DIR)
+        self.objects_dir = self.archive_dir / 'objects'
+        self.manifests_dir = self.archive_dir / 'manifests'
+        self.compression_level = compression_level or Config.ARCHIVE_COMPRESSION_LEVEL
+        self.lock = threading.Lock()
+        
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self._start_run()
+    
+    def _start_run(self) -> None:
+        self.run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:6]}"
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.entries: Dict[str, Dict[str, Union[str, int]]] = {}
+        self.stats = {'stored': 0, 'deduplicated': 0, 'bytes_in': 0, 'bytes_stored': 0}
+    
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.csv.gz"
+    
+    def put(self, content: Union[bytes, Path]) -> str:
+        """
+        Store a payload unless an identical one is already archived
+        
+        Args:
+            content: Payload bytes, or the path of a file holding it
+        
+        Returns:
+            SHA-256 hex digest of the payload
+        """
+        if isinstance(content, Path):
+            sha = hashlib.sha256()
+            size = 0
+            with open(content, 'rb') as f:
+                for chunk in iter(lambda: f.read(Config.DOWNLOAD_CHUNK_SIZE), b''):
+                    sha.update(chunk)
+                    size += len(chunk)
+        else:
+            content = bytes(content)
+            sha = hashlib.sha256(content)
+            size = len(content)
+        
+        digest = sha.hexdigest()
+        object_path = self._object_path(digest)
+        
+        with self.lock:
+            self.stats['bytes_in'] += size
+        if object_path.exists():
+            with self.lock:
+                self.stats['deduplicated'] += 1
+            return digest
+        
+        object_path.parent.mkdir(exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=object_path.parent, prefix=f".{digest[:8]}.", suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as raw, \
+                    gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=self.compression_level, mtime=0) as gz:
+                if isinstance(content, Path):
+                    with open(content, 'rb') as f:
+                        shutil.copyfileobj(f, gz, Config.DOWNLOAD_CHUNK_SIZE)
+                else:
+                    gz.write(content)
+            os.replace(temp_name, object_path)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+            raise
+        
+        with self.lock:
+            self.stats['stored'] += 1
+            self.stats['bytes_stored'] += object_path.stat().st_size
+        return digest
+    
+    def record(self, ticker: str, statement_type: str, content: Union[bytes, Path]) -> Optional[str]:
+        """
+        Archive a fetched statement and add it to the current run's manifest
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: Statement name used in the output filename
+            content: Raw statement bytes or file path
+        
+        Returns:
+            SHA-256 hex digest of the statement, or None if it could not be archived
+        """
+        try:
+            digest = self.put(content)
+        except Exception as e:
+            logger.error(f"Failed to archive {statement_type} for {ticker}: {e}")
+            return None
+        
+        size = content.stat().st_size if isinstance(content, Path) else len(content)
+        with self.lock:
+            self.entries[f"{ticker}/{statement_type}"] = {'sha256': digest, 'size': size}
+        return digest
+    
+    def flush(self) -> Optional[Path]:
+        """
+        Write the current run's manifest and start a new run
+        
+        Returns:
+            Path to the manifest, or None if nothing was recorded
+        """
+        with self.lock:
+            if not self.entries:
+                return None
+            
+            manifest = {
+                'run_id': self.run_id,
+                'started_at': self.started_at,
+                'finished_at': datetime.now(timezone.utc).isoformat(),
+                'stats': dict(self.stats),
+                'entries': dict(sorted(self.entries.items()))
+            }
+            manifest_path = self.manifests_dir / f"{self.run_id}.json"
+            temp_path = manifest_path.with_name(f".{manifest_path.name}.part")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(temp_path, manifest_path)
+            
+            logger.info(f"Archived run {self.run_id}: {len(self.entries)} statements, "
+                        f"{self.stats['stored']} new objects, {self.stats['deduplicated']} deduplicated")
+            self._start_run()
+            return manifest_path
+    
+    def get(self, digest: str) -> bytes:
+        """
+        Read an archived payload
+        
+        Args:
+            digest: SHA-256 hex digest of the payload
+        
+        Returns:
+            Uncompressed payload
+        
+        Raises:
+            FileNotFoundError: If the object is not in the archive
+        """
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read()
+    
+    def runs(self) -> List[str]:
+        """Archived run ids, oldest first"""
+        return sorted(p.stem for p in self.manifests_dir.glob('*.json'))
+    
+    def load_manifest(self, run_id: str) -> Dict:
+        """
+        Read a run's manifest
+        
+        Args:
+            run_id: Run id from runs()
+        
+        Returns:
+            Manifest with run_id, started_at, finished_at, stats and entries
+        
+        Raises:
+            FileNotFoundError: If the run does not exist
+        """
+        with open(self.manifests_dir / f"{run_id}.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def restore(self, run_id: str, destination: Path) -> Dict[str, Dict[str, Path]]:
+        """
+        Rebuild the raw statement files of a past run
+        
+        Every restored file is checked against its hash.
+        
+        Args:
+            run_id: Run id from runs()
+            destination: Directory receiving the "{ticker} {statement_type}.csv" files
+        
+        Returns:
+            Dictionary mapping tickers to their restored statement file paths
+        
+        Raises:
+            ValueError: If an archived object does not match its hash
+        """
+        destination = Path(destination)
+        destination.mkdir(parents=True, exist_ok=True)
+        restored: Dict[str, Dict[str, Path]] = {}
+        
+        for key, entry in self.load_manifest(run_id)['entries'].items():
+            ticker, statement_type = key.split('/', 1)
+            content = self.get(entry['sha256'])
+            if hashlib.sha256(content).hexdigest() != entry['sha256']:
+                raise ValueError(f"Archived {statement_type} for {ticker} does not match its hash")
+            
+            filepath = destination / f"{ticker} {statement_type}.csv"
+            temp_path = filepath.with_name(f".{filepath.name}.part")
+            with open(temp_path, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, filepath)
+            restored.setdefault(ticker, {})[statement_type] = filepath
+        
+        logger.info(f"Restored {sum(len(s) for s in restored.values())} statements from run {run_id} to {destination}")
+        return restored
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the size of the archive
+        
+        Returns:
+            Dictionary with the number of runs and objects and the bytes stored on disk
+        """
+        objects = list(self.objects_dir.glob('*/*.csv.gz'))
+        return {
+            'runs': len(self.runs()),
+            'objects': len(objects),
+            'bytes': sum(p.stat().st_size for p in objects)
+        }
@@ -0,0 +1,287 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """Persistent on-disk cache of API responses with TTL, LRU eviction and revalidation"""
+    
+    INDEX_FILE = 'index.json'
+    
+    def __init__(self, cache_dir: Path = None, default_ttl: float = None, max_bytes: int = None):
+        """
+        Initialize the cache, loading the index from a previous run if present
+        
+        Args:
+            cache_dir: Directory holding cached bodies. If None, uses Config.CACHE_DIR
+            default_ttl: Seconds an entry stays fresh. If None, uses Config.CACHE_TTL
+            max_bytes: Total size cap for cached bodies. If None, uses Config.CACHE_MAX_BYTES
+        """
+        self.cache_dir = Path(cache_dir or Config.CACHE_DIR)
+        self.default_ttl = default_ttl if default_ttl is not None else Config.CACHE_TTL
+        self.max_bytes = max_bytes if max_bytes is not None else Config.CACHE_MAX_BYTES
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'revalidated': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index = self._load_index()
+    
+    @staticmethod
+    def make_key(ticker: str, statement_type: str, params: Dict[str, str] = None) -> str:
+        """
+        Build a cache key from the request identity
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement_type: API endpoint of the statement
+            params: Query parameters (the API key is ignored)
+        
+        Returns:
+            Hex digest identifying the request
+        """
+        query = {k: str(v) for k, v in (params or {}).items() if k != 'apikey'}
+        identity = json.dumps([ticker.upper(), statement_type, query], sort_keys=True)
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached body if it is still fresh
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            Cached body or None if missing or expired
+        """
+        return self._read_file(self.get_file(key))
+    
+    def get_file(self, key: str) -> Optional[Path]:
+        """
+        Get the path of a cached body if it is still fresh
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            Path to the cached body or None if missing or expired
+        """
+        with self.lock:
+            entry = self.index.get(key)
+            if entry and time.time() - entry['stored_at'] < entry['ttl']:
+                body_path = self._touch(key)
+                if body_path is not None:
+                    self.stats['hits'] += 1
+                    return body_path
+            
+            self.stats['misses'] += 1
+            return None
+    
+    def validation_headers(self, key: str) -> Dict[str, str]:
+        """
+        Get conditional request headers for a stale entry
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            If-None-Match / If-Modified-Since headers, empty if nothing to revalidate
+        """
+        with self.lock:
+            entry = self.index.get(key)
+            if not entry or not self._body_path(key).exists():
+                return {}
+            
+            headers = {}
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            return headers
+    
+    def revalidate(self, key: str) -> Optional[bytes]:
+        """
+        Mark a stale entry fresh again after a 304 Not Modified response
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            Cached body or None if it is no longer on disk
+        """
+        return self._read_file(self.revalidate_file(key))
+    
+    def revalidate_file(self, key: str) -> Optional[Path]:
+        """
+        Mark a stale entry fresh again after a 304 Not Modified response
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            Path to the cached body or None if it is no longer on disk
+        """
+        with self.lock:
+            body_path = self._touch(key)
+            if body_path is None:
+                return None
+            
+            self.index[key]['stored_at'] = time.time()
+            self.stats['revalidated'] += 1
+            self.dirty = True
+            return body_path
+    
+    def put(self, key: str, body: bytes, etag: str = None, last_modified: str = None,
+            ttl: float = None) -> None:
+        """
+        Store a response body
+        
+        Args:
+            key: Cache key from make_key
+            body: Response body
+            etag: ETag header of the response
+            last_modified: Last-Modified header of the response
+            ttl: Seconds the entry stays fresh. If None, uses the cache default
+        """
+        with self.lock:
+            body_path = self._body_path(key)
+            temp_path = body_path.with_suffix('.tmp')
+            with open(temp_path, 'wb') as f:
+                f.write(body)
+            os.replace(temp_path, body_path)
+            
+            self._add_entry(key, len(body), etag, last_modified, ttl)
+    
+    def put_file(self, key: str, source: Path, etag: str = None, last_modified: str = None,
+                 ttl: float = None) -> None:
+        """
+        Store a response body that has already been written to disk
+        
+        Args:
+            key: Cache key from make_key
+            source: File holding the response body (copied, not moved)
+            etag: ETag header of the response
+            last_modified: Last-Modified header of the response
+            ttl: Seconds the entry stays fresh. If None, uses the cache default
+        """
+        with self.lock:
+            body_path = self._body_path(key)
+            temp_path = body_path.with_suffix('.tmp')
+            shutil.copyfile(source, temp_path)
+            os.replace(temp_path, body_path)
+            
+            self._add_entry(key, body_path.stat().st_size, etag, last_modified, ttl)
+    
+    def save(self) -> None:
+        """Write the index to disk"""
+        with self.lock:
+            index_path = self.cache_dir / self.INDEX_FILE
+            temp_path = index_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f)
+            os.replace(temp_path, index_path)
+            self.dirty = False
+    
+    def flush(self) -> None:
+        """Write the index to disk if access times or freshness changed"""
+        if self.dirty:
+            self.save()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache counters
+        
+        Returns:
+            Dictionary of counters plus the number of entries and bytes cached
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self.index)
+            stats['bytes'] = sum(entry['size'] for entry in self.index.values())
+            return stats
+    
+    def _body_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.body"
+    
+    def _touch(self, key: str) -> Optional[Path]:
+        """Record an access for LRU ordering, dropping the entry if its body is gone"""
+        body_path = self._body_path(key)
+        if key not in self.index or not body_path.exists():
+            self.index.pop(key, None)
+            self.dirty = True
+            return None
+        
+        self.index[key]['accessed_at'] = time.time()
+        self.dirty = True
+        return body_path
+    
+    @staticmethod
+    def _read_file(body_path: Optional[Path]) -> Optional[bytes]:
+        if body_path is None:
+            return None
+        
+        try:
+            with open(body_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _add_entry(self, key: str, size: int, etag: Optional[str], last_modified: Optional[str],
+                   ttl: Optional[float]) -> None:
+        """Record a stored body in the index and enforce the size cap"""
+        now = time.time()
+        self.index[key] = {
+            'stored_at': now,
+            'accessed_at': now,
+            'ttl': ttl if ttl is not None else self.default_ttl,
+            'size': size,
+            'etag': etag,
+            'last_modified': last_modified
+        }
+        self.stats['stores'] += 1
+        self.dirty = True
+        
+        self._evict()
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its size cap"""
+        total = sum(entry['size'] for entry in self.index.values())
+        if total <= self.max_bytes:
+            return
+        
+        for key in sorted(self.index, key=lambda k: self.index[k]['accessed_at']):
+            if total <= self.max_bytes:
+                break
+            
+            total -= self.index.pop(key)['size']
+            try:
+                self._body_path(key).unlink()
+            except OSError:
+                pass
+            self.stats['evictions'] += 1
+    
+    def _load_index(self) -> Dict[str, Dict]:
+        index_path = self.cache_dir / self.INDEX_FILE
+        if not index_path.exists():
+            return {}
+        
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache index {index_path}: {e}")
+            return {}
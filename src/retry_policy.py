@@ -0,0 +1,187 @@
+import random
+import threading
+import time
+import logging
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class RetryPolicy:
+    """Exponential backoff with jitter that honors Retry-After"""
+    
+    # Status codes worth retrying; other 4xx errors are permanent
+    RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+    
+    def __init__(self, max_retries: int = None, base_delay: float = None,
+                 max_delay: float = None, jitter: float = None):
+        """
+        Initialize the retry policy
+        
+        Args:
+            max_retries: Maximum number of attempts. If None, uses Config.MAX_RETRIES
+            base_delay: Delay before the first retry in seconds. If None, uses Config.RETRY_DELAY
+            max_delay: Upper bound for any single delay. If None, uses Config.RETRY_MAX_DELAY
+            jitter: Fraction of the delay that is randomized. If None, uses Config.RETRY_JITTER
+        """
+        self.max_retries = max_retries if max_retries is not None else Config.MAX_RETRIES
+        self.base_delay = base_delay if base_delay is not None else Config.RETRY_DELAY
+        self.max_delay = max_delay if max_delay is not None else Config.RETRY_MAX_DELAY
+        self.jitter = jitter if jitter is not None else Config.RETRY_JITTER
+    
+    def is_retryable(self, status_code: Optional[int]) -> bool:
+        """
+        Check whether a failed request should be retried
+        
+        Args:
+            status_code: HTTP status code, or None for connection errors and timeouts
+        
+        Returns:
+            True if the request may succeed when retried
+        """
+        return status_code is None or status_code in self.RETRYABLE_STATUS_CODES
+    
+    def get_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Get the delay before the next attempt
+        
+        Args:
+            attempt: Zero-based number of the attempt that just failed
+            retry_after: Value of the Retry-After header, if any
+        
+        Returns:
+            Seconds to wait before retrying
+        """
+        server_delay = self.parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * (1 - self.jitter * random.random())
+    
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parse a Retry-After header given either in seconds or as an HTTP date
+        
+        Args:
+            value: Header value
+        
+        Returns:
+            Seconds to wait, or None if the header is missing or invalid
+        """
+        if not value:
+            return None
+        
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+class CircuitBreaker:
+    """Fails fast for a host once its recent error rate crosses a threshold"""
+    
+    def __init__(self, failure_threshold: float = None, window_size: int = None,
+                 min_requests: int = None, reset_timeout: float = None):
+        """
+        Initialize the circuit breaker
+        
+        Args:
+            failure_threshold: Error rate (0-1) that opens the circuit.
+                If None, uses Config.CIRCUIT_FAILURE_THRESHOLD
+            window_size: Number of recent requests the error rate is computed over.
+                If None, uses Config.CIRCUIT_WINDOW_SIZE
+            min_requests: Requests needed in the window before the circuit can open.
+                If None, uses Config.CIRCUIT_MIN_REQUESTS
+            reset_timeout: Seconds the circuit stays open before a trial request is let through.
+                If None, uses Config.CIRCUIT_RESET_TIMEOUT
+        """
+        self.failure_threshold = (failure_threshold if failure_threshold is not None
+                                  else Config.CIRCUIT_FAILURE_THRESHOLD)
+        self.window_size = window_size or Config.CIRCUIT_WINDOW_SIZE
+        self.min_requests = min_requests or Config.CIRCUIT_MIN_REQUESTS
+        self.reset_timeout = (reset_timeout if reset_timeout is not None
+                              else Config.CIRCUIT_RESET_TIMEOUT)
+        
+        self.lock = threading.Lock()
+        self.outcomes = deque(maxlen=self.window_size)
+        self.opened_at = None
+        self.trial_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        """Current state: 'closed', 'open' or 'half-open'"""
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+    
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent
+        
+        Returns:
+            False while the circuit is open; in half-open state only one trial request is allowed
+        """
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+    
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit after a trial request succeeds"""
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info("Circuit breaker closed after successful trial request")
+                self.opened_at = None
+                self.outcomes.clear()
+            self.trial_in_flight = False
+            self.outcomes.append(True)
+    
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit if the error rate is too high"""
+        with self.lock:
+            self.outcomes.append(False)
+            
+            if self.opened_at is not None:
+                # Failed trial request: stay open for another reset period
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+                return
+            
+            failures = self.outcomes.count(False)
+            if (len(self.outcomes) >= self.min_requests
+                    and failures / len(self.outcomes) >= self.failure_threshold):
+                logger.error(f"Circuit breaker opened: {failures}/{len(self.outcomes)} "
+                             f"recent requests failed")
+                self.opened_at = time.monotonic()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for a host, creating it on first use
+    
+    Args:
+        host: Host name of the API
+    
+    Returns:
+        Shared CircuitBreaker instance
+    """
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker()
+        return _breakers[host]
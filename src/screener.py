@@ -0,0 +1,235 @@
+import os
+import re
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# (metric, low, high, include_low, include_high)
+Condition = Tuple[str, float, float, bool, bool]
+
+class Screener:
+    """
+    Screens the universe on the latest value of each ratio
+    
+    For every metric the latest fiscal period's values are kept sorted with
+    the matching ticker positions, so a range condition is two binary
+    searches and a compound query is the intersection of the matching
+    positions. The index is saved next to the ratio table and loaded without
+    re-reading any statement data.
+    """
+    
+    CONDITION = re.compile(
+        r'^\s*(?P<metric>[A-Za-z_]\w*)\s*'
+        r'(?:(?P<op><=|>=|<|>|==|=)\s*(?P<value>[-+.\w]+%?)'
+        r'|\s+between\s+(?P<low>[-+.\w]+%?)\s+and\s+(?P<high>[-+.\w]+%?))\s*$',
+        re.IGNORECASE
+    )
+    
+    def __init__(self):
+        self.tickers = np.array([], dtype=object)
+        self.periods = np.array([], dtype='datetime64[D]')
+        # metric -> (sorted values, ticker positions in the same order)
+        self.indexes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    
+    @classmethod
+    def build(cls, ratios: pd.DataFrame) -> 'Screener':
+        """
+        Build the per-metric indexes from a ratio table
+        
+        Args:
+            ratios: Ratio table from RatioEngine.compute (ticker, period and one column per ratio)
+        
+        Returns:
+            Screener over each ticker's latest period
+        """
+        screener = cls()
+        latest = ratios.sort_values(['ticker', 'period'], ascending=[True, False])
+        latest = latest.drop_duplicates('ticker', keep='first')
+        
+        screener.tickers = latest['ticker'].astype(str).to_numpy(dtype=object)
+        screener.periods = latest['period'].to_numpy(dtype='datetime64[D]')
+        
+        for metric in latest.columns.drop(['ticker', 'period']):
+            values = latest[metric].to_numpy(dtype='float64')
+            positions = np.flatnonzero(~np.isnan(values))
+            order = positions[np.argsort(values[positions], kind='stable')]
+            screener.indexes[metric] = (values[order], order.astype(np.int32))
+        
+        logger.info(f"Built screener indexes for {len(screener.indexes)} metrics "
+                    f"over {len(screener.tickers)} tickers")
+        return screener
+    
+    @classmethod
+    def parse_condition(cls, text: str) -> Condition:
+        """
+        Parse a condition such as 'net_margin > 20%', 'roe >= 0.15' or
+        'debt_to_equity between 0 and 0.5'
+        
+        Args:
+            text: Condition text; percentages are divided by 100
+        
+        Returns:
+            Tuple of metric, lower bound, upper bound and whether each bound is inclusive
+        
+        Raises:
+            ValueError: If the condition cannot be parsed
+        """
+        match = cls.CONDITION.match(text)
+        if not match:
+            raise ValueError(f"Invalid screen condition: '{text}'")
+        
+        metric = match.group('metric')
+        op = match.group('op')
+        if op is None:
+            return metric, cls._number(match.group('low')), cls._number(match.group('high')), True, True
+        
+        value = cls._number(match.group('value'))
+        if op == '>':
+            return metric, value, np.inf, False, True
+        if op == '>=':
+            return metric, value, np.inf, True, True
+        if op == '<':
+            return metric, -np.inf, value, True, False
+        if op == '<=':
+            return metric, -np.inf, value, True, True
+        return metric, value, value, True, True
+    
+    @staticmethod
+    def _number(text: str) -> float:
+        try:
+            if text.endswith('%'):
+                return float(text[:-1]) / 100
+            return float(text)
+        except ValueError:
+            raise ValueError(f"Invalid number in screen condition: '{text}'")
+    
+    def match_positions(self, condition: Condition) -> np.ndarray:
+        """
+        Find the tickers whose latest value satisfies one condition
+        
+        Args:
+            condition: Parsed condition
+        
+        Returns:
+            Ticker positions, in ascending order of the metric
+        
+        Raises:
+            KeyError: If the metric is not indexed
+        """
+        metric, low, high, include_low, include_high = condition
+        if metric not in self.indexes:
+            raise KeyError(f"Unknown metric '{metric}'; available: {', '.join(sorted(self.indexes))}")
+        
+        values, positions = self.indexes[metric]
+        start = np.searchsorted(values, low, side='left' if include_low else 'right')
+        end = np.searchsorted(values, high, side='right' if include_high else 'left')
+        return positions[start:end]
+    
+    def screen(self, conditions: List[str], sort_by: str = None, limit: int = None) -> pd.DataFrame:
+        """
+        Run a compound query: every condition must hold
+        
+        Args:
+            conditions: Condition strings (see parse_condition)
+            sort_by: Metric to order the result by (descending). If None, orders by ticker
+            limit: Maximum number of rows returned
+        
+        Returns:
+            DataFrame with ticker, period and the metrics used in the query
+        """
+        start_time = time.perf_counter()
+        parsed = [self.parse_condition(c) for c in conditions]
+        
+        # Each index lists a ticker at most once, so a ticker matches every
+        # condition when it was hit once per condition
+        hits = np.zeros(len(self.tickers), dtype=np.int32)
+        for condition in parsed:
+            hits[self.match_positions(condition)] += 1
+        rows = np.flatnonzero(hits == len(parsed))
+        
+        metrics = list(dict.fromkeys([c[0] for c in parsed] + ([sort_by] if sort_by else [])))
+        result = pd.DataFrame({
+            'ticker': self.tickers[rows],
+            'period': self.periods[rows]
+        })
+        for metric in metrics:
+            result[metric] = self.metric_values(metric)[rows]
+        
+        if sort_by:
+            result = result.sort_values(sort_by, ascending=False, ignore_index=True)
+        else:
+            result = result.sort_values('ticker', ignore_index=True)
+        if limit:
+            result = result.head(limit)
+        
+        logger.debug(f"Screen matched {len(rows)} tickers in "
+                     f"{(time.perf_counter() - start_time) * 1000:.2f} ms")
+        return result
+    
+    def metric_values(self, metric: str) -> np.ndarray:
+        """Latest values of a metric in ticker order (NaN where missing)"""
+        if metric not in self.indexes:
+            raise KeyError(f"Unknown metric '{metric}'; available: {', '.join(sorted(self.indexes))}")
+        
+        values, positions = self.indexes[metric]
+        column = np.full(len(self.tickers), np.nan)
+        column[positions] = values
+        return column
+    
+    def save(self, index_file: Path = None) -> Path:
+        """
+        Save the indexes
+        
+        Args:
+            index_file: Destination .npz file. If None, uses Config.SCREEN_INDEX_FILE
+        
+        Returns:
+            Path to the written file
+        """
+        index_file = Path(index_file or Config.SCREEN_INDEX_FILE)
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        arrays = {
+            'tickers': self.tickers.astype(str),
+            'periods': self.periods
+        }
+        for metric, (values, positions) in self.indexes.items():
+            arrays[f"values:{metric}"] = values
+            arrays[f"positions:{metric}"] = positions
+        
+        temp_path = index_file.with_name(f".{index_file.name}.part")
+        with open(temp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, index_file)
+        return index_file
+    
+    @classmethod
+    def load(cls, index_file: Path = None) -> Optional['Screener']:
+        """
+        Load saved indexes
+        
+        Args:
+            index_file: Index .npz file. If None, uses Config.SCREEN_INDEX_FILE
+        
+        Returns:
+            Screener, or None if no index has been built yet
+        """
+        index_file = Path(index_file or Config.SCREEN_INDEX_FILE)
+        if not index_file.exists():
+            return None
+        
+        screener = cls()
+        with np.load(index_file, allow_pickle=False) as data:
+            screener.tickers = data['tickers'].astype(object)
+            screener.periods = data['periods']
+            for name in data.files:
+                if name.startswith('values:'):
+                    metric = name.split(':', 1)[1]
+                    screener.indexes[metric] = (data[name], data[f"positions:{metric}"])
+        return screener
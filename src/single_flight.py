@@ -0,0 +1,67 @@
+import threading
+import logging
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    """A call in flight whose result is shared with duplicate callers"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single execution"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[Hashable, _Call] = {}
+    
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn unless a call with the same key is already running, in which case wait for it
+        
+        Args:
+            key: Identity of the call (e.g. the ticker)
+            fn: Function to run
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+        
+        Returns:
+            Result of the single execution, shared by every caller
+        
+        Raises:
+            Exception: Whatever fn raised, re-raised in every caller
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self.calls[key] = call
+                leader = True
+        
+        if not leader:
+            logger.info(f"Waiting for in-flight request for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.info(f"Shared result for {key} with {call.waiters} waiting caller(s)")
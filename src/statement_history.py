@@ -0,0 +1,112 @@
+import csv
+import io
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+class StatementHistory:
+    """
+    Reads and merges statement files that hold one column per fiscal period
+    
+    The first row of a statement file is the period header (a label cell
+    followed by one period date per column, newest first); every other row
+    is a line item label followed by its value for each period.
+    """
+    
+    @staticmethod
+    def read_periods(file_path: Path) -> List[str]:
+        """
+        Read the fiscal periods present in a statement file
+        
+        Args:
+            file_path: Path to the statement CSV file
+        
+        Returns:
+            Period labels in file order, empty if the file is missing or empty
+        """
+        try:
+            with open(file_path, 'r', newline='', encoding='utf-8') as f:
+                header = next(csv.reader(f), [])
+        except OSError:
+            return []
+        
+        return header[1:]
+    
+    @staticmethod
+    def latest_period(file_path: Path) -> str:
+        """
+        Get the most recent fiscal period in a statement file
+        
+        Args:
+            file_path: Path to the statement CSV file
+        
+        Returns:
+            Latest period label, empty string if there is none
+        """
+        return max(StatementHistory.read_periods(file_path), default='')
+    
+    @staticmethod
+    def merge(file_path: Path, content: bytes) -> List[str]:
+        """
+        Merge the periods in freshly fetched content that are not yet on disk
+        
+        Periods already present keep their stored values; only new period
+        columns are added, and the file is left untouched when there are none.
+        
+        Args:
+            file_path: Path to the existing statement CSV file
+            content: Fetched statement content covering the most recent periods
+        
+        Returns:
+            Period labels that were added
+        """
+        new_rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+        if not new_rows:
+            return []
+        
+        existing_periods = StatementHistory.read_periods(file_path)
+        known = set(existing_periods)
+        fetched_periods = new_rows[0][1:]
+        added = [(i, period) for i, period in enumerate(fetched_periods, 1) if period and period not in known]
+        if not added:
+            return []
+        
+        # Line item label -> values for the added periods
+        new_values: Dict[str, List[str]] = {}
+        for row in new_rows[1:]:
+            if row:
+                new_values[row[0]] = [row[i] if i < len(row) else '' for i, _ in added]
+        
+        # Keep columns ordered newest first
+        periods = [period for _, period in added] + existing_periods
+        order = sorted(range(len(periods)), key=lambda i: periods[i], reverse=True)
+        
+        temp_path = file_path.with_name(f".{file_path.name}.merge")
+        with open(file_path, 'r', newline='', encoding='utf-8') as source, \
+                open(temp_path, 'w', newline='', encoding='utf-8') as result:
+            reader = csv.reader(source)
+            writer = csv.writer(result)
+            
+            header = next(reader)
+            writer.writerow([header[0]] + [periods[i] for i in order])
+            
+            for row in reader:
+                if not row:
+                    continue
+                label = row[0]
+                old_values = row[1:] + [''] * (len(existing_periods) - len(row) + 1)
+                values = new_values.pop(label, [''] * len(added)) + old_values
+                writer.writerow([label] + [values[i] for i in order])
+            
+            # Line items that only appear in the new periods
+            for label, added_values in new_values.items():
+                values = added_values + [''] * len(existing_periods)
+                writer.writerow([label] + [values[i] for i in order])
+        
+        os.replace(temp_path, file_path)
+        
+        logger.info(f"Merged {len(added)} new period(s) into {file_path.name}")
+        return [period for _, period in added]
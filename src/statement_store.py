@@ -0,0 +1,275 @@
+import csv
+import io
+import os
+import time
+import uuid
+import logging
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class StatementStore:
+    """
+    Long-format columnar store of statement values
+    
+    Every statement is normalized into one row per (ticker, statement, line
+    item, period) with a float64 value and stored as Parquet, partitioned by
+    statement type (store_dir/statement=<type>/part-*.parquet). Each ingestion
+    appends new part files; on read, the most recently ingested value wins.
+    """
+    
+    KEY_COLUMNS = ['ticker', 'statement', 'line_item', 'period']
+    
+    def __init__(self, store_dir: Path = None, compact_parts: int = None):
+        """
+        Initialize the store
+        
+        Args:
+            store_dir: Root directory of the store. If None, uses Config.STORE_DIR
+            compact_parts: Part files a partition may hold before it is compacted.
+                If None, uses Config.STORE_COMPACT_PARTS
+        
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.error("pyarrow is required for the statement store")
+            raise
+        
+        self.pa = pa
+        self.pc = pc
+        self.pq = pq
+        self.store_dir = Path(store_dir or Config.STORE_DIR)
+        self.compact_parts = compact_parts or Config.STORE_COMPACT_PARTS
+        self.schema = pa.schema([
+            ('ticker', pa.string()),
+            ('statement', pa.string()),
+            ('line_item', pa.string()),
+            ('period', pa.date32()),
+            ('value', pa.float64()),
+            ('ingested_at', pa.timestamp('ms', tz='UTC'))
+        ])
+    
+    @staticmethod
+    def normalize(ticker: str, statement: str, source: Union[Path, bytes]) -> Dict[str, list]:
+        """
+        Convert a raw statement into long-format columns
+        
+        Rows without any numeric value (symbol, currency, filing links, ...)
+        are dropped, as are period columns whose header is not a date.
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement: Statement type
+            source: Raw statement file path, or its content as bytes
+        
+        Returns:
+            Dictionary of column name to values
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            rows = list(csv.reader(io.StringIO(str(source, 'utf-8-sig'), newline='')))
+        else:
+            with open(source, 'r', newline='', encoding='utf-8-sig') as f:
+                rows = list(csv.reader(f))
+        
+        columns = {'ticker': [], 'statement': [], 'line_item': [], 'period': [], 'value': []}
+        if not rows:
+            return columns
+        
+        periods = []
+        for i, header in enumerate(rows[0][1:], 1):
+            try:
+                periods.append((i, date.fromisoformat(header.strip()[:10])))
+            except ValueError:
+                logger.debug(f"Skipping non-date period column '{header}' in {ticker} {statement}")
+        
+        for row in rows[1:]:
+            if not row:
+                continue
+            
+            values = []
+            for i, period in periods:
+                try:
+                    values.append((period, float(row[i]) if i < len(row) and row[i] != '' else None))
+                except ValueError:
+                    values.append((period, None))
+            
+            if all(value is None for _, value in values):
+                continue
+            
+            for period, value in values:
+                columns['ticker'].append(ticker)
+                columns['statement'].append(statement)
+                columns['line_item'].append(row[0])
+                columns['period'].append(period)
+                columns['value'].append(value)
+        
+        return columns
+    
+    def ingest(self, statements: Dict[str, Dict[str, Union[Path, bytes]]]) -> int:
+        """
+        Normalize statements and append them to the store
+        
+        One part file is written per statement type, however many tickers are ingested.
+        
+        Args:
+            statements: Dictionary mapping tickers to their raw statements (file path or content)
+        
+        Returns:
+            Number of rows appended
+        """
+        ingested_at = datetime.now(timezone.utc)
+        by_statement: Dict[str, Dict[str, list]] = {}
+        
+        for ticker, sources in statements.items():
+            for statement, source in sources.items():
+                try:
+                    columns = self.normalize(ticker, statement, source)
+                except Exception as e:
+                    logger.error(f"Failed to normalize {statement} for {ticker}: {e}")
+                    continue
+                
+                merged = by_statement.setdefault(statement, {name: [] for name in columns})
+                for name, values in columns.items():
+                    merged[name].extend(values)
+        
+        total = 0
+        for statement, columns in by_statement.items():
+            rows = len(columns['value'])
+            if not rows:
+                continue
+            
+            columns['ingested_at'] = [ingested_at] * rows
+            table = self.pa.Table.from_pydict(columns, schema=self.schema)
+            self._write_part(statement, table)
+            total += rows
+            
+            if len(self._part_files(statement)) > self.compact_parts:
+                self.compact(statement)
+        
+        if total:
+            logger.info(f"Stored {total} statement values for {len(statements)} tickers")
+        return total
+    
+    def read(self, statement: str = None, tickers: Optional[Iterable[str]] = None,
+             line_items: Optional[Iterable[str]] = None):
+        """
+        Read statement values as a pandas DataFrame
+        
+        Part files are memory-mapped and filtered while reading; duplicate keys
+        keep the most recently ingested value.
+        
+        Args:
+            statement: Only read this statement type. If None, reads every statement
+            tickers: Only read these tickers
+            line_items: Only read these line items
+        
+        Returns:
+            DataFrame with categorical ticker, statement and line_item columns,
+            a datetime64 period column and a float64 value column
+        """
+        table = self.read_table(statement, tickers, line_items)
+        frame = table.to_pandas(strings_to_categorical=True, date_as_object=False)
+        if frame.empty:
+            return frame[self.KEY_COLUMNS + ['value']]
+        
+        # A freshly compacted store holds a single ingestion and has nothing to deduplicate
+        ingested_at = table.column('ingested_at')
+        if self.pc.min_max(ingested_at)['min'] != self.pc.min_max(ingested_at)['max']:
+            frame = frame.sort_values('ingested_at', kind='stable')
+            frame = frame.drop_duplicates(subset=self.KEY_COLUMNS, keep='last')
+        return frame[self.KEY_COLUMNS + ['value']].reset_index(drop=True)
+    
+    def read_table(self, statement: str = None, tickers: Optional[Iterable[str]] = None,
+                   line_items: Optional[Iterable[str]] = None):
+        """
+        Read the raw (not deduplicated) rows as a pyarrow Table
+        
+        Args:
+            statement: Only read this statement type. If None, reads every statement
+            tickers: Only read these tickers
+            line_items: Only read these line items
+        
+        Returns:
+            pyarrow Table in ingestion order
+        """
+        filters = []
+        if tickers is not None:
+            filters.append(('ticker', 'in', list(tickers)))
+        if line_items is not None:
+            filters.append(('line_item', 'in', list(line_items)))
+        
+        statements = [statement] if statement else self.statements()
+        tables = [
+            self.pq.read_table(part, memory_map=True, filters=filters or None, schema=self.schema)
+            for name in statements
+            for part in self._part_files(name)
+        ]
+        if not tables:
+            return self.schema.empty_table()
+        return self.pa.concat_tables(tables)
+    
+    def compact(self, statement: str) -> None:
+        """
+        Rewrite a partition as a single deduplicated part file
+        
+        Args:
+            statement: Statement type whose partition is compacted
+        """
+        parts = self._part_files(statement)
+        if len(parts) < 2:
+            return
+        
+        frame = self.read(statement)
+        frame['ingested_at'] = datetime.now(timezone.utc)
+        table = self.pa.Table.from_pandas(frame, schema=self.schema, preserve_index=False, safe=False)
+        self._write_part(statement, table)
+        
+        for part in parts:
+            part.unlink()
+        logger.info(f"Compacted {len(parts)} part files of {statement}")
+    
+    def statements(self) -> List[str]:
+        """Statement types present in the store"""
+        if not self.store_dir.exists():
+            return []
+        return sorted(p.name.split('=', 1)[1] for p in self.store_dir.glob('statement=*') if p.is_dir())
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the size of the store
+        
+        Returns:
+            Dictionary with the number of partitions, part files and bytes on disk
+        """
+        parts = [part for name in self.statements() for part in self._part_files(name)]
+        return {
+            'partitions': len(self.statements()),
+            'files': len(parts),
+            'bytes': sum(part.stat().st_size for part in parts)
+        }
+    
+    def _partition_dir(self, statement: str) -> Path:
+        return self.store_dir / f"statement={statement}"
+    
+    def _part_files(self, statement: str) -> List[Path]:
+        """Part files of a partition in the order they were written"""
+        return sorted(self._partition_dir(statement).glob('part-*.parquet'))
+    
+    def _write_part(self, statement: str, table) -> Path:
+        """Write a part file atomically; names sort in write order"""
+        partition_dir = self._partition_dir(statement)
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        
+        part = partition_dir / f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        temp_path = part.with_name(f".{part.name}.part")
+        self.pq.write_table(table, temp_path, compression='zstd')
+        os.replace(temp_path, part)
+        return part
@@ -0,0 +1,162 @@
+import os
+import platform
+import signal
+import subprocess
+import threading
+import time
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class SubprocessExecutor:
+    """
+    Runs external commands with a concurrency cap, a wall-clock timeout and per-job logs
+    
+    Commands are started from an argument list, never through a shell, with
+    stdin closed so that a prompt (a password, a 'pause') fails instead of
+    waiting forever. Their stdout and stderr are streamed straight into the
+    job's log file, so output is neither held in memory nor able to fill a
+    pipe and stall the process. A job that outlives its timeout is killed
+    together with the processes it started (the upload scripts start java
+    through cmd or sh). Every finished job is counted towards a summary of
+    exit codes and durations.
+    """
+    
+    def __init__(self, max_concurrent: int = None, timeout: float = None, log_dir: Path = None):
+        """
+        Initialize the executor
+        
+        Args:
+            max_concurrent: Commands running at once. If None, uses Config.JOB_MAX_CONCURRENT,
+                falling back to Config.UPLOAD_WORKERS
+            timeout: Seconds a command may run before it is killed; 0 disables the timeout.
+                If None, uses Config.JOB_TIMEOUT
+            log_dir: Directory receiving the "<job name>.log" files. If None, uses Config.UPLOAD_JOB_DIR
+        """
+        self.max_concurrent = max_concurrent or Config.JOB_MAX_CONCURRENT or Config.UPLOAD_WORKERS
+        self.timeout = timeout if timeout is not None else Config.JOB_TIMEOUT
+        self.log_dir = Path(log_dir or Config.UPLOAD_JOB_DIR)
+        self.is_windows = platform.system().lower() == 'windows'
+        
+        self.slots = threading.BoundedSemaphore(self.max_concurrent)
+        self.lock = threading.Lock()
+        self.results: List[Dict] = []
+    
+    def _group_options(self) -> Dict:
+        """Popen options that start the command in its own process group"""
+        if self.is_windows:
+            return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {'start_new_session': True}
+    
+    def _kill(self, process: subprocess.Popen) -> None:
+        """Kill a command and every process it started"""
+        try:
+            if self.is_windows:
+                subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Could not kill the process group of PID {process.pid}: {e}")
+        
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+    
+    def run(self, args: List[Union[str, Path]], name: str, cwd: Path = None,
+            timeout: float = None, env: Dict[str, str] = None) -> Dict:
+        """
+        Run a command once a slot is free and wait for it to finish
+        
+        Args:
+            args: Program and arguments
+            name: Job name, used for the log file
+            cwd: Working directory of the command
+            timeout: Seconds the command may run. If None, uses the executor's timeout
+            env: Environment of the command. If None, it inherits this process's environment
+        
+        Returns:
+            Dictionary with the job name, returncode (None if it could not be started),
+            duration in seconds, whether it timed_out and the log path
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_dir / f"{name}.log"
+        
+        returncode = None
+        timed_out = False
+        with self.slots:
+            start = time.monotonic()
+            with open(log_path, 'wb') as log:
+                try:
+                    process = subprocess.Popen(
+                        [str(arg) for arg in args],
+                        cwd=cwd,
+                        env=env,
+                        stdin=subprocess.DEVNULL,
+                        stdout=log,
+                        stderr=subprocess.STDOUT,
+                        **self._group_options()
+                    )
+                except OSError as e:
+                    log.write(f"Could not start {args[0]}: {e}\n".encode())
+                else:
+                    try:
+                        returncode = process.wait(timeout=timeout or None)
+                    except subprocess.TimeoutExpired:
+                        timed_out = True
+                        self._kill(process)
+                        returncode = process.returncode
+            duration = time.monotonic() - start
+        
+        result = {
+            'name': name,
+            'returncode': returncode,
+            'duration': duration,
+            'timed_out': timed_out,
+            'log': log_path
+        }
+        with self.lock:
+            self.results.append(result)
+        
+        if timed_out:
+            logger.error(f"Job {name} timed out after {timeout}s and was killed (log: {log_path})")
+        elif returncode != 0:
+            logger.error(f"Job {name} exited with code {returncode} after {duration:.1f}s (log: {log_path})")
+        else:
+            logger.info(f"Job {name} completed in {duration:.1f}s")
+        return result
+    
+    def get_stats(self) -> Dict:
+        """
+        Summarize the jobs run since the last reset_stats()
+        
+        Returns:
+            Dictionary with the number of jobs, succeeded, failed and timed_out counts,
+            total, mean and max durations in seconds, and a count per exit code
+        """
+        with self.lock:
+            results = list(self.results)
+        
+        durations = [r['duration'] for r in results]
+        succeeded = sum(1 for r in results if r['returncode'] == 0 and not r['timed_out'])
+        timed_out = sum(1 for r in results if r['timed_out'])
+        return {
+            'jobs': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded - timed_out,
+            'timed_out': timed_out,
+            'total_seconds': sum(durations),
+            'mean_seconds': sum(durations) / len(durations) if durations else 0.0,
+            'max_seconds': max(durations, default=0.0),
+            'exit_codes': dict(Counter(r['returncode'] for r in results if not r['timed_out']))
+        }
+    
+    def reset_stats(self) -> None:
+        """Start a new run for the job summary"""
+        with self.lock:
+            self.results = []
@@ -0,0 +1,105 @@
+import csv
+import io
+import os
+import logging
+from pathlib import Path
+from typing import Dict, List, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class UploadConsolidator:
+    """
+    Combines the upload files of many tickers into one file per statement type
+    
+    Anaplan import overhead is paid per process run, so instead of running
+    each statement's process once per ticker, every ticker's upload file of a
+    statement type is streamed into one ticker-keyed file and the process
+    runs once per batch. The per-ticker files are wide (one column per
+    period, line items by row position), so the combined file is long, with
+    one row per value: Ticker, Line, Line Item, Period, Value. Line item
+    labels come from the raw statements when they are available.
+    """
+    
+    HEADER = ['Ticker', 'Line', 'Line Item', 'Period', 'Value']
+    
+    def __init__(self, output_dir: Path = None, name: str = None):
+        """
+        Initialize the consolidation stage
+        
+        Args:
+            output_dir: Directory receiving the combined files. If None, uses Config.OUTPUT_DIR
+            name: Stands in for the ticker in the combined file names (and so in the
+                Anaplan file names). If None, uses Config.CONSOLIDATED_UPLOAD_NAME
+        """
+        self.output_dir = Path(output_dir or Config.OUTPUT_DIR)
+        self.name = name or Config.CONSOLIDATED_UPLOAD_NAME
+    
+    @staticmethod
+    def _labels(raw_source: Union[Path, bytes, None]) -> List[str]:
+        """First column of a raw statement, indexed like the rows of its processed file"""
+        if raw_source is None:
+            return []
+        
+        try:
+            if isinstance(raw_source, (bytes, bytearray, memoryview)):
+                f = io.StringIO(str(raw_source, 'utf-8-sig'), newline='')
+                return [row[0] if row else '' for row in csv.reader(f)]
+            with open(raw_source, 'r', newline='', encoding='utf-8-sig') as f:
+                return [row[0] if row else '' for row in csv.reader(f)]
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Cannot read line item labels from {raw_source}: {e}")
+            return []
+    
+    def combined_path(self, statement_type: str) -> Path:
+        """Path of the combined upload file of a statement type"""
+        return self.output_dir / f"{self.name} {statement_type} Combined.csv"
+    
+    def consolidate(self, uploads: Dict[str, Dict[str, Path]],
+                    raw: Dict[str, Dict[str, Union[Path, bytes]]] = None) -> Dict[str, Path]:
+        """
+        Write one combined upload file per statement type
+        
+        Each ticker's file is read and written out in turn, so only one
+        ticker's statement is held in memory at a time.
+        
+        Args:
+            uploads: Dictionary mapping tickers to their upload file per statement type
+            raw: Raw statements (file path or content) supplying the line item labels
+        
+        Returns:
+            Dictionary mapping statement types to their combined file
+        """
+        raw = raw or {}
+        by_statement: Dict[str, List] = {}
+        for ticker, files in uploads.items():
+            for statement_type, upload_file in files.items():
+                by_statement.setdefault(statement_type, []).append((ticker, upload_file))
+        
+        combined = {}
+        for statement_type, files in by_statement.items():
+            combined_file = self.combined_path(statement_type)
+            temp_path = combined_file.with_name(f".{combined_file.name}.part")
+            values = 0
+            
+            with open(temp_path, 'w', newline='', encoding='utf-8') as out:
+                writer = csv.writer(out)
+                writer.writerow(self.HEADER)
+                
+                for ticker, upload_file in files:
+                    labels = self._labels(raw.get(ticker, {}).get(statement_type))
+                    with open(upload_file, 'r', newline='', encoding='utf-8') as f:
+                        reader = csv.reader(f)
+                        periods = next(reader, [])
+                        for line, row in enumerate(reader, 1):
+                            label = labels[line] if line < len(labels) else ''
+                            writer.writerows([ticker, line, label, period, cell]
+                                             for period, cell in zip(periods, row))
+                            values += min(len(periods), len(row))
+            
+            os.replace(temp_path, combined_file)
+            combined[statement_type] = combined_file
+            logger.info(f"Combined {statement_type} of {len(files)} tickers into {combined_file.name} "
+                        f"({values} values)")
+        
+        return combined
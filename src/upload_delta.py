@@ -0,0 +1,132 @@
+import csv
+import os
+import shutil
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class UploadDelta:
+    """
+    Reduces statement uploads to the periods that changed since the last successful upload
+    
+    A processed statement has one column per period and identifies line
+    items by row position, so the delta keeps every row but only the period
+    columns that are new or hold a changed cell. A copy of each statement is
+    kept as the snapshot of what Anaplan holds, and is replaced only once an
+    upload succeeds.
+    """
+    
+    def __init__(self, snapshot_dir: Path = None):
+        """
+        Initialize the delta stage
+        
+        Args:
+            snapshot_dir: Directory holding the last uploaded version of each statement.
+                If None, uses Config.UPLOAD_SNAPSHOT_DIR
+        """
+        self.snapshot_dir = Path(snapshot_dir or Config.UPLOAD_SNAPSHOT_DIR)
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def _read_rows(file_path: Path) -> List[List[str]]:
+        with open(file_path, 'r', newline='', encoding='utf-8') as f:
+            return list(csv.reader(f))
+    
+    @staticmethod
+    def _column(rows: List[List[str]], index: int) -> List[str]:
+        return [row[index] if index < len(row) else '' for row in rows[1:]]
+    
+    def snapshot_path(self, processed_file: Path) -> Path:
+        """Path of the last uploaded version of a processed statement file"""
+        return self.snapshot_dir / processed_file.name
+    
+    def build(self, processed_file: Path) -> Optional[Path]:
+        """
+        Build the file to upload for a processed statement
+        
+        Args:
+            processed_file: Processed ("New") statement file
+        
+        Returns:
+            Path to a delta file with only the changed period columns, the processed
+            file itself when it has no snapshot or its rows no longer line up with it,
+            or None if nothing changed since the last upload
+        """
+        snapshot = self.snapshot_path(processed_file)
+        # Raw files handed on after a failed transform are uploaded as they are
+        if not processed_file.name.endswith(' New.csv') or not snapshot.exists():
+            return processed_file
+        
+        new_rows = self._read_rows(processed_file)
+        old_rows = self._read_rows(snapshot)
+        if not new_rows or not old_rows or len(new_rows) != len(old_rows):
+            return processed_file
+        
+        old_columns = {period: self._column(old_rows, i) for i, period in enumerate(old_rows[0])}
+        changed = [
+            i for i, period in enumerate(new_rows[0])
+            if old_columns.get(period) != self._column(new_rows, i)
+        ]
+        
+        if not changed:
+            return None
+        if len(changed) == len(new_rows[0]):
+            return processed_file
+        
+        delta_file = processed_file.with_name(processed_file.name.replace(' New.csv', ' Delta.csv'))
+        temp_path = delta_file.with_name(f".{delta_file.name}.part")
+        with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([new_rows[0][i] for i in changed])
+            for row in new_rows[1:]:
+                writer.writerow([row[i] if i < len(row) else '' for i in changed])
+        os.replace(temp_path, delta_file)
+        
+        logger.info(f"Delta for {processed_file.name}: {len(changed)} of {len(new_rows[0])} periods")
+        return delta_file
+    
+    def build_all(self, processed_files: Dict[str, Path]) -> Dict[str, Path]:
+        """
+        Build the upload files of a ticker's processed statements
+        
+        Args:
+            processed_files: Dictionary mapping statement types to processed file paths
+        
+        Returns:
+            Dictionary mapping the statements that changed to the file to upload
+        """
+        uploads = {}
+        for statement_type, processed_file in processed_files.items():
+            try:
+                upload_file = self.build(processed_file)
+            except Exception as e:
+                logger.warning(f"Cannot diff {processed_file.name}, uploading it in full: {e}")
+                upload_file = processed_file
+            
+            if upload_file is None:
+                logger.info(f"No changes to upload for {processed_file.name}")
+            else:
+                uploads[statement_type] = upload_file
+        return uploads
+    
+    def commit(self, processed_file: Path) -> None:
+        """
+        Record a processed statement as uploaded
+        
+        Args:
+            processed_file: Processed statement file whose upload succeeded
+        """
+        if not processed_file.name.endswith(' New.csv'):
+            return
+        
+        snapshot = self.snapshot_path(processed_file)
+        temp_path = snapshot.with_name(f".{snapshot.name}.part")
+        shutil.copyfile(processed_file, temp_path)
+        os.replace(temp_path, snapshot)
+        
+        delta_file = processed_file.with_name(processed_file.name.replace(' New.csv', ' Delta.csv'))
+        if delta_file.exists():
+            delta_file.unlink()
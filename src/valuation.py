@@ -0,0 +1,232 @@
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from config import Config
+from src.ratio_engine import RatioEngine
+
+logger = logging.getLogger(__name__)
+
+class DCFValuation:
+    """
+    Monte Carlo discounted-cash-flow valuation of many tickers at once
+    
+    Revenue growth, free cash flow margin and the discount rate are sampled
+    per ticker as (tickers x draws) arrays. Free cash flow grows at the
+    sampled rate over the forecast horizon, followed by a Gordon growth
+    terminal value; the horizon is summed as a geometric series, so every
+    draw is valued with array arithmetic and no loop over scenarios or years.
+    Scenarios are sampled and valued in float32, which halves both the
+    sampling time and the memory per draw, and tickers are valued in chunks
+    to bound memory.
+    """
+    
+    # Line items the valuation reads from the statements
+    LINE_ITEMS = ['revenue', 'freeCashFlow', 'netDebt', 'weightedAverageShsOut']
+    
+    def __init__(self, draws: int = None, horizon: int = None, chunk_tickers: int = None,
+                 assumptions: Dict[str, float] = None, percentiles: List[float] = None,
+                 seed: int = None):
+        """
+        Initialize the valuation
+        
+        Args:
+            draws: Scenarios sampled per ticker. If None, uses Config.VALUATION_DRAWS
+            horizon: Forecast years before the terminal value. If None, uses Config.VALUATION_HORIZON
+            chunk_tickers: Tickers valued per chunk. If None, uses Config.VALUATION_CHUNK_TICKERS
+            assumptions: Sampling assumptions (see Config.VALUATION_ASSUMPTIONS); given keys
+                override the configured ones
+            percentiles: Percentiles of the per-share value to report. If None, uses
+                Config.VALUATION_PERCENTILES
+            seed: Random seed. If None, uses Config.VALUATION_SEED
+        """
+        self.draws = draws or Config.VALUATION_DRAWS
+        self.horizon = horizon or Config.VALUATION_HORIZON
+        self.chunk_tickers = chunk_tickers or Config.VALUATION_CHUNK_TICKERS
+        self.assumptions = {**Config.VALUATION_ASSUMPTIONS, **(assumptions or {})}
+        self.percentiles = percentiles or Config.VALUATION_PERCENTILES
+        self.rng = np.random.default_rng(seed if seed is not None else Config.VALUATION_SEED)
+    
+    def inputs(self, values: pd.DataFrame) -> pd.DataFrame:
+        """
+        Derive the per-ticker inputs from the statement history
+        
+        Growth is centred on the historical revenue CAGR and the margin on the
+        average free cash flow margin; the latest period supplies the revenue
+        base, net debt and share count. Tickers without positive revenue or
+        shares cannot be valued and are dropped.
+        
+        Args:
+            values: DataFrame with ticker, statement, line_item, period and value columns
+        
+        Returns:
+            DataFrame indexed by ticker with period, revenue, growth, fcf_margin,
+            net_debt and shares columns
+        """
+        wide = RatioEngine().pivot(values).reindex(columns=self.LINE_ITEMS)
+        wide = wide.dropna(subset=['revenue']).reset_index()
+        if wide.empty:
+            return pd.DataFrame(columns=['period', 'revenue', 'growth', 'fcf_margin', 'net_debt', 'shares'])
+        
+        wide = wide.sort_values(['ticker', 'period'])
+        wide['fcf_margin'] = wide['freeCashFlow'] / wide['revenue']
+        grouped = wide.groupby('ticker', observed=True, sort=True)
+        first = grouped.first()
+        latest = grouped.last()
+        
+        years = (latest['period'] - first['period']).dt.days / 365.25
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cagr = (latest['revenue'] / first['revenue']) ** (1 / years) - 1
+        growth = cagr.where(np.isfinite(cagr) & (years > 0), self.assumptions['growth'])
+        
+        margins = grouped['fcf_margin'].mean()
+        inputs = pd.DataFrame({
+            'period': latest['period'],
+            'revenue': latest['revenue'],
+            'growth': growth.clip(self.assumptions['growth_min'], self.assumptions['growth_max']),
+            'fcf_margin': margins.fillna(self.assumptions['fcf_margin']),
+            'net_debt': latest['netDebt'].fillna(0.0),
+            'shares': latest['weightedAverageShsOut']
+        })
+        
+        valid = (inputs['revenue'] > 0) & (inputs['shares'] > 0)
+        if not valid.all():
+            logger.warning(f"Skipping {int((~valid).sum())} tickers without positive revenue or share count")
+        return inputs[valid]
+    
+    def simulate(self, inputs: pd.DataFrame) -> np.ndarray:
+        """
+        Sample per-share values for a chunk of tickers
+        
+        Args:
+            inputs: Rows of inputs() for the chunk
+        
+        Returns:
+            float32 array of shape (tickers, draws) with the value per share of every scenario
+        """
+        a = self.assumptions
+        shape = (len(inputs), self.draws)
+        
+        growth = self._column(inputs, 'growth') + np.float32(a['growth_sd']) * self._normal(shape)
+        np.clip(growth, a['growth_min'], a['growth_max'], out=growth)
+        margin = self._column(inputs, 'fcf_margin') + np.float32(a['fcf_margin_sd']) * self._normal(shape)
+        discount = np.float32(a['discount_rate']) + np.float32(a['discount_rate_sd']) * self._normal(shape)
+        terminal = np.float32(a['terminal_growth'])
+        # Keep the terminal value finite: the discount rate must exceed terminal growth
+        np.maximum(discount, terminal + np.float32(a['min_spread']), out=discount)
+        
+        # Sum over the horizon of (1 + g)^t / (1 + r)^t, t = 1..H
+        ratio = (1 + growth) / (1 + discount)
+        ratio_h = ratio ** self.horizon
+        with np.errstate(divide='ignore', invalid='ignore'):
+            annuity = np.where(np.abs(1 - ratio) > 1e-6,
+                               ratio * (1 - ratio_h) / (1 - ratio),
+                               np.float32(self.horizon))
+        
+        base_fcf = self._column(inputs, 'revenue') * margin
+        terminal_value = base_fcf * ratio_h * (1 + terminal) / (discount - terminal)
+        enterprise = base_fcf * annuity + terminal_value
+        
+        return (enterprise - self._column(inputs, 'net_debt')) / self._column(inputs, 'shares')
+    
+    def _normal(self, shape) -> np.ndarray:
+        return self.rng.standard_normal(shape, dtype=np.float32)
+    
+    @staticmethod
+    def _column(inputs: pd.DataFrame, name: str) -> np.ndarray:
+        """Input column as a (tickers, 1) array that broadcasts over the draws"""
+        return inputs[name].to_numpy(dtype='float32')[:, None]
+    
+    def value(self, values: pd.DataFrame) -> pd.DataFrame:
+        """
+        Value every ticker in the statement data
+        
+        Args:
+            values: DataFrame with ticker, statement, line_item, period and value columns
+                (e.g. StatementStore.read())
+        
+        Returns:
+            DataFrame with one row per ticker: the inputs, the mean value per share and
+            one column per percentile (p5, p50, ...)
+        """
+        start = time.perf_counter()
+        inputs = self.inputs(values)
+        
+        names = [f"p{p:g}" for p in self.percentiles]
+        stats = np.empty((len(inputs), len(names) + 1))
+        for offset in range(0, len(inputs), self.chunk_tickers):
+            chunk = inputs.iloc[offset:offset + self.chunk_tickers]
+            per_share = self.simulate(chunk)
+            stats[offset:offset + len(chunk), 0] = per_share.mean(axis=1)
+            stats[offset:offset + len(chunk), 1:] = np.percentile(per_share, self.percentiles, axis=1).T
+        
+        results = inputs.reset_index()
+        results[['mean'] + names] = stats
+        
+        logger.info(f"Valued {len(results)} tickers with {self.draws} draws each "
+                    f"in {time.perf_counter() - start:.3f}s")
+        return results
+    
+    def value_from_store(self, store, tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Value tickers from a StatementStore
+        
+        Args:
+            store: StatementStore holding the normalized statements
+            tickers: Only value these tickers. If None, values every ticker in the store
+        
+        Returns:
+            Valuation table
+        """
+        return self.value(store.read(tickers=tickers, line_items=self.LINE_ITEMS))
+    
+    @staticmethod
+    def merge(results: pd.DataFrame, tickers: Iterable[str], valuation_file: Path = None) -> pd.DataFrame:
+        """
+        Replace the rows of revalued tickers in the saved valuation table
+        
+        Args:
+            results: Valuation table of the revalued tickers
+            tickers: Revalued tickers; their saved rows are dropped even if they cannot be valued now
+            valuation_file: Saved table (.csv or .parquet). If None, uses Config.VALUATION_FILE
+        
+        Returns:
+            Valuation table of every ticker
+        """
+        valuation_file = Path(valuation_file or Config.VALUATION_FILE)
+        if not valuation_file.exists():
+            return results
+        
+        if valuation_file.suffix == '.parquet':
+            saved = pd.read_parquet(valuation_file)
+        else:
+            saved = pd.read_csv(valuation_file, dtype={'ticker': str}, keep_default_na=False, na_values=[''])
+        saved = saved[~saved['ticker'].isin(set(tickers))]
+        return pd.concat([saved, results], ignore_index=True).sort_values('ticker', ignore_index=True)
+    
+    @staticmethod
+    def save(results: pd.DataFrame, output_file: Path = None) -> Path:
+        """
+        Write the valuation table to disk
+        
+        Args:
+            results: Valuation table from value()
+            output_file: Destination (.csv or .parquet). If None, uses Config.VALUATION_FILE
+        
+        Returns:
+            Path to the written file
+        """
+        output_file = Path(output_file or Config.VALUATION_FILE)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        temp_path = output_file.with_name(f".{output_file.name}.part")
+        if output_file.suffix == '.parquet':
+            results.to_parquet(temp_path, index=False)
+        else:
+            results.to_csv(temp_path, index=False)
+        temp_path.replace(output_file)
+        
+        logger.info(f"Saved valuations to {output_file}")
+        return output_file
@@ -0,0 +1,314 @@
+import csv
+import io
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import pandas as pd
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statement_values (
+    ticker TEXT NOT NULL,
+    statement TEXT NOT NULL,
+    period TEXT NOT NULL,
+    line_number INTEGER NOT NULL,
+    line_item TEXT,
+    value,
+    PRIMARY KEY (ticker, statement, period, line_number)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS statement_values_line_item
+    ON statement_values (ticker, statement, line_item, period);
+
+CREATE TABLE IF NOT EXISTS statement_sources (
+    ticker TEXT NOT NULL,
+    statement TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    loaded_at REAL NOT NULL,
+    PRIMARY KEY (ticker, statement)
+) WITHOUT ROWID;
+"""
+
+class StatementWarehouse:
+    """
+    SQLite copy of the processed ("New") statement files
+    
+    Every cell of a processed file becomes one row keyed by (ticker,
+    statement, period, line number), so a statement, a period or a single
+    value is an index lookup instead of a CSV read. The processed files carry
+    no line item labels; they are taken from the raw statement when it is
+    available. Reloading a statement replaces all of its rows.
+    """
+    
+    def __init__(self, db_path: Path = None):
+        """
+        Initialize the warehouse
+        
+        Args:
+            db_path: SQLite database file. If None, uses Config.WAREHOUSE_PATH
+        """
+        self.db_path = Path(db_path or Config.WAREHOUSE_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # sqlite3 connections may not be shared between threads (e.g. Flask workers)
+        self._local = threading.local()
+        
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection to the database"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _read_rows(source: Union[Path, bytes]) -> List[List[str]]:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return list(csv.reader(io.StringIO(str(source, 'utf-8-sig'), newline='')))
+        with open(source, 'r', newline='', encoding='utf-8-sig') as f:
+            return list(csv.reader(f))
+    
+    @staticmethod
+    def _cell_value(cell: str):
+        """Numbers are stored as REAL, other text as TEXT and empty cells as NULL"""
+        if cell == '':
+            return None
+        try:
+            return float(cell)
+        except ValueError:
+            return cell
+    
+    def _statement_rows(self, ticker: str, statement: str, processed_file: Path,
+                        raw_source: Union[Path, bytes, None]) -> List[Tuple]:
+        """Rows of one processed statement file, ready for executemany"""
+        rows = self._read_rows(processed_file)
+        if not rows:
+            return []
+        
+        labels = []
+        if raw_source is not None:
+            try:
+                labels = [row[0] if row else None for row in self._read_rows(raw_source)]
+            except OSError as e:
+                logger.warning(f"Cannot read line item labels for {ticker} {statement}: {e}")
+        
+        periods = rows[0]
+        values = []
+        for line_number, row in enumerate(rows[1:], 1):
+            label = labels[line_number] if line_number < len(labels) else None
+            for period, cell in zip(periods, row):
+                values.append((ticker, statement, period, line_number, label, self._cell_value(cell)))
+        return values
+    
+    def load(self, processed: Dict[str, Dict[str, Path]],
+             raw: Dict[str, Dict[str, Union[Path, bytes]]] = None, force: bool = False) -> int:
+        """
+        Bulk-load processed statement files in a single transaction
+        
+        Files whose size and modification time match the last load are skipped.
+        
+        Args:
+            processed: Dictionary mapping tickers to their processed statement file paths
+            raw: Raw statements (file path or content) supplying the line item labels
+            force: Reload files even if they have not changed
+        
+        Returns:
+            Number of values loaded
+        """
+        start = time.perf_counter()
+        raw = raw or {}
+        conn = self._connection()
+        known = {
+            (ticker, statement): (size, mtime_ns)
+            for ticker, statement, size, mtime_ns
+            in conn.execute('SELECT ticker, statement, size, mtime_ns FROM statement_sources')
+        }
+        
+        total = 0
+        loaded = 0
+        with conn:
+            for ticker, files in processed.items():
+                for statement, processed_file in files.items():
+                    processed_file = Path(processed_file)
+                    if not processed_file.name.endswith(' New.csv') or not processed_file.exists():
+                        continue
+                    
+                    stat = processed_file.stat()
+                    if not force and known.get((ticker, statement)) == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    
+                    try:
+                        rows = self._statement_rows(ticker, statement, processed_file,
+                                                    raw.get(ticker, {}).get(statement))
+                    except Exception as e:
+                        logger.error(f"Failed to read {processed_file.name} for the warehouse: {e}")
+                        continue
+                    
+                    conn.execute('DELETE FROM statement_values WHERE ticker = ? AND statement = ?',
+                                 (ticker, statement))
+                    conn.executemany('INSERT OR REPLACE INTO statement_values VALUES (?, ?, ?, ?, ?, ?)', rows)
+                    conn.execute('INSERT OR REPLACE INTO statement_sources VALUES (?, ?, ?, ?, ?, ?)',
+                                 (ticker, statement, str(processed_file), stat.st_size,
+                                  stat.st_mtime_ns, time.time()))
+                    total += len(rows)
+                    loaded += 1
+        
+        if loaded:
+            logger.info(f"Loaded {loaded} statements ({total} values) into the warehouse "
+                        f"in {time.perf_counter() - start:.2f}s")
+        return total
+    
+    def load_directory(self, base_dir: Path = None, force: bool = False) -> int:
+        """
+        Load every processed statement file found in a directory
+        
+        Args:
+            base_dir: Directory holding the "<ticker> <statement> New.csv" files.
+                If None, uses Config.OUTPUT_DIR
+            force: Reload files even if they have not changed
+        
+        Returns:
+            Number of values loaded
+        """
+        base_dir = Path(base_dir or Config.OUTPUT_DIR)
+        processed: Dict[str, Dict[str, Path]] = {}
+        raw: Dict[str, Dict[str, Path]] = {}
+        
+        for processed_file in base_dir.glob('* New.csv'):
+            name = processed_file.name[:-len(' New.csv')]
+            if ' ' not in name:
+                continue
+            ticker, statement = name.split(' ', 1)
+            processed.setdefault(ticker, {})[statement] = processed_file
+            
+            raw_file = base_dir / f"{name}.csv"
+            if raw_file.exists():
+                raw.setdefault(ticker, {})[statement] = raw_file
+        
+        return self.load(processed, raw, force)
+    
+    def statement(self, ticker: str, statement: str) -> pd.DataFrame:
+        """
+        Read one statement in the layout of its processed file
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement: Statement type
+        
+        Returns:
+            DataFrame with one row per line item (indexed by label, or by line number
+            when the label is unknown) and one column per period, newest first
+        """
+        frame = pd.read_sql_query(
+            'SELECT line_number, line_item, period, value FROM statement_values '
+            'WHERE ticker = ? AND statement = ?',
+            self._connection(), params=(ticker, statement)
+        )
+        if frame.empty:
+            return pd.DataFrame()
+        
+        table = frame.pivot(index='line_number', columns='period', values='value')
+        table = table[sorted(table.columns, reverse=True)]
+        labels = frame.drop_duplicates('line_number').set_index('line_number')['line_item']
+        table.index = [line if pd.isna(label) else label for line, label in labels.reindex(table.index).items()]
+        table.index.name = 'line_item'
+        table.columns.name = None
+        return table
+    
+    def lookup(self, ticker: str, statement: str, line_item: str, period: str):
+        """
+        Look up a single value
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement: Statement type
+            line_item: Line item label (e.g. 'revenue')
+            period: Period as it appears in the file header (e.g. '2024-12-31')
+        
+        Returns:
+            Value (float, text or None), or None if not found
+        """
+        row = self._connection().execute(
+            'SELECT value FROM statement_values '
+            'WHERE ticker = ? AND statement = ? AND line_item = ? AND period = ?',
+            (ticker, statement, line_item, period)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def history(self, ticker: str, statement: str = None, line_items: Optional[Iterable[str]] = None,
+                start: str = None, end: str = None) -> pd.DataFrame:
+        """
+        Read values of a ticker over time
+        
+        Args:
+            ticker: Stock ticker symbol
+            statement: Only read this statement type
+            line_items: Only read these line items
+            start: Earliest period (inclusive, e.g. '2020-01-01')
+            end: Latest period (inclusive)
+        
+        Returns:
+            Long-format DataFrame with statement, line_item, period and value columns,
+            oldest period first
+        """
+        query = 'SELECT statement, line_item, period, value FROM statement_values WHERE ticker = ?'
+        params: List = [ticker]
+        if statement:
+            query += ' AND statement = ?'
+            params.append(statement)
+        if line_items is not None:
+            line_items = list(line_items)
+            query += f" AND line_item IN ({', '.join('?' * len(line_items))})"
+            params.extend(line_items)
+        if start:
+            query += ' AND period >= ?'
+            params.append(start)
+        if end:
+            query += ' AND period <= ?'
+            params.append(end)
+        query += ' ORDER BY statement, period, line_number'
+        
+        return pd.read_sql_query(query, self._connection(), params=params)
+    
+    def tickers(self) -> List[str]:
+        """Tickers held in the warehouse"""
+        return [row[0] for row in self._connection().execute(
+            'SELECT DISTINCT ticker FROM statement_sources ORDER BY ticker'
+        )]
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the size of the warehouse
+        
+        Returns:
+            Dictionary with the number of tickers, statements and values and the database size in bytes
+        """
+        conn = self._connection()
+        tickers, statements = conn.execute(
+            'SELECT COUNT(DISTINCT ticker), COUNT(*) FROM statement_sources'
+        ).fetchone()
+        values = conn.execute('SELECT COUNT(*) FROM statement_values').fetchone()[0]
+        return {
+            'tickers': tickers,
+            'statements': statements,
+            'values': values,
+            'bytes': self.db_path.stat().st_size if self.db_path.exists() else 0
+        }
+    
+    def close(self) -> None:
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
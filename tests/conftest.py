@@ -0,0 +1,89 @@
+"""
+Shared fixtures for the EquityExplorer tests
+
+The tests run against the local stand-in servers, never the real APIs. When
+no config.py has been created yet, config.example.py is used as the
+configuration.
+"""
+
+import importlib.util
+import sys
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+try:
+    import config
+except ImportError:
+    spec = importlib.util.spec_from_file_location('config', ROOT / 'config.example.py')
+    config = importlib.util.module_from_spec(spec)
+    sys.modules['config'] = config
+    spec.loader.exec_module(config)
+
+from config import Config
+from tools.fmp_standin import FMPStandIn
+
+@pytest.fixture
+def isolated_config(tmp_path, monkeypatch):
+    """Point every file and directory of Config into a temporary directory"""
+    output_dir = tmp_path / 'output'
+    monkeypatch.setattr(Config, 'FINANCIAL_MODELING_PREP_API_KEY', 'test-key')
+    monkeypatch.setattr(Config, 'OUTPUT_DIR', output_dir)
+    monkeypatch.setattr(Config, 'TEMPLATE_DIR', tmp_path / 'templates')
+    monkeypatch.setattr(Config, 'CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setattr(Config, 'ARCHIVE_DIR', tmp_path / 'archive')
+    for name in dir(Config):
+        value = getattr(Config, name)
+        # Everything else derived from OUTPUT_DIR (bulk files, store, state, jobs, ...)
+        if isinstance(value, Path) and ROOT / 'output' in value.parents:
+            monkeypatch.setattr(Config, name, output_dir / value.relative_to(ROOT / 'output'))
+    
+    # Fast retries and no sleeping between polls
+    monkeypatch.setattr(Config, 'RETRY_DELAY', 0.01)
+    monkeypatch.setattr(Config, 'RETRY_MAX_DELAY', 0.05)
+    monkeypatch.setattr(Config, 'ANAPLAN_TASK_POLL_INTERVAL', 0.01)
+    return Config
+
+@pytest.fixture
+def fmp_server(isolated_config, monkeypatch):
+    """FMP stand-in with five annual periods, used as the configured API"""
+    server = FMPStandIn(periods=5).start()
+    monkeypatch.setattr(Config, 'FINANCIAL_MODELING_PREP_BASE_URL', server.base_url)
+    monkeypatch.setattr(Config, 'FINANCIAL_MODELING_PREP_BULK_URL', server.bulk_url)
+    yield server
+    server.stop()
+
+@pytest.fixture
+def explorer(fmp_server):
+    """EquityExplorer fetching from the FMP stand-in, without Anaplan uploads"""
+    from src.equity_explorer import EquityExplorer
+    
+    explorer = EquityExplorer()
+    explorer.batch_manager = None
+    return explorer
+
+class RecordingBatchManager:
+    """Stands in for BatchScriptManager, recording the content of every upload"""
+    
+    def __init__(self):
+        self.uploads = []
+        # Statement types whose uploads report failure
+        self.failing = set()
+    
+    def submit_statement_scripts(self, ticker, uploads):
+        futures = {}
+        for statement_type, path in uploads.items():
+            self.uploads.append((ticker, statement_type, path.read_text(encoding='utf-8')))
+            futures[statement_type] = Future()
+            futures[statement_type].set_result(statement_type not in self.failing)
+        return futures
+
+@pytest.fixture
+def uploads(explorer):
+    """Uploads of the explorer fixture, recorded instead of sent to Anaplan"""
+    explorer.batch_manager = RecordingBatchManager()
+    return explorer.batch_manager.uploads
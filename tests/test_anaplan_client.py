@@ -0,0 +1,83 @@
+import pytest
+
+from src.anaplan_client import AnaplanClient
+from tools.anaplan_standin import AnaplanStandIn
+
+FILE_NAME = 'AAPL balance_sheet.csv'
+PROCESS_NAME = 'Load Balance Sheet'
+
+@pytest.fixture
+def anaplan(isolated_config):
+    server = AnaplanStandIn(files=[FILE_NAME], processes=[PROCESS_NAME, 'Broken'],
+                            failing_processes=['Broken']).start()
+    yield server
+    server.stop()
+
+def make_client(server, **kwargs):
+    return AnaplanClient(service_url=server.base_url, auth_url=server.base_url, user='user',
+                         password='password', workspace_id='ws', model_id='model', **kwargs)
+
+def test_upload_in_chunks(anaplan, tmp_path):
+    content = b'Ticker:,AAPL,AAPL\n' + b'1,2,3\n' * 200
+    path = tmp_path / FILE_NAME
+    path.write_bytes(content)
+    client = make_client(anaplan, chunk_size=256 / (1024 * 1024))
+    
+    chunks = client.upload_file(path)
+    
+    assert chunks == -(-len(content) // 256)
+    assert anaplan.uploads[FILE_NAME] == content
+    assert anaplan.stats['chunks'] == chunks
+    assert client.get_stats()['bytes'] == len(content)
+
+def test_upload_runs_process(anaplan, tmp_path):
+    path = tmp_path / 'upload.csv'
+    path.write_bytes(b'1,2\n')
+    client = make_client(anaplan)
+    
+    result = client.upload(path, FILE_NAME, PROCESS_NAME)
+    
+    assert result['successful']
+    assert anaplan.uploads[FILE_NAME] == b'1,2\n'
+    with pytest.raises(RuntimeError, match='Broken'):
+        client.run_process('Broken')
+    with pytest.raises(RuntimeError, match='no file named'):
+        client.upload_file(path, 'MSFT balance_sheet.csv')
+
+def test_expired_token_logs_in_again(anaplan, tmp_path):
+    path = tmp_path / FILE_NAME
+    path.write_bytes(b'1,2\n')
+    client = make_client(anaplan)
+    client.upload_file(path)
+    assert anaplan.stats['authentications'] == 1
+    
+    # The server forgets the token, so the next request is answered with 401
+    anaplan.tokens.clear()
+    client.upload_file(path)
+    
+    assert anaplan.stats['authentications'] == 2
+    assert client.get_stats()['files'] == 2
+
+def test_token_without_expiry_is_reused(anaplan, tmp_path, monkeypatch):
+    issue_token = anaplan.issue_token
+    
+    def without_expiry():
+        token_info = issue_token()
+        del token_info['expiresAt']
+        return token_info
+    
+    monkeypatch.setattr(anaplan, 'issue_token', without_expiry)
+    path = tmp_path / FILE_NAME
+    path.write_bytes(b'1,2\n')
+    client = make_client(anaplan)
+    
+    client.upload_file(path)
+    client.upload_file(path)
+    
+    assert anaplan.stats['authentications'] == 1
+
+def test_bad_credentials(anaplan):
+    client = make_client(anaplan)
+    client.password = 'wrong'
+    with pytest.raises(RuntimeError, match='authentication failed'):
+        client.authenticate()
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from config import Config
+from src.async_fetcher import AsyncFetchEngine
+from src.financial_data_fetcher import FinancialDataFetcher
+
+class SlowFetcher:
+    STATEMENT_ENDPOINTS = FinancialDataFetcher.STATEMENT_ENDPOINTS
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+    
+    def fetch_statement(self, ticker, statement_type, endpoint):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        if ticker == 'FAIL':
+            raise RuntimeError("boom")
+        return f"{ticker} {statement_type}".encode()
+
+def test_concurrency_is_bounded():
+    fetcher = SlowFetcher()
+    
+    results = AsyncFetchEngine(fetcher, concurrency=4).process_tickers(['A', 'B', 'C', 'D'])
+    
+    assert fetcher.peak == 4
+    assert results['C']['cash_flow'] == b'C cash_flow'
+    assert all(len(statements) == 3 for statements in results.values())
+
+def test_failed_statements_are_left_out():
+    results = AsyncFetchEngine(SlowFetcher(), concurrency=2).process_tickers(['A', 'FAIL'])
+    
+    assert results['FAIL'] == {}
+    assert len(results['A']) == 3
+
+def test_fetch_from_stand_in(fmp_server, monkeypatch):
+    monkeypatch.setattr(Config, 'FETCH_CONCURRENCY', 8)
+    
+    results = FinancialDataFetcher().process_tickers(['T0001', 'T0002', 'T0003'])
+    
+    assert all(sorted(statements) == ['balance_sheet', 'cash_flow', 'income_statement']
+               for statements in results.values())
+    assert fmp_server.stats['requests'] == 9
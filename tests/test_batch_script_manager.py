@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from config import Config
+from src.batch_script_manager import BatchScriptManager
+
+TEMPLATE = '''#!/bin/sh
+set FileName="template.csv"
+echo "$1"
+set FilePath="template.csv"
+echo "$1"
+set ProcessName="template"
+echo "$1"
+sleep {sleep}
+exit {code}
+'''
+
+@pytest.fixture
+def manager_factory(isolated_config, tmp_path, monkeypatch):
+    scripts = tmp_path / 'scripts'
+    scripts.mkdir()
+    monkeypatch.setattr(Config, 'BATCH_SCRIPTS', {
+        'balance_sheet': 'Load.bat',
+        'income_statement': 'Load.bat',
+        'cash_flow': 'Fail.bat'
+    })
+    monkeypatch.setattr(Config, 'ANAPLAN_REQUESTS_PER_MINUTE', None)
+    managers = []
+    
+    def make(sleep=0, workers=4):
+        monkeypatch.setattr(Config, 'UPLOAD_WORKERS', workers)
+        for name, code in (('Load', 0), ('Fail', 3)):
+            (scripts / f"{name}.bat").write_text('set FileName=x\n')
+            (scripts / f"{name}.sh").write_text(TEMPLATE.format(sleep=sleep, code=code))
+        manager = BatchScriptManager()
+        manager.scripts_dir = scripts
+        managers.append(manager)
+        return manager
+    
+    yield make
+    for manager in managers:
+        manager.close()
+
+def test_successful_job_renders_a_private_copy(manager_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'KEEP_JOB_LOGS', True)
+    manager = manager_factory()
+    template = (tmp_path / 'scripts' / 'Load.sh').read_text()
+    data = tmp_path / 'AAPL balance_sheet New.csv'
+    data.write_text('1\n')
+    
+    assert manager.upload_statement('AAPL', data, 'balance_sheet')
+    
+    assert (tmp_path / 'scripts' / 'Load.sh').read_text() == template
+    logs = list(manager.job_dir.glob('AAPL_balance_sheet_*.log'))
+    assert [p.suffix for p in manager.job_dir.iterdir()] == ['.log']
+    assert logs[0].read_text().splitlines() == [
+        'FileName=AAPL balance_sheet.csv',
+        f"FilePath={data.absolute()}",
+        'ProcessName=Load Balance Sheet'
+    ]
+
+def test_failed_job_is_kept_for_inspection(manager_factory, tmp_path):
+    manager = manager_factory()
+    data = tmp_path / 'AAPL cash_flow New.csv'
+    data.write_text('1\n')
+    
+    assert not manager.upload_statement('AAPL', data, 'cash_flow')
+    
+    assert sorted(p.suffix for p in manager.job_dir.iterdir()) == ['.bat', '.log', '.sh']
+    assert manager.get_job_stats()['exit_codes'] == {3: 1}
+
+def test_uploads_run_concurrently_on_the_pool(manager_factory, tmp_path):
+    manager = manager_factory(sleep=0.3)
+    files = {}
+    for statement in ('balance_sheet', 'income_statement'):
+        files[statement] = tmp_path / f"AAPL {statement} New.csv"
+        files[statement].write_text('1\n')
+    
+    start = time.monotonic()
+    first = manager.submit_statement_scripts('AAPL', files)
+    second = manager.submit_statement_scripts('MSFT', files)
+    results = [future.result() for future in [*first.values(), *second.values()]]
+    elapsed = time.monotonic() - start
+    
+    assert results == [True] * 4
+    assert elapsed < 0.9
+    assert manager.get_job_stats()['jobs'] == 4
+
+def test_jobs_sign_in_without_a_prompt(manager_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'ANAPLAN_USER', 'analyst@example.com')
+    monkeypatch.setattr(Config, 'ANAPLAN_PASSWORD', 's3cret')
+    monkeypatch.delenv('ANAPLAN_PASSWORD', raising=False)
+    manager = manager_factory()
+    scripts = tmp_path / 'scripts'
+    (scripts / 'Fail.bat').write_text('Set User=""\nset Credentials=-user %User%\n')
+    (scripts / 'Fail.sh').write_text('#!/bin/sh\necho "$ANAPLAN_PASSWORD"\nexit 3\n')
+    data = tmp_path / 'AAPL cash_flow New.csv'
+    data.write_text('1\n')
+    
+    assert not manager.upload_statement('AAPL', data, 'cash_flow')
+    
+    rendered = next(manager.job_dir.glob('*.bat')).read_text()
+    assert rendered.splitlines() == [
+        'set User="analyst@example.com"',
+        'set Credentials=-user %User% -password %ANAPLAN_PASSWORD%'
+    ]
+    assert next(manager.job_dir.glob('*.log')).read_text() == 's3cret\n'
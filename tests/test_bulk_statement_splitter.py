@@ -0,0 +1,49 @@
+import csv
+
+import pytest
+
+from src.bulk_statement_splitter import BulkStatementSplitter
+from src.financial_data_fetcher import FinancialDataFetcher
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+@pytest.fixture
+def fetcher(fmp_server, monkeypatch):
+    # One period per ticker download, matching a single fiscal year of bulk data
+    monkeypatch.setattr(fmp_server, 'periods', 1)
+    return FinancialDataFetcher()
+
+def test_split_file_matches_single_ticker_download(fetcher, tmp_path):
+    split = fetcher.fetch_bulk_statements([2024], tickers=['T0003'])
+    split_rows = read_rows(split['T0003']['income_statement'])
+    
+    download = fetcher.fetch_statement('T0003', 'income_statement', 'income-statement')
+    download_rows = read_rows(download)
+    
+    assert split_rows == download_rows
+    assert [row[0] for row in split_rows[:2]] == ['date', 'symbol']
+
+def test_split_orders_periods_newest_first(tmp_path):
+    sources = []
+    for year in (2023, 2024):
+        source = tmp_path / f"bulk-{year}.csv"
+        source.write_text(f"symbol,date,revenue\nAAA,{year}-12-31,{year}\nBBB,{year}-12-31,1\n")
+        sources.append(source)
+    
+    files = BulkStatementSplitter(tmp_path / 'out', max_open_files=1).split(sources, 'income_statement', ['aaa'])
+    
+    assert list(files) == ['AAA']
+    assert read_rows(files['AAA']) == [
+        ['date', '2024-12-31', '2023-12-31'],
+        ['symbol', 'AAA', 'AAA'],
+        ['revenue', '2024', '2023']
+    ]
+
+def test_requested_tickers_are_upper_cased(fetcher):
+    results = fetcher.fetch_bulk_statements([2024], tickers=['t0003', 'zzzz'])
+    
+    assert sorted(results) == ['T0003', 'ZZZZ']
+    assert sorted(results['T0003']) == ['balance_sheet', 'cash_flow', 'income_statement']
+    assert results['ZZZZ'] == {}
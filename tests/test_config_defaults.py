@@ -0,0 +1,44 @@
+import importlib.util
+from pathlib import Path
+
+from src.config_defaults import DEFAULTS, apply_defaults
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Settings every config.py copied from config.example.py defines
+ORIGINAL_SETTINGS = {
+    'FINANCIAL_MODELING_PREP_API_KEY', 'FINANCIAL_MODELING_PREP_BASE_URL', 'ANAPLAN_SERVICE_URL',
+    'ANAPLAN_AUTH_URL', 'ANAPLAN_USER', 'ANAPLAN_WORKSPACE_ID', 'ANAPLAN_MODEL_ID', 'BASE_DIR',
+    'OUTPUT_DIR', 'TEMPLATE_DIR', 'BATCH_SCRIPTS', 'PROCESS_NAMES', 'DEFAULT_STOCKS', 'MAX_RETRIES',
+    'RETRY_DELAY', 'CHUNK_SIZE'
+}
+
+def test_old_config_gets_the_new_settings():
+    class OldConfig:
+        BASE_DIR = Path('/srv/equity')
+        OUTPUT_DIR = BASE_DIR / 'out'
+        MAX_RETRIES = 3
+        RETRY_DELAY = 2
+        FETCH_CONCURRENCY = 2
+    
+    apply_defaults(OldConfig)
+    
+    assert all(hasattr(OldConfig, name) for name in DEFAULTS)
+    assert OldConfig.FETCH_CONCURRENCY == 2
+    assert OldConfig.CACHE_DIR == Path('/srv/equity/cache')
+    assert OldConfig.BULK_DIR == Path('/srv/equity/out/bulk')
+    # Stages that change what is fetched, kept or uploaded are opt-in
+    assert not any([OldConfig.CACHE_ENABLED, OldConfig.ARCHIVE_ENABLED,
+                    OldConfig.STREAM_DOWNLOADS, OldConfig.SKIP_UNCHANGED,
+                    OldConfig.STORE_ENABLED, OldConfig.DELTA_UPLOADS])
+
+def test_defaults_match_the_example_config():
+    spec = importlib.util.spec_from_file_location('config_example', ROOT / 'config.example.py')
+    example = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(example)
+    config = example.Config
+    
+    settings = {name for name in vars(config) if name.isupper()}
+    assert settings - ORIGINAL_SETTINGS == set(DEFAULTS)
+    for name, default in DEFAULTS.items():
+        assert getattr(config, name) == (default(config) if callable(default) else default), name
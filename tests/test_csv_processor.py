@@ -0,0 +1,61 @@
+import csv
+
+import pytest
+
+from src.csv_processor import CSVProcessor
+from src.csv_transforms import DropColumn, RowTransform, SubstituteText, TransformPipeline
+
+RAW = (
+    '\ufeffdate,2024-12-31,2023-12-31\n'
+    'symbol,A,A\n'
+    'reportedCurrency,USD,USD\n'
+    'link,https://sec.gov/A/a-10k.htm,https://sec.gov/A/a-10k.htm\n'
+    'revenue, 100 ,None\n'
+).encode()
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+def test_statement_pipeline_single_pass(tmp_path):
+    raw_file = tmp_path / 'A income_statement.csv'
+    raw_file.write_bytes(RAW)
+    mtime = raw_file.stat().st_mtime_ns
+    
+    files = CSVProcessor.process_statement_files('A', tmp_path, ['income_statement'],
+                                                 contents={'income_statement': RAW})
+    
+    assert files['income_statement'].name == 'A income_statement New.csv'
+    assert read_rows(files['income_statement']) == [
+        ['2024-12-31', '2023-12-31'],
+        ['Ticker:', 'Ticker:'],
+        ['USD', 'USD'],
+        ['https://sec.gov/A/a-10k.htm', 'https://sec.gov/A/a-10k.htm'],
+        ['100', '']
+    ]
+    # The raw statement is never rewritten
+    assert raw_file.read_bytes() == RAW
+    assert raw_file.stat().st_mtime_ns == mtime
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith('.part')] == []
+
+def test_substitution_matches_whole_cells_only(tmp_path):
+    substitute = SubstituteText('T', 'Ticker:')
+    output = TransformPipeline([DropColumn(0), substitute]).run(
+        b'symbol,T, T \nlabel,Total Revenue,AT&T\n', tmp_path / 'out.csv')
+    
+    assert read_rows(output) == [['Ticker:', 'Ticker:'], ['Total Revenue', 'AT&T']]
+    assert substitute.replacements == 2
+
+def test_row_transform_must_define_call():
+    class Incomplete(RowTransform):
+        pass
+    
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_other_statements_keep_symbol(tmp_path):
+    (tmp_path / 'A balance_sheet.csv').write_bytes(RAW)
+    
+    files = CSVProcessor.process_statement_files('A', tmp_path, ['balance_sheet'])
+    
+    assert read_rows(files['balance_sheet'])[1] == ['A', 'A']
@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from tools.fmp_standin import FixtureRecorder, FixtureStore, FMPStandIn
+
+def get(server, path, **params):
+    return requests.get(f"{server.base_url}/{path}", params={'datatype': 'csv', **params}, timeout=5)
+
+def test_fixture_served_before_synthetic_data(tmp_path):
+    fixture = tmp_path / 'income-statement' / 'AAPL.csv'
+    fixture.parent.mkdir()
+    fixture.write_bytes(b'date,2024-09-28\nsymbol,AAPL\n')
+    server = FMPStandIn(fixtures_dir=tmp_path, synthetic=False).start()
+    try:
+        assert get(server, 'income-statement/AAPL', apikey='key').content == fixture.read_bytes()
+        assert get(server, 'income-statement/MSFT').status_code == 404
+        assert get(server, 'income-statement/..').status_code == 404
+    finally:
+        server.stop()
+    
+    assert server.stats['fixtures'] == 1
+
+def test_record_then_replay_offline(tmp_path):
+    upstream = FMPStandIn(periods=3).start()
+    recorder = FMPStandIn(fixtures_dir=tmp_path, synthetic=False,
+                          record_from=upstream.base_url, api_key='key').start()
+    try:
+        recorded = get(recorder, 'cash-flow-statement/T0001', limit=2).content
+    finally:
+        recorder.stop()
+        upstream.stop()
+    
+    assert recorder.stats['recorded'] == 1
+    assert list(tmp_path.rglob('*.csv')) == [tmp_path / 'cash-flow-statement' / 'T0001_limit-2.csv']
+    
+    replay = FMPStandIn(fixtures_dir=tmp_path, synthetic=False).start()
+    try:
+        assert get(replay, 'cash-flow-statement/T0001', limit=2).content == recorded
+    finally:
+        replay.stop()
+
+def test_error_injection_is_reproducible():
+    def statuses(seed):
+        server = FMPStandIn(error_rate=0.3, rate_limit_rate=0.2, retry_after=0, seed=seed).start()
+        try:
+            return [get(server, 'balance-sheet-statement/T0001').status_code for _ in range(20)]
+        finally:
+            server.stop()
+    
+    first = statuses(7)
+    assert first == statuses(7)
+    assert {200, 429, 500} <= set(first)
+
+def test_recorder_threads_get_their_own_session(tmp_path):
+    recorder = FixtureRecorder(FixtureStore(tmp_path), 'https://financialmodelingprep.com')
+    both_started = threading.Barrier(2)
+    
+    def session_of_worker(_):
+        both_started.wait(timeout=5)
+        return recorder._session()
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        sessions = list(pool.map(session_of_worker, range(2)))
+    sessions.append(recorder._session())
+    
+    assert recorder._session() is sessions[-1]
+    assert len({id(session) for session in sessions}) == 3
@@ -0,0 +1,39 @@
+import pytest
+
+from config import Config
+from src.financial_data_fetcher import FinancialDataFetcher
+
+@pytest.fixture
+def fetcher_factory(fmp_server, monkeypatch):
+    monkeypatch.setattr(Config, 'HTTP_KEEPALIVE_STATS', True)
+    
+    def make(compression):
+        monkeypatch.setattr(Config, 'HTTP_COMPRESSION', compression)
+        return FinancialDataFetcher()
+    return make
+
+def test_compressed_responses_decode_to_same_body(fetcher_factory):
+    compressed = fetcher_factory(True)
+    plain = fetcher_factory(False)
+    
+    body = compressed.fetch_financial_statement('T0001', 'balance-sheet-statement')
+    assert body == plain.fetch_financial_statement('T0001', 'balance-sheet-statement')
+    
+    stats = compressed.get_transfer_stats()
+    assert stats['bytes_decoded'] == len(body)
+    assert 0 < stats['bytes_on_wire'] < stats['bytes_decoded']
+    
+    plain_stats = plain.get_transfer_stats()
+    assert plain_stats['bytes_on_wire'] == plain_stats['bytes_decoded'] == len(body)
+
+def test_connections_are_reused(fetcher_factory):
+    fetcher = fetcher_factory(True)
+    fetcher.reset_transfer_stats()
+    
+    for ticker in ('T0001', 'T0002', 'T0003', 'T0004'):
+        assert fetcher.fetch_financial_statement(ticker, 'income-statement')
+    
+    stats = fetcher.get_transfer_stats()
+    assert stats['requests'] == 4
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 3
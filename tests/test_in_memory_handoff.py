@@ -0,0 +1,38 @@
+from config import Config
+from src.csv_processor import CSVProcessor
+
+STATEMENTS = ['balance_sheet', 'cash_flow', 'income_statement']
+
+def test_fetched_statements_stay_in_memory(explorer, monkeypatch):
+    monkeypatch.setattr(Config, 'PERSIST_RAW_STATEMENTS', False)
+    
+    fetched = explorer.data_fetcher.process_ticker('T0001')
+    assert all(isinstance(content, bytes) for content in fetched.values())
+    
+    results = explorer.process_multiple_tickers(['T0001'], parallel=False)
+    
+    assert sorted(results['T0001']) == STATEMENTS
+    assert all(path.name.endswith(' New.csv') for path in results['T0001'].values())
+    assert not any((Config.OUTPUT_DIR / f"T0001 {s}.csv").exists() for s in STATEMENTS)
+
+def test_in_memory_output_matches_persisted(explorer, monkeypatch):
+    persisted = explorer.process_multiple_tickers(['T0001'], parallel=False)['T0001']
+    expected = {s: path.read_bytes() for s, path in persisted.items()}
+    for path in Config.OUTPUT_DIR.glob('T0001 *.csv'):
+        path.unlink()
+    
+    monkeypatch.setattr(Config, 'PERSIST_RAW_STATEMENTS', False)
+    in_memory = explorer.process_multiple_tickers(['T0001'], parallel=False)['T0001']
+    
+    assert {s: path.read_bytes() for s, path in in_memory.items()} == expected
+
+def test_failed_transform_hands_on_the_fetched_bytes(tmp_path):
+    raw_file = tmp_path / 'A cash_flow.csv'
+    raw_file.write_bytes(b'date,2020-12-31\nrevenue,1\n')
+    # Not valid UTF-8, so the transform fails
+    fetched = b'date,2024-12-31\nrevenue,\xff\n'
+    
+    files = CSVProcessor.process_statement_files('A', tmp_path, ['cash_flow'], {'cash_flow': fetched})
+    
+    assert files == {'cash_flow': raw_file}
+    assert raw_file.read_bytes() == fetched
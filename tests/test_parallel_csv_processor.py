@@ -0,0 +1,48 @@
+from src.csv_processor import CSVProcessor
+from src.parallel_csv_processor import ParallelCSVProcessor
+from tools.fmp_standin import synthetic_statement
+
+ENDPOINTS = {
+    'income_statement': 'income-statement',
+    'cash_flow': 'cash-flow-statement',
+    'balance_sheet': 'balance-sheet-statement'
+}
+
+def raw_statements(tickers):
+    return {ticker: {s: synthetic_statement(e, ticker, {}, 5) for s, e in ENDPOINTS.items()}
+            for ticker in tickers}
+
+def test_pool_output_matches_sequential(tmp_path):
+    statements = raw_statements(['T0001', 'T0002', 'T0003', 'T0004'])
+    # Half of the statements are handed over as raw files
+    for ticker in ('T0001', 'T0002'):
+        for statement, content in statements[ticker].items():
+            path = tmp_path / 'parallel' / f"{ticker} {statement}.csv"
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(content)
+            statements[ticker][statement] = path
+    
+    processor = ParallelCSVProcessor(workers=2, chunksize=2)
+    results = processor.process(statements, tmp_path / 'parallel')
+    
+    for ticker, contents in raw_statements(list(statements)).items():
+        expected = CSVProcessor.process_statement_files(ticker, tmp_path, contents=contents)
+        assert sorted(results[ticker]) == sorted(expected)
+        for statement, path in expected.items():
+            assert results[ticker][statement].read_bytes() == path.read_bytes()
+    
+    assert processor.last_run['files'] == 12
+    assert processor.last_run['workers'] == 2
+
+def test_nothing_to_process(tmp_path):
+    assert ParallelCSVProcessor(workers=4).process({'T0001': {}}, tmp_path) == {'T0001': {}}
+
+def test_explorer_parallel_matches_sequential(explorer, monkeypatch):
+    monkeypatch.setattr(explorer.data_fetcher, 'is_unchanged', lambda ticker, statement: False)
+    
+    sequential = explorer.process_multiple_tickers(['T0001', 'T0002'], parallel=False)
+    expected = {t: {s: p.read_bytes() for s, p in files.items()} for t, files in sequential.items()}
+    parallel = explorer.process_multiple_tickers(['T0001', 'T0002'], parallel=True)
+    
+    assert {t: {s: p.read_bytes() for s, p in files.items()} for t, files in parallel.items()} == expected
+    assert explorer.csv_stats['files'] == 6
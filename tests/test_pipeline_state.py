@@ -0,0 +1,66 @@
+from config import Config
+from src.pipeline_state import PipelineState
+
+STATEMENTS = ['balance_sheet', 'cash_flow', 'income_statement']
+
+def test_state_survives_reload(tmp_path):
+    state_file = tmp_path / 'state.json'
+    state = PipelineState(state_file)
+    state.update('AAPL', 'income_statement', b'date,2024-12-31\n')
+    state.save()
+    
+    reloaded = PipelineState(state_file)
+    
+    assert reloaded.is_unchanged('AAPL', 'income_statement', b'date,2024-12-31\n')
+    assert not reloaded.is_unchanged('AAPL', 'income_statement', b'date,2025-12-31\n')
+    assert not reloaded.is_unchanged('AAPL', 'balance_sheet', b'date,2024-12-31\n')
+
+def test_path_and_bytes_hash_alike(tmp_path):
+    path = tmp_path / 'statement.csv'
+    path.write_bytes(b'date,2024-12-31\n')
+    assert PipelineState.digest(path) == PipelineState.digest(b'date,2024-12-31\n')
+
+def test_second_run_skips_unchanged(explorer, uploads, fmp_server, monkeypatch):
+    monkeypatch.setattr(Config, 'SKIP_UNCHANGED', True)
+    explorer.pipeline_state = PipelineState()
+    explorer.process_multiple_tickers(['T0001'], parallel=False)
+    assert sorted(s for _, s, _ in uploads) == STATEMENTS
+    assert explorer.unchanged['T0001'] == []
+    
+    uploads.clear()
+    results = explorer.process_multiple_tickers(['T0001'], parallel=False)
+    
+    assert sorted(explorer.unchanged['T0001']) == STATEMENTS
+    assert sorted(results['T0001']) == STATEMENTS
+    assert uploads == []
+    
+    # A new period changes every statement again
+    fmp_server.periods += 1
+    explorer.process_multiple_tickers(['T0001'], parallel=False)
+    
+    assert explorer.unchanged['T0001'] == []
+    assert sorted(s for _, s, _ in uploads) == STATEMENTS
+
+def test_failed_upload_is_retried_without_new_periods(explorer, uploads, monkeypatch):
+    monkeypatch.setattr(Config, 'SKIP_UNCHANGED', False)
+    monkeypatch.setattr(Config, 'INCREMENTAL_FETCH', True)
+    explorer.pipeline_state = PipelineState()
+    explorer.batch_manager.failing.add('cash_flow')
+    explorer.process_multiple_tickers(['T0001'], parallel=False)
+    assert sorted(s for _, s, _ in uploads) == STATEMENTS
+    
+    # After a restart, the next run finds no new periods
+    uploads.clear()
+    explorer.batch_manager.failing.clear()
+    explorer.failed_uploads = {}
+    explorer.pipeline_state = PipelineState()
+    explorer.process_multiple_tickers(['T0001'], parallel=False)
+    
+    assert sorted(explorer.unchanged['T0001']) == ['balance_sheet', 'income_statement']
+    assert [s for _, s, _ in uploads] == ['cash_flow']
+    
+    uploads.clear()
+    explorer.process_multiple_tickers(['T0001'], parallel=False)
+    
+    assert sorted(explorer.unchanged['T0001']) == STATEMENTS
+    assert uploads == []
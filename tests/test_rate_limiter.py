@@ -0,0 +1,43 @@
+import time
+
+from src.rate_limiter import RateLimiter, get_rate_limiter
+
+def test_burst_up_to_capacity_then_paced():
+    limiter = RateLimiter(requests_per_second=20)
+    
+    start = time.monotonic()
+    for _ in range(20):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
+    
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.2
+    assert limiter.total_wait > 0
+
+def test_per_minute_bucket_limits_burst():
+    limiter = RateLimiter(requests_per_second=100, requests_per_minute=600)
+    limiter.buckets[1].tokens = 1
+    
+    limiter.acquire()
+    waited = limiter.acquire()
+    
+    # 600/min refills one token every 0.1s
+    assert 0.05 <= waited <= 0.5
+
+def test_fractional_rate_allows_requests():
+    limiter = RateLimiter(requests_per_second=4.5)
+    limiter.buckets[0].tokens = 0
+    
+    waited = limiter.acquire()
+    
+    assert 0.1 <= waited <= 0.5
+    
+    slow = RateLimiter(requests_per_second=0.5)
+    assert slow.acquire() == 0.0
+    assert 1.5 <= slow.buckets[0].wait_time() <= 2.0
+
+def test_shared_limiter_per_name():
+    first = get_rate_limiter('test-shared', 5)
+    assert get_rate_limiter('test-shared', 50) is first
@@ -0,0 +1,85 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ratio_engine import RatioEngine
+
+def long_values(rows):
+    values = pd.DataFrame(rows, columns=['ticker', 'statement', 'line_item', 'period', 'value'])
+    values['period'] = pd.to_datetime(values['period'])
+    return values
+
+VALUES = long_values([
+    ('AAPL', 'income_statement', 'revenue', '2024-12-31', 200.0),
+    ('AAPL', 'income_statement', 'netIncome', '2024-12-31', 50.0),
+    ('AAPL', 'cash_flow', 'netIncome', '2024-12-31', 49.0),
+    ('AAPL', 'balance_sheet', 'totalStockholdersEquity', '2024-12-31', 0.0),
+    ('AAPL', 'income_statement', 'revenue', '2023-12-31', 100.0),
+    ('AAPL', 'income_statement', 'netIncome', '2023-12-31', 20.0),
+    ('AAPL', 'balance_sheet', 'totalStockholdersEquity', '2023-12-31', 80.0),
+    ('MSFT', 'income_statement', 'revenue', '2024-12-31', 400.0),
+    ('MSFT', 'income_statement', 'netIncome', '2024-12-31', 100.0)
+])
+
+def test_pivot_prefers_income_statement_items():
+    wide = RatioEngine().pivot(VALUES)
+    
+    assert len(wide) == 3
+    assert wide.loc[('AAPL', pd.Timestamp('2024-12-31')), 'netIncome'] == 50.0
+    assert np.isnan(wide.loc[('MSFT', pd.Timestamp('2024-12-31')), 'totalStockholdersEquity'])
+
+def test_compute_ratios_newest_first():
+    engine = RatioEngine({'net_margin': 'netIncome / revenue', 'roe': 'netIncome / totalStockholdersEquity',
+                          'missing': 'grossProfit / revenue'})
+    
+    ratios = engine.compute(VALUES)
+    
+    assert ratios['ticker'].tolist() == ['AAPL', 'AAPL', 'MSFT']
+    assert ratios['period'].dt.year.tolist() == [2024, 2023, 2024]
+    assert ratios['net_margin'].tolist() == pytest.approx([0.25, 0.2, 0.25])
+    # Division by zero and missing data are NaN, not inf
+    assert np.isnan(ratios.loc[0, 'roe'])
+    assert ratios.loc[1, 'roe'] == pytest.approx(0.25)
+    assert ratios['missing'].isna().all()
+
+def test_save_round_trips(tmp_path):
+    ratios = RatioEngine({'net_margin': 'netIncome / revenue'}).compute(VALUES)
+    
+    path = RatioEngine.save(ratios, tmp_path / 'ratios.csv')
+    
+    assert pd.read_csv(path)['net_margin'].tolist() == pytest.approx(ratios['net_margin'].tolist())
+
+def test_pivot_with_staggered_fiscal_years():
+    # Every ticker closes its year on a different date
+    rows = []
+    for i in range(2000):
+        for year in (2023, 2024):
+            period = str((pd.Timestamp(f"{year}-01-31") + pd.Timedelta(days=i // 10)).date())
+            rows.append((f"T{i:04d}", 'income_statement', 'revenue', period, float(year + i)))
+            rows.append((f"T{i:04d}", 'income_statement', 'netIncome', period, 1.0))
+    values = long_values(rows)
+    
+    tracemalloc.start()
+    wide = RatioEngine().pivot(values)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    assert values['period'].nunique() == 400
+    assert len(wide) == 4000
+    assert not wide.isna().any().any()
+    assert wide.loc[('T0070', pd.Timestamp('2024-02-07')), 'revenue'] == 2094.0
+    # Sized by the rows present; a tickers x distinct periods grid would take 13 MB here
+    assert peak < 5 * 1024 * 1024
+
+def test_merge_replaces_recomputed_tickers(tmp_path):
+    engine = RatioEngine({'net_margin': 'netIncome / revenue'})
+    path = engine.save(engine.compute(VALUES), tmp_path / 'ratios.csv')
+    
+    recomputed = engine.compute(VALUES[VALUES['ticker'] == 'MSFT'].assign(value=1.0))
+    merged = engine.merge(recomputed, ['MSFT', 'NA'], path)
+    
+    assert merged['ticker'].tolist() == ['AAPL', 'AAPL', 'MSFT']
+    assert merged['period'].dt.year.tolist() == [2024, 2023, 2024]
+    assert merged['net_margin'].tolist() == pytest.approx([0.25, 0.2, 1.0])
@@ -0,0 +1,50 @@
+import gzip
+
+import pytest
+
+from src.raw_archive import RawArchive
+
+def test_put_deduplicates(tmp_path):
+    archive = RawArchive(tmp_path / 'archive')
+    payload = b'date,2024-12-31\nrevenue,100\n'
+    
+    digest = archive.put(payload)
+    assert archive.put(payload) == digest
+    
+    path = tmp_path / 'statement.csv'
+    path.write_bytes(payload)
+    assert archive.put(path) == digest
+    
+    assert archive.stats['stored'] == 1
+    assert archive.stats['deduplicated'] == 2
+    assert archive.get(digest) == payload
+    assert archive.get_stats()['objects'] == 1
+
+def test_restore_past_run(tmp_path):
+    archive = RawArchive(tmp_path / 'archive')
+    archive.record('AAPL', 'income_statement', b'date,2024-12-31\n')
+    archive.record('AAPL', 'balance_sheet', b'date,2024-12-31\nassets,1\n')
+    first_run = archive.run_id
+    assert archive.flush() is not None
+    
+    archive.record('AAPL', 'income_statement', b'date,2025-12-31\n')
+    archive.flush()
+    assert archive.flush() is None
+    assert len(archive.runs()) == 2 and first_run in archive.runs()
+    
+    restored = archive.restore(first_run, tmp_path / 'restored')
+    
+    assert restored['AAPL']['income_statement'].read_bytes() == b'date,2024-12-31\n'
+    assert restored['AAPL']['balance_sheet'].read_bytes() == b'date,2024-12-31\nassets,1\n'
+
+def test_restore_detects_corruption(tmp_path):
+    archive = RawArchive(tmp_path / 'archive')
+    digest = archive.record('AAPL', 'income_statement', b'date,2024-12-31\n')
+    run_id = archive.run_id
+    archive.flush()
+    
+    with gzip.open(archive._object_path(digest), 'wb') as f:
+        f.write(b'tampered')
+    
+    with pytest.raises(ValueError, match='does not match'):
+        archive.restore(run_id, tmp_path / 'restored')
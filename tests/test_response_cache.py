@@ -0,0 +1,59 @@
+import time
+
+from config import Config
+from src.financial_data_fetcher import FinancialDataFetcher
+from src.response_cache import ResponseCache
+
+def test_fresh_entries_hit_and_survive_restart(tmp_path):
+    cache = ResponseCache(tmp_path, default_ttl=60)
+    key = ResponseCache.make_key('aapl', 'income-statement', {'apikey': 'secret', 'limit': 5})
+    assert key == ResponseCache.make_key('AAPL', 'income-statement', {'limit': '5'})
+    
+    assert cache.get(key) is None
+    cache.put(key, b'date,2024-12-31\n', etag='"v1"')
+    cache.save()
+    
+    reopened = ResponseCache(tmp_path, default_ttl=60)
+    assert reopened.get(key) == b'date,2024-12-31\n'
+    assert reopened.get_stats()['hits'] == 1
+
+def test_stale_entries_revalidate(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put('key', b'body', etag='"v1"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT', ttl=0.01)
+    time.sleep(0.02)
+    
+    assert cache.get('key') is None
+    assert cache.validation_headers('key') == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'
+    }
+    assert cache.revalidate('key') == b'body'
+    assert cache.get_stats()['revalidated'] == 1
+
+def test_least_recently_used_evicted(tmp_path):
+    cache = ResponseCache(tmp_path, default_ttl=60, max_bytes=10)
+    cache.put('old', b'12345')
+    cache.put('used', b'12345')
+    cache.get('old')
+    cache.put('new', b'12345')
+    
+    assert cache.get('used') is None
+    assert cache.get('old') == b'12345'
+    assert cache.get_stats()['evictions'] == 1
+
+def test_fetcher_serves_repeat_requests_from_cache(fmp_server, monkeypatch):
+    monkeypatch.setattr(Config, 'CACHE_ENABLED', True)
+    fetcher = FinancialDataFetcher()
+    
+    first = fetcher.fetch_financial_statement('T0001', 'income-statement')
+    second = fetcher.fetch_financial_statement('T0001', 'income-statement')
+    
+    assert first == second
+    assert fmp_server.stats['requests'] == 1
+    
+    # Once stale, the entry is revalidated with a conditional request
+    for entry in fetcher.cache.index.values():
+        entry['ttl'] = 0
+    assert fetcher.fetch_financial_statement('T0001', 'income-statement') == first
+    assert fetcher.get_cache_stats()['revalidated'] == 1
+    assert fmp_server.stats['requests'] == 2
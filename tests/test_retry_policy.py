@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from config import Config
+from src.financial_data_fetcher import FinancialDataFetcher
+from src.retry_policy import CircuitBreaker, RetryPolicy
+
+def open_breaker(breaker):
+    for _ in range(breaker.min_requests):
+        breaker.record_failure()
+    assert breaker.state == 'open'
+
+def test_breaker_opens_on_error_rate():
+    breaker = CircuitBreaker(failure_threshold=0.5, window_size=10, min_requests=4, reset_timeout=60)
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow_request()
+
+def test_breaker_half_open_recovery():
+    breaker = CircuitBreaker(failure_threshold=0.5, window_size=10, min_requests=2, reset_timeout=0.05)
+    open_breaker(breaker)
+    time.sleep(0.06)
+    
+    assert breaker.state == 'half-open'
+    assert breaker.allow_request()
+    # Only one trial request at a time
+    assert not breaker.allow_request()
+    
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow_request()
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=0.5, window_size=10, min_requests=2, reset_timeout=0.05)
+    open_breaker(breaker)
+    time.sleep(0.06)
+    
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    
+    time.sleep(0.06)
+    assert breaker.allow_request()
+
+def test_retry_delay_honours_retry_after():
+    policy = RetryPolicy(max_retries=3, base_delay=0.1, max_delay=1.0)
+    assert policy.get_delay(0, '0.5') == pytest.approx(0.5)
+    assert policy.get_delay(5) <= 1.0
+    assert policy.is_retryable(503)
+    assert not policy.is_retryable(404)
+
+def test_unexpected_error_releases_trial(fmp_server, monkeypatch):
+    fetcher = FinancialDataFetcher()
+    breaker = fetcher.circuit_breaker
+    breaker.reset_timeout = 0.05
+    open_breaker(breaker)
+    time.sleep(0.06)
+    
+    def broken(*args, **kwargs):
+        raise ValueError("unexpected")
+    
+    with monkeypatch.context() as m:
+        m.setattr(fetcher.transport, 'get', broken)
+        with pytest.raises(ValueError):
+            fetcher._fetch('T0001', 'income-statement')
+    
+    assert not breaker.trial_in_flight
+    time.sleep(0.06)
+    assert fetcher._fetch('T0001', 'income-statement') is not None
+    assert breaker.state == 'closed'
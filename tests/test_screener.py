@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.screener import Screener
+
+RATIOS = pd.DataFrame({
+    'ticker': ['AAA', 'AAA', 'BBB', 'CCC', 'DDD'],
+    'period': pd.to_datetime(['2024-12-31', '2023-12-31', '2024-12-31', '2024-12-31', '2024-12-31']),
+    'net_margin': [0.25, 0.01, 0.10, 0.30, np.nan],
+    'roe': [0.20, 0.50, 0.30, 0.05, 0.40]
+})
+
+@pytest.fixture
+def screener():
+    return Screener.build(RATIOS)
+
+def test_parse_condition():
+    assert Screener.parse_condition('net_margin > 20%') == ('net_margin', 0.2, np.inf, False, True)
+    assert Screener.parse_condition('roe between 0.1 and 0.3') == ('roe', 0.1, 0.3, True, True)
+    with pytest.raises(ValueError):
+        Screener.parse_condition('roe is high')
+
+def test_screen_uses_latest_period(screener):
+    # AAA's older period (margin 1%) is ignored
+    assert screener.screen(['net_margin >= 10%'])['ticker'].tolist() == ['AAA', 'BBB', 'CCC']
+    assert screener.screen(['net_margin > 10%'])['ticker'].tolist() == ['AAA', 'CCC']
+
+def test_compound_query_sorted_and_limited(screener):
+    result = screener.screen(['net_margin >= 0.1', 'roe between 0.1 and 0.3'], sort_by='roe', limit=1)
+    
+    assert result['ticker'].tolist() == ['BBB']
+    assert result['roe'].tolist() == [0.30]
+    with pytest.raises(KeyError):
+        screener.screen(['pe < 10'])
+
+def test_saved_index_answers_the_same(screener, tmp_path):
+    path = screener.save(tmp_path / 'screen_index.npz')
+    loaded = Screener.load(path)
+    
+    query = ['roe > 0.1']
+    pd.testing.assert_frame_equal(loaded.screen(query, sort_by='net_margin'),
+                                  screener.screen(query, sort_by='net_margin'))
+    assert Screener.load(tmp_path / 'missing.npz') is None
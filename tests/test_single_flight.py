@@ -0,0 +1,58 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.financial_data_fetcher import FinancialDataFetcher
+from src.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+    
+    def work(ticker):
+        calls.append(ticker)
+        release.wait(1)
+        return {'ticker': ticker}
+    
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flight.do, 'AAPL', work, 'AAPL') for _ in range(5)]
+        time.sleep(0.05)
+        release.set()
+        results = [f.result() for f in futures]
+    
+    assert calls == ['AAPL']
+    assert all(result is results[0] for result in results)
+    assert flight.calls == {}
+
+def test_error_reaches_every_caller_and_next_call_runs_again():
+    flight = SingleFlight()
+    started = threading.Event()
+    
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("down")
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, 'key', fail)
+        started.wait(1)
+        follower = pool.submit(flight.do, 'key', fail)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match='down'):
+                future.result()
+    
+    assert flight.do('key', lambda: 'ok') == 'ok'
+
+def test_duplicate_ticker_requests_fetch_once(fmp_server):
+    fmp_server.latency = 0.1
+    fetcher = FinancialDataFetcher()
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: fetcher.fetch_statement('T0001', 'income_statement',
+                                                                  'income-statement'), range(4)))
+    
+    assert len(set(results)) == 1
+    assert fmp_server.stats['requests'] == 1
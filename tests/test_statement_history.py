@@ -0,0 +1,55 @@
+import csv
+
+from config import Config
+from src.financial_data_fetcher import FinancialDataFetcher
+from src.statement_history import StatementHistory
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+
+def test_merge_adds_only_new_periods(tmp_path):
+    path = tmp_path / 'AAPL income_statement.csv'
+    write_rows(path, [['date', '2023-12-31', '2022-12-31'], ['revenue', '90', '80']])
+    
+    added = StatementHistory.merge(path, b'date,2024-12-31,2023-12-31\nrevenue,100,91\nnetIncome,10,9\n')
+    
+    assert added == ['2024-12-31']
+    assert read_rows(path) == [
+        ['date', '2024-12-31', '2023-12-31', '2022-12-31'],
+        ['revenue', '100', '90', '80'],
+        ['netIncome', '10', '', '']
+    ]
+    assert StatementHistory.latest_period(path) == '2024-12-31'
+    assert StatementHistory.merge(path, b'date,2024-12-31\nrevenue,100\n') == []
+
+def test_incremental_fetch_merges_latest_periods(fmp_server, monkeypatch):
+    monkeypatch.setattr(Config, 'INCREMENTAL_FETCH', True)
+    fetcher = FinancialDataFetcher()
+    
+    path = fetcher.fetch_statement('T0001', 'income_statement', 'income-statement')
+    full = read_rows(path)
+    assert len(full[0]) == 6
+    assert not fetcher.is_unchanged('T0001', 'income_statement')
+    
+    # Drop the newest period, as if it had been published since the last run
+    history = [row[:1] + row[2:] for row in full]
+    write_rows(path, history)
+    fetcher.fetch_statement('T0001', 'income_statement', 'income-statement')
+    
+    latest = fetcher.fetch_financial_statement('T0001', 'income-statement',
+                                               {'period': Config.STATEMENT_PERIOD,
+                                                'limit': Config.INCREMENTAL_PERIODS})
+    latest_values = {row[0]: row[1] for row in csv.reader(latest.decode().splitlines())}
+    merged = read_rows(path)
+    assert merged == [row[:1] + [latest_values[row[0]]] + row[1:] for row in history]
+    assert merged[0] == full[0]
+    assert not fetcher.is_unchanged('T0001', 'income_statement')
+    
+    fetcher.fetch_statement('T0001', 'income_statement', 'income-statement')
+    assert read_rows(path) == merged
+    assert fetcher.is_unchanged('T0001', 'income_statement')
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from config import Config
+from src.ratio_engine import RatioEngine
+from src.statement_store import StatementStore
+
+RAW = b'date,2024-12-31,2023-12-31,TTM\nsymbol,AAPL,AAPL,AAPL\nrevenue,100,90,95\nnetIncome,10,,11\n'
+
+def test_normalize_keeps_numeric_rows_and_dated_periods():
+    columns = StatementStore.normalize('AAPL', 'income_statement', RAW)
+    
+    assert columns['line_item'] == ['revenue', 'revenue', 'netIncome', 'netIncome']
+    assert [str(p) for p in columns['period']] == ['2024-12-31', '2023-12-31'] * 2
+    assert columns['value'] == [100.0, 90.0, 10.0, None]
+
+def test_latest_ingestion_wins_and_compaction_keeps_values(tmp_path):
+    store = StatementStore(tmp_path, compact_parts=10)
+    store.ingest({'AAPL': {'income_statement': RAW}, 'MSFT': {'income_statement': RAW}})
+    store.ingest({'AAPL': {'income_statement': b'date,2024-12-31\nrevenue,101\n'}})
+    
+    frame = store.read('income_statement', tickers=['AAPL'], line_items=['revenue'])
+    values = dict(zip(frame['period'].dt.strftime('%Y'), frame['value']))
+    assert values == {'2024': 101.0, '2023': 90.0}
+    assert store.get_stats()['files'] == 2
+    
+    store.compact('income_statement')
+    
+    assert store.get_stats()['files'] == 1
+    pd.testing.assert_frame_equal(store.read('income_statement', tickers=['AAPL'], line_items=['revenue']), frame)
+    assert len(store.read(tickers=['MSFT'])) == 4
+
+def test_partitions_compact_past_the_limit(tmp_path):
+    store = StatementStore(tmp_path, compact_parts=2)
+    for value in (1, 2, 3):
+        store.ingest({'AAPL': {'cash_flow': f"date,2024-12-31\nfreeCashFlow,{value}\n".encode()}})
+    
+    assert store.statements() == ['cash_flow']
+    assert store.get_stats()['files'] == 1
+    assert store.read('cash_flow')['value'].tolist() == [3.0]
+
+def test_ingest_recomputes_only_the_ingested_tickers(explorer, monkeypatch):
+    explorer.statement_store = StatementStore()
+    computed = []
+    compute_from_store = RatioEngine.compute_from_store
+    
+    def spy(engine, store, tickers=None):
+        computed.append(tickers)
+        return compute_from_store(engine, store, tickers)
+    
+    monkeypatch.setattr(RatioEngine, 'compute_from_store', spy)
+    explorer.process_single_ticker('T0001')
+    explorer.process_single_ticker('T0002')
+    
+    assert computed == [['T0001'], ['T0002']]
+    assert sorted(pd.read_csv(Config.RATIOS_FILE)['ticker'].unique()) == ['T0001', 'T0002']
+    assert sorted(explorer.screen([])['ticker']) == ['T0001', 'T0002']
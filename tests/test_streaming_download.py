@@ -0,0 +1,50 @@
+import pytest
+
+from config import Config
+from src.financial_data_fetcher import FinancialDataFetcher
+
+class ChunkedResponse:
+    def __init__(self, *chunks):
+        self.chunks = chunks
+    
+    def iter_content(self, chunk_size):
+        return iter(self.chunks)
+
+def test_download_streams_to_destination(fmp_server, monkeypatch):
+    monkeypatch.setattr(Config, 'DOWNLOAD_CHUNK_SIZE', 64)
+    fetcher = FinancialDataFetcher()
+    destination = Config.OUTPUT_DIR / 'T0001 income_statement.csv'
+    
+    path = fetcher.download_financial_statement('T0001', 'income-statement', destination)
+    
+    assert path == destination
+    assert path.read_bytes() == fetcher.fetch_financial_statement('T0001', 'income-statement')
+    assert [p.name for p in Config.OUTPUT_DIR.iterdir()] == [destination.name]
+
+def test_error_payload_leaves_existing_file(tmp_path, isolated_config):
+    fetcher = FinancialDataFetcher()
+    raw_dir = tmp_path / 'raw'
+    raw_dir.mkdir()
+    destination = raw_dir / 'AAPL income_statement.csv'
+    destination.write_bytes(b'date,2024-12-31\n')
+    
+    response = ChunkedResponse(b'{"Error Message": "Limit reached, please ', b'contact us"}')
+    
+    assert fetcher._stream_to_file(response, destination) is None
+    assert destination.read_bytes() == b'date,2024-12-31\n'
+    assert [p.name for p in raw_dir.iterdir()] == [destination.name]
+
+def test_interrupted_download_leaves_no_partial_file(tmp_path, isolated_config):
+    fetcher = FinancialDataFetcher()
+    raw_dir = tmp_path / 'raw'
+    destination = raw_dir / 'AAPL income_statement.csv'
+    
+    class Broken(ChunkedResponse):
+        def iter_content(self, chunk_size):
+            yield b'date,2024-12-31\n' * 1000
+            raise ConnectionError("reset")
+    
+    with pytest.raises(ConnectionError):
+        fetcher._stream_to_file(Broken(), destination)
+    
+    assert list(raw_dir.iterdir()) == []
@@ -0,0 +1,83 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from src.subprocess_executor import SubprocessExecutor
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='uses sh')
+
+def process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+def test_exit_code_and_output_are_logged(tmp_path):
+    executor = SubprocessExecutor(max_concurrent=2, timeout=10, log_dir=tmp_path)
+    
+    result = executor.run(['sh', '-c', 'echo uploaded; echo failed >&2; exit 3'], 'job')
+    
+    assert result['returncode'] == 3
+    assert not result['timed_out']
+    assert result['log'] == tmp_path / 'job.log'
+    assert result['log'].read_text().splitlines() == ['uploaded', 'failed']
+
+def test_timeout_kills_the_process_tree(tmp_path):
+    executor = SubprocessExecutor(max_concurrent=1, timeout=0.5, log_dir=tmp_path)
+    # The shell starts a long-lived child, as the scripts start java
+    script = 'sleep 30 & echo $! > child.pid; wait'
+    
+    start = time.monotonic()
+    result = executor.run(['sh', '-c', script], 'hung', cwd=tmp_path)
+    
+    assert time.monotonic() - start < 5
+    assert result['timed_out']
+    child = int((tmp_path / 'child.pid').read_text())
+    deadline = time.monotonic() + 2
+    while process_exists(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not process_exists(child)
+
+def test_stdin_is_closed(tmp_path):
+    executor = SubprocessExecutor(max_concurrent=1, timeout=5, log_dir=tmp_path)
+    
+    result = executor.run(['sh', '-c', 'read answer || exit 7'], 'prompt')
+    
+    assert result['returncode'] == 7
+    assert not result['timed_out']
+
+def test_concurrency_is_capped(tmp_path):
+    executor = SubprocessExecutor(max_concurrent=1, timeout=10, log_dir=tmp_path)
+    threads = [
+        threading.Thread(target=executor.run, args=(['sleep', '0.2'], f"job{i}"))
+        for i in range(3)
+    ]
+    
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert time.monotonic() - start >= 0.6
+
+def test_stats_summarize_the_run(tmp_path):
+    executor = SubprocessExecutor(max_concurrent=2, timeout=0.3, log_dir=tmp_path)
+    executor.run(['true'], 'ok')
+    executor.run(['false'], 'failed')
+    executor.run(['sleep', '5'], 'hung')
+    executor.run([str(tmp_path / 'missing')], 'missing')
+    
+    stats = executor.get_stats()
+    
+    assert stats['jobs'] == 4
+    assert (stats['succeeded'], stats['failed'], stats['timed_out']) == (1, 2, 1)
+    assert stats['exit_codes'] == {0: 1, 1: 1, None: 1}
+    assert stats['max_seconds'] >= 0.3
+    
+    executor.reset_stats()
+    assert executor.get_stats()['jobs'] == 0
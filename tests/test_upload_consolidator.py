@@ -0,0 +1,41 @@
+import csv
+
+from src.upload_consolidator import UploadConsolidator
+
+STATEMENTS = ['balance_sheet', 'cash_flow', 'income_statement']
+
+def test_combines_tickers_in_long_format(tmp_path):
+    uploads, raw = {}, {}
+    for ticker, values in (('AAA', ['1', '2']), ('BBB', ['3', '4'])):
+        upload_file = tmp_path / f"{ticker} income_statement New.csv"
+        upload_file.write_text(f"2024-12-31,2023-12-31\n{values[0]},{values[1]}\n")
+        uploads[ticker] = {'income_statement': upload_file}
+        raw[ticker] = {'income_statement': b'date,2024-12-31,2023-12-31\nrevenue,1,2\n'}
+    # Without a raw statement the labels are left empty
+    del raw['BBB']
+    
+    combined = UploadConsolidator(tmp_path, 'ALL').consolidate(uploads, raw)
+    
+    assert combined == {'income_statement': tmp_path / 'ALL income_statement Combined.csv'}
+    with open(combined['income_statement'], newline='', encoding='utf-8') as f:
+        assert list(csv.reader(f)) == [
+            UploadConsolidator.HEADER,
+            ['AAA', '1', 'revenue', '2024-12-31', '1'],
+            ['AAA', '1', 'revenue', '2023-12-31', '2'],
+            ['BBB', '1', '', '2024-12-31', '3'],
+            ['BBB', '1', '', '2023-12-31', '4']
+        ]
+
+def test_batch_uploads_one_file_per_statement(explorer, uploads):
+    explorer.upload_consolidator = UploadConsolidator()
+    
+    results = explorer.process_multiple_tickers(['T0001', 'T0002', 'T0003'], parallel=False)
+    
+    assert sorted(results) == ['T0001', 'T0002', 'T0003']
+    assert sorted(s for _, s, _ in uploads) == STATEMENTS
+    assert {ticker for ticker, _, _ in uploads} == {'ALL'}
+    for _, _, text in uploads:
+        rows = list(csv.reader(text.splitlines()))
+        assert rows[0] == UploadConsolidator.HEADER
+        assert {row[0] for row in rows[1:]} == {'T0001', 'T0002', 'T0003'}
+        assert all(row[2] for row in rows[1:])
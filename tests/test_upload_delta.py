@@ -0,0 +1,61 @@
+import csv
+import io
+
+from tools import fmp_standin
+from src.upload_delta import UploadDelta
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return path
+
+def test_delta_keeps_changed_periods(tmp_path):
+    delta = UploadDelta(tmp_path / 'uploaded')
+    processed = write(tmp_path / 'AAPL income_statement New.csv', '2023-12-31,2022-12-31\n90,80\n9,8\n')
+    
+    assert delta.build(processed) == processed
+    delta.commit(processed)
+    assert delta.build(processed) is None
+    
+    write(processed, '2024-12-31,2023-12-31,2022-12-31\n100,91,80\n10,9,8\n')
+    delta_file = delta.build(processed)
+    
+    assert delta_file.name == 'AAPL income_statement Delta.csv'
+    assert delta_file.read_text() == '2024-12-31,2023-12-31\n100,91\n10,9\n'
+    
+    delta.commit(processed)
+    assert not delta_file.exists()
+    assert delta.build_all({'income_statement': processed}) == {}
+
+def test_changed_layout_uploads_in_full(tmp_path):
+    delta = UploadDelta(tmp_path / 'uploaded')
+    processed = write(tmp_path / 'AAPL cash_flow New.csv', '2024-12-31\n1\n')
+    delta.commit(processed)
+    
+    write(processed, '2024-12-31\n1\n2\n')
+    
+    assert delta.build(processed) == processed
+
+def test_second_run_uploads_only_restated_period(explorer, uploads, monkeypatch):
+    explorer.upload_delta = UploadDelta()
+    explorer.process_multiple_tickers(['T0001'], parallel=False)
+    first = {statement: content for _, statement, content in uploads}
+    assert len(next(csv.reader(io.StringIO(first['income_statement'])))) == 5
+    
+    uploads.clear()
+    explorer.process_multiple_tickers(['T0001'], parallel=False)
+    assert uploads == []
+    
+    synthetic_values = fmp_standin.synthetic_values
+    
+    def restated(ticker, statement_type, periods):
+        values = synthetic_values(ticker, statement_type, periods)
+        if 'revenue' in values:
+            values['revenue'][0] = str(int(values['revenue'][0]) + 1)
+        return values
+    
+    monkeypatch.setattr(fmp_standin, 'synthetic_values', restated)
+    explorer.process_multiple_tickers(['T0001'], parallel=False)
+    
+    assert [(ticker, statement) for ticker, statement, _ in uploads] == [('T0001', 'income_statement')]
+    header = next(csv.reader(io.StringIO(uploads[0][2])))
+    assert header == next(csv.reader(io.StringIO(first['income_statement'])))[:1]
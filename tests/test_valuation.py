@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from config import Config
+from src.statement_store import StatementStore
+from src.valuation import DCFValuation
+
+def history(ticker, revenue, fcf, shares=100.0, net_debt=0.0):
+    rows = []
+    for i, period in enumerate(['2022-12-31', '2023-12-31', '2024-12-31']):
+        growth = 1.1 ** i
+        rows += [
+            (ticker, 'income_statement', 'revenue', period, revenue * growth),
+            (ticker, 'cash_flow', 'freeCashFlow', period, fcf * growth),
+            (ticker, 'balance_sheet', 'netDebt', period, net_debt),
+            (ticker, 'income_statement', 'weightedAverageShsOut', period, shares)
+        ]
+    return rows
+
+def test_value_ranks_cash_generation():
+    values = pd.DataFrame(history('CASH', 1000.0, 200.0) + history('THIN', 1000.0, 20.0)
+                          + history('NONE', 0.0, 0.0),
+                          columns=['ticker', 'statement', 'line_item', 'period', 'value'])
+    values['period'] = pd.to_datetime(values['period'])
+    
+    results = DCFValuation(draws=2000, seed=1, chunk_tickers=1).value(values).set_index('ticker')
+    
+    assert set(results.index) == {'CASH', 'THIN'}
+    assert results.loc['CASH', 'p50'] > results.loc['THIN', 'p50']
+    assert (results['p5'] <= results['p50']).all() and (results['p50'] <= results['p95']).all()
+
+def test_batch_is_valued(explorer, monkeypatch):
+    pytest.importorskip('pyarrow')
+    explorer.statement_store = StatementStore()
+    monkeypatch.setattr(Config, 'VALUATION_ENABLED', True)
+    monkeypatch.setattr(Config, 'VALUATION_DRAWS', 500)
+    
+    explorer.process_multiple_tickers(['T0001', 'T0002'], parallel=False)
+    
+    valuations = pd.read_csv(Config.VALUATION_FILE)
+    assert sorted(valuations['ticker']) == ['T0001', 'T0002']
+    
+    # Later batches and single tickers are added to the table
+    explorer.process_multiple_tickers(['T0003'], parallel=False)
+    explorer.process_single_ticker('T0004')
+    
+    valuations = pd.read_csv(Config.VALUATION_FILE)
+    assert valuations['ticker'].tolist() == ['T0001', 'T0002', 'T0003', 'T0004']
@@ -0,0 +1,50 @@
+import csv
+import io
+
+import pytest
+
+from config import Config
+from src.warehouse import StatementWarehouse
+
+def raw_value(content, line_item, column=1):
+    rows = {row[0]: row for row in csv.reader(io.StringIO(content.decode()))}
+    return rows['date'][column], float(rows[line_item][column])
+
+@pytest.fixture
+def warehouse_explorer(explorer):
+    explorer.warehouse = StatementWarehouse()
+    return explorer
+
+def test_batch_is_loaded_and_queryable(warehouse_explorer):
+    warehouse_explorer.process_multiple_tickers(['T0001', 'T0002'], parallel=False)
+    warehouse = warehouse_explorer.warehouse
+    
+    content = warehouse_explorer.data_fetcher.fetch_financial_statement('T0001', 'income-statement')
+    period, revenue = raw_value(content, 'revenue')
+    
+    assert warehouse.tickers() == ['T0001', 'T0002']
+    assert warehouse.lookup('T0001', 'income_statement', 'revenue', period) == revenue
+    assert warehouse.statement('T0001', 'income_statement').loc['revenue', period] == revenue
+    history = warehouse.history('T0001', 'income_statement', ['revenue'])
+    assert history['period'].tolist() == sorted(history['period'])
+    assert warehouse.get_stats()['statements'] == 6
+
+def test_bulk_batch_is_queryable(warehouse_explorer):
+    warehouse_explorer.process_bulk_tickers(['T0003'], [2024], parallel=False)
+    
+    raw = (Config.OUTPUT_DIR / 'T0003 income_statement.csv').read_bytes()
+    period, revenue = raw_value(raw, 'revenue')
+    
+    assert period == '2024-12-31'
+    assert warehouse_explorer.warehouse.lookup('T0003', 'income_statement', 'revenue', period) == revenue
+
+def test_unchanged_files_are_not_reloaded(tmp_path):
+    processed = tmp_path / 'AAPL income_statement New.csv'
+    processed.write_text('2024-12-31,2023-12-31\nTicker:,Ticker:\n100,90\n')
+    raw = b'date,2024-12-31,2023-12-31\nsymbol,AAPL,AAPL\nrevenue,100,90\n'
+    warehouse = StatementWarehouse(tmp_path / 'warehouse.db')
+    
+    assert warehouse.load({'AAPL': {'income_statement': processed}}, {'AAPL': {'income_statement': raw}}) == 4
+    assert warehouse.load({'AAPL': {'income_statement': processed}}) == 0
+    assert warehouse.lookup('AAPL', 'income_statement', 'revenue', '2023-12-31') == 90.0
+    assert warehouse.lookup('AAPL', 'income_statement', 'symbol', '2024-12-31') == 'Ticker:'
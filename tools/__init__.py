@@ -0,0 +1,3 @@
+"""
+Development tools for EquityExplorer: local stand-ins for the external APIs
+"""
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anaplan Integration API
+
+Implements the authentication, chunked file upload and process task routes
+used by AnaplanClient, keeping uploaded files in memory, so uploads can be
+tested and benchmarked without an Anaplan tenant.
+
+    python -m tools.anaplan_standin serve --port 8766 --file "AAPL balance_sheet.csv" --process "Load Balance Sheet"
+"""
+
+import argparse
+import base64
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+MODEL_ROUTE = re.compile(r'^/2/0/workspaces/([^/]+)/models/([^/]+)/(.*)$')
+
+class AnaplanStandIn(ThreadingHTTPServer):
+    """HTTP server answering Anaplan Integration API requests for one model"""
+    
+    request_queue_size = 128
+    daemon_threads = True
+    
+    def __init__(self, address=('127.0.0.1', 0), user: str = 'user', password: str = 'password',
+                 files: Iterable[str] = (), processes: Iterable[str] = (),
+                 failing_processes: Iterable[str] = (), task_polls: int = 1,
+                 token_ttl: float = 1800, latency: float = 0.0, error_rate: float = 0.0,
+                 seed: int = None):
+        """
+        Initialize the stand-in server
+        
+        Args:
+            address: (host, port) to listen on; port 0 picks a free port
+            user: Accepted user name
+            password: Accepted password
+            files: Names of the model's import data sources
+            processes: Names of the model's processes
+            failing_processes: Processes whose tasks complete unsuccessfully
+            task_polls: Status requests answered with IN_PROGRESS before a task completes
+            token_ttl: Seconds a token stays valid
+            latency: Seconds to wait before answering each request
+            error_rate: Fraction of model requests answered with HTTP 503
+            seed: Seed for the error injection, for reproducible runs
+        """
+        super().__init__(address, AnaplanHandler)
+        self.credentials = (user, password)
+        self.files = {f"113000000{i:03d}": name for i, name in enumerate(files)}
+        self.processes = {f"118000000{i:03d}": name for i, name in enumerate(processes)}
+        self.failing_processes = set(failing_processes)
+        self.task_polls = task_polls
+        self.token_ttl = token_ttl
+        self.latency = latency
+        self.error_rate = error_rate
+        
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens: Dict[str, float] = {}
+        self.pending: Dict[str, Dict[int, bytes]] = {}
+        self.uploads: Dict[str, bytes] = {}
+        self.tasks: Dict[str, Dict] = {}
+        self.stats = {
+            'requests': 0,
+            'authentications': 0,
+            'chunks': 0,
+            'files': 0,
+            'tasks': 0,
+            'errors': 0
+        }
+    
+    @property
+    def base_url(self) -> str:
+        """URL to use as both Config.ANAPLAN_SERVICE_URL and Config.ANAPLAN_AUTH_URL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> 'AnaplanStandIn':
+        """Serve requests on a background thread"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and close the socket"""
+        self.shutdown()
+        self.server_close()
+    
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+    
+    def issue_token(self) -> Dict:
+        token = uuid.uuid4().hex
+        expires_at = time.time() + self.token_ttl
+        with self.lock:
+            self.tokens[token] = expires_at
+        self.count('authentications')
+        return {'tokenValue': token, 'expiresAt': int(expires_at * 1000), 'refreshTokenId': uuid.uuid4().hex}
+    
+    def valid_token(self, header: Optional[str]) -> bool:
+        if not header or not header.startswith('AnaplanAuthToken '):
+            return False
+        with self.lock:
+            return self.tokens.get(header.split(' ', 1)[1], 0) > time.time()
+    
+    def complete_upload(self, file_id: str, chunk_count: int) -> bool:
+        """Assemble an upload from its chunks; False if chunks are missing"""
+        with self.lock:
+            chunks = self.pending.pop(file_id, {})
+            if sorted(chunks) != list(range(chunk_count)):
+                return False
+            self.uploads[self.files[file_id]] = b''.join(chunks[i] for i in range(chunk_count))
+            self.stats['files'] += 1
+            return True
+    
+    def poll_task(self, task_id: str) -> Optional[Dict]:
+        """Status of a task, completing it after task_polls polls"""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return None
+            task['polls'] += 1
+            if task['polls'] <= self.task_polls:
+                return {'taskId': task_id, 'taskState': 'IN_PROGRESS', 'progress': 0.5}
+            successful = task['process'] not in self.failing_processes
+            return {
+                'taskId': task_id,
+                'taskState': 'COMPLETE',
+                'result': {
+                    'successful': successful,
+                    'details': [] if successful else [{'localMessageText': 'Import failed'}]
+                }
+            }
+
+class AnaplanHandler(BaseHTTPRequestHandler):
+    """Routes requests to the authentication and model resources of the stand-in"""
+    
+    def do_GET(self):
+        self.handle_request('GET')
+    
+    def do_PUT(self):
+        self.handle_request('PUT')
+    
+    def do_POST(self):
+        self.handle_request('POST')
+    
+    def handle_request(self, method: str):
+        server = self.server
+        server.count('requests')
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        
+        if server.latency:
+            time.sleep(server.latency)
+        
+        path = unquote(urlsplit(self.path).path)
+        if path == '/token/authenticate' and method == 'POST':
+            self.authenticate()
+            return
+        
+        match = MODEL_ROUTE.match(path)
+        if not match:
+            self.send_json(404, {'status': 'NOT_FOUND'})
+            return
+        if not server.valid_token(self.headers.get('Authorization')):
+            self.send_json(401, {'status': 'UNAUTHORIZED'})
+            return
+        with server.lock:
+            failed = server.random.random() < server.error_rate
+        if failed:
+            server.count('errors')
+            self.send_json(503, {'status': 'SERVICE_UNAVAILABLE'}, {'Retry-After': '0'})
+            return
+        
+        self.route_model(method, match.group(3).split('/'), body)
+    
+    def authenticate(self):
+        server = self.server
+        expected = 'Basic ' + base64.b64encode(':'.join(server.credentials).encode()).decode()
+        if self.headers.get('Authorization') != expected:
+            self.send_json(401, {'status': 'FAILURE_BAD_CREDENTIAL'})
+            return
+        self.send_json(201, {'status': 'SUCCESS', 'tokenInfo': server.issue_token()})
+    
+    def route_model(self, method: str, route: list, body: bytes):
+        server = self.server
+        kind = route[0]
+        
+        if route == ['files'] and method == 'GET':
+            self.send_json(200, {'files': [{'id': i, 'name': n} for i, n in server.files.items()]})
+        elif route == ['processes'] and method == 'GET':
+            self.send_json(200, {'processes': [{'id': i, 'name': n} for i, n in server.processes.items()]})
+        elif kind == 'files' and len(route) > 1 and route[1] not in server.files:
+            self.send_json(404, {'status': 'FILE_NOT_FOUND'})
+        elif kind == 'files' and len(route) == 2 and method == 'PUT':
+            with server.lock:
+                server.pending[route[1]] = {}
+            self.send_json(200, {'file': json.loads(body or b'{}')})
+        elif kind == 'files' and len(route) == 4 and route[2] == 'chunks' and method == 'PUT':
+            with server.lock:
+                server.pending.setdefault(route[1], {})[int(route[3])] = body
+            server.count('chunks')
+            self.send_json(204, None)
+        elif kind == 'files' and route[2:] == ['complete'] and method == 'POST':
+            chunk_count = json.loads(body or b'{}').get('chunkCount', 0)
+            if server.complete_upload(route[1], chunk_count):
+                self.send_json(200, {'file': {'id': route[1], 'chunkCount': chunk_count}})
+            else:
+                self.send_json(400, {'status': 'CHUNKS_MISSING'})
+        elif kind == 'processes' and len(route) > 1 and route[1] not in server.processes:
+            self.send_json(404, {'status': 'PROCESS_NOT_FOUND'})
+        elif kind == 'processes' and route[2:] == ['tasks'] and method == 'POST':
+            task_id = uuid.uuid4().hex.upper()
+            with server.lock:
+                server.tasks[task_id] = {'process': server.processes[route[1]], 'polls': 0}
+            server.count('tasks')
+            self.send_json(200, {'task': {'taskId': task_id}})
+        elif kind == 'processes' and len(route) == 4 and route[2] == 'tasks' and method == 'GET':
+            task = server.poll_task(route[3])
+            if task is None:
+                self.send_json(404, {'status': 'TASK_NOT_FOUND'})
+            else:
+                self.send_json(200, {'task': task})
+        else:
+            self.send_json(404, {'status': 'NOT_FOUND'})
+    
+    def send_json(self, status: int, payload: Optional[Dict], headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Anaplan Integration API')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    serve = subparsers.add_parser('serve', help='Serve one model')
+    serve.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    serve.add_argument('--port', type=int, default=8766, help='Port to listen on')
+    serve.add_argument('--user', default='user', help='Accepted user name')
+    serve.add_argument('--password', default='password', help='Accepted password')
+    serve.add_argument('--file', action='append', default=[], help='Import data source name (repeatable)')
+    serve.add_argument('--process', action='append', default=[], help='Process name (repeatable)')
+    serve.add_argument('--latency', type=float, default=0.0, help='Response latency in seconds')
+    serve.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 503 responses')
+    serve.add_argument('--seed', type=int, help='Seed for error injection')
+    
+    args = parser.parse_args()
+    if args.command != 'serve':
+        parser.print_help()
+        return
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    server = AnaplanStandIn(
+        (args.host, args.port),
+        user=args.user,
+        password=args.password,
+        files=args.file,
+        processes=args.process,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    
+    print(f"Anaplan stand-in listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {server.stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Financial Modeling Prep API
+
+Serves the statement routes the fetcher uses from recorded fixtures or
+synthetic data, with injectable latency, errors and rate limiting, so the
+pipeline can be benchmarked and load-tested without network access or API
+quota. In record mode, requests without a fixture are forwarded to the real
+API and the responses are saved as fixtures for later replay.
+
+    python -m tools.fmp_standin serve --port 8765 --latency 0.05 --error-rate 0.02
+    python -m tools.fmp_standin serve --record --fixtures fixtures/fmp
+"""
+
+import argparse
+import gzip
+import hashlib
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Line items generated for each statement endpoint
+SYNTHETIC_LINE_ITEMS = {
+    'income-statement': [
+        'revenue', 'costOfRevenue', 'grossProfit', 'researchAndDevelopmentExpenses',
+        'operatingExpenses', 'operatingIncome', 'interestExpense', 'incomeBeforeTax',
+        'incomeTaxExpense', 'netIncome', 'eps', 'epsdiluted', 'weightedAverageShsOut'
+    ],
+    'cash-flow-statement': [
+        'netIncome', 'depreciationAndAmortization', 'stockBasedCompensation',
+        'changeInWorkingCapital', 'operatingCashFlow', 'capitalExpenditure',
+        'acquisitionsNet', 'investmentsInPropertyPlantAndEquipment', 'dividendsPaid',
+        'commonStockRepurchased', 'freeCashFlow'
+    ],
+    'balance-sheet-statement': [
+        'cashAndCashEquivalents', 'shortTermInvestments', 'netReceivables', 'inventory',
+        'totalCurrentAssets', 'propertyPlantEquipmentNet', 'goodwill', 'totalAssets',
+        'accountPayables', 'shortTermDebt', 'totalCurrentLiabilities', 'longTermDebt',
+        'totalLiabilities', 'totalStockholdersEquity', 'totalDebt', 'netDebt'
+    ]
+}
+
+# Bulk endpoints mapped to the per-ticker endpoint whose line items they carry
+BULK_STATEMENTS = {
+    'income-statement-bulk': 'income-statement',
+    'cash-flow-statement-bulk': 'cash-flow-statement',
+    'balance-sheet-statement-bulk': 'balance-sheet-statement'
+}
+
+# Query parameters that do not change the response
+IGNORED_PARAMS = {'apikey', 'datatype'}
+
+class FMPStandIn(ThreadingHTTPServer):
+    """HTTP server answering FMP statement requests from fixtures or synthetic data"""
+    
+    # Large enough backlog that concurrent connects are not dropped and retried
+    request_queue_size = 128
+    daemon_threads = True
+    
+    def __init__(self, address=('127.0.0.1', 0), latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: int = 1,
+                 fixtures_dir: Path = None, synthetic: bool = True, periods: int = 5,
+                 bulk_tickers: int = 100, record_from: str = None, api_key: str = None,
+                 seed: int = None):
+        """
+        Initialize the stand-in server
+        
+        Args:
+            address: (host, port) to listen on; port 0 picks a free port
+            latency: Seconds to wait before answering each request
+            jitter: Extra random latency of up to this many seconds
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            retry_after: Retry-After value sent with 429 responses
+            fixtures_dir: Directory of recorded responses
+            synthetic: Generate data for requests without a fixture (otherwise 404)
+            periods: Number of periods in synthetic statements
+            bulk_tickers: Number of tickers in synthetic bulk files
+            record_from: Base URL of the real API to record missing fixtures from
+            api_key: API key used when recording
+            seed: Seed for the error injection, for reproducible runs
+        """
+        super().__init__(address, StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.fixtures = FixtureStore(fixtures_dir) if fixtures_dir else None
+        self.synthetic = synthetic
+        self.periods = periods
+        self.bulk_tickers = bulk_tickers
+        self.recorder = (FixtureRecorder(self.fixtures, record_from, api_key)
+                         if record_from and self.fixtures else None)
+        
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'fixtures': 0,
+            'synthetic': 0,
+            'recorded': 0,
+            'not_modified': 0,
+            'errors': 0,
+            'rate_limited': 0
+        }
+    
+    @property
+    def base_url(self) -> str:
+        """Base URL to use as Config.FINANCIAL_MODELING_PREP_BASE_URL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v3"
+    
+    @property
+    def bulk_url(self) -> str:
+        """Base URL to use as Config.FINANCIAL_MODELING_PREP_BULK_URL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v4"
+    
+    def start(self) -> 'FMPStandIn':
+        """Serve requests on a background thread"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and close the socket"""
+        self.shutdown()
+        self.server_close()
+    
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+    
+    def draw(self) -> float:
+        with self.lock:
+            return self.random.random()
+    
+    def get_payload(self, route: List[str], params: Dict[str, str]) -> Optional[bytes]:
+        """
+        Get the body for a request from fixtures, the recorder or synthetic data
+        
+        Args:
+            route: Path segments after the API version (e.g. ['income-statement', 'AAPL'])
+            params: Query parameters
+        
+        Returns:
+            CSV body or None if there is nothing to serve
+        """
+        if self.fixtures:
+            body = self.fixtures.load(route, params)
+            if body is not None:
+                self.count('fixtures')
+                return body
+        
+        if self.recorder:
+            body = self.recorder.record(route, params)
+            if body is not None:
+                self.count('recorded')
+                return body
+        
+        if not self.synthetic:
+            return None
+        
+        if len(route) == 1 and route[0] in BULK_STATEMENTS:
+            body = synthetic_bulk(BULK_STATEMENTS[route[0]], params, self.bulk_tickers)
+        elif len(route) == 2 and route[0] in SYNTHETIC_LINE_ITEMS:
+            body = synthetic_statement(route[0], route[1], params, self.periods)
+        else:
+            return None
+        
+        self.count('synthetic')
+        return body
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Request handler for FMPStandIn"""
+    
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; avoid the delayed-ACK stall on kept-alive connections
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        server = self.server
+        server.count('requests')
+        
+        delay = server.latency + (server.jitter * server.draw() if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        
+        draw = server.draw()
+        if draw < server.rate_limit_rate:
+            server.count('rate_limited')
+            self.send_body(429, b'Limit Reach', {'Retry-After': str(server.retry_after)})
+            return
+        if draw < server.rate_limit_rate + server.error_rate:
+            server.count('errors')
+            self.send_body(500, b'Internal Server Error')
+            return
+        
+        url = urlsplit(self.path)
+        segments = [s for s in url.path.split('/') if s]
+        route = segments[2:] if segments[:1] == ['api'] else segments
+        params = dict(parse_qsl(url.query))
+        
+        body = server.get_payload(route, params)
+        if body is None:
+            self.send_body(404, b'Not Found')
+            return
+        
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            server.count('not_modified')
+            self.send_body(304, b'', {'ETag': etag})
+            return
+        
+        headers = {'Content-Type': 'text/csv', 'ETag': etag}
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        self.send_body(200, body, headers)
+    
+    def send_body(self, status: int, body: bytes, headers: Dict[str, str] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+class FixtureStore:
+    """Recorded responses stored as {fixtures_dir}/{route}/{name}.csv"""
+    
+    def __init__(self, fixtures_dir: Path):
+        self.fixtures_dir = Path(fixtures_dir)
+    
+    def path_for(self, route: List[str], params: Dict[str, str]) -> Path:
+        """
+        Get the fixture path of a request
+        
+        The last route segment (the ticker, or the bulk endpoint) names the
+        file; query parameters that change the response are appended to it.
+        
+        Args:
+            route: Path segments after the API version
+            params: Query parameters
+        
+        Returns:
+            Fixture file path
+        """
+        query = '_'.join(f"{k}-{v}" for k, v in sorted(params.items()) if k not in IGNORED_PARAMS)
+        name = route[-1] + (f"_{query}" if query else '')
+        return self.fixtures_dir.joinpath(*route[:-1], f"{name}.csv")
+    
+    def load(self, route: List[str], params: Dict[str, str]) -> Optional[bytes]:
+        """Load a recorded response, falling back to the fixture recorded without parameters"""
+        if not route or any(segment in ('.', '..') for segment in route):
+            return None
+        
+        for path in (self.path_for(route, params), self.path_for(route, {})):
+            if path.is_file():
+                return path.read_bytes()
+        return None
+    
+    def save(self, route: List[str], params: Dict[str, str], body: bytes) -> Path:
+        """Save a response as a fixture"""
+        path = self.path_for(route, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        return path
+
+class FixtureRecorder:
+    """Captures real API responses into a fixture store"""
+    
+    def __init__(self, fixtures: FixtureStore, base_url: str, api_key: str = None):
+        """
+        Initialize the recorder
+        
+        Args:
+            fixtures: Store the responses are saved to
+            base_url: Host of the real API (e.g. https://financialmodelingprep.com)
+            api_key: API key added to forwarded requests
+        """
+        self.fixtures = fixtures
+        parts = urlsplit(base_url)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.api_key = api_key
+        # The server handles requests on many threads and a Session is not thread-safe
+        self._local = threading.local()
+    
+    def _session(self) -> requests.Session:
+        """The calling thread's session, created on first use"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+    
+    def record(self, route: List[str], params: Dict[str, str]) -> Optional[bytes]:
+        """
+        Fetch a response from the real API and save it as a fixture
+        
+        Args:
+            route: Path segments after the API version
+            params: Query parameters of the original request
+        
+        Returns:
+            Response body or None if the real API did not answer successfully
+        """
+        version = 'v4' if route and route[0] in BULK_STATEMENTS else 'v3'
+        url = f"{self.origin}/api/{version}/" + '/'.join(route)
+        query = {**params, 'apikey': self.api_key} if self.api_key else dict(params)
+        
+        try:
+            response = self._session().get(url, params=query, timeout=(5, 60))
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Recording {url} failed: {e}")
+            return None
+        
+        if response.status_code != 200 or b'contact' in response.content[:4096].lower():
+            logger.error(f"Not recording {url}: HTTP {response.status_code}")
+            return None
+        
+        path = self.fixtures.save(route, params, response.content)
+        logger.info(f"Recorded {path}")
+        return response.content
+
+def synthetic_periods(params: Dict[str, str], count: int) -> List[str]:
+    """Period end dates, newest first, for the requested period type"""
+    limit = int(params['limit']) if params.get('limit', '').isdigit() else count
+    count = min(count, limit)
+    
+    if params.get('period') == 'quarter':
+        ends = ['12-31', '09-30', '06-30', '03-31']
+        return [f"{2024 - i // 4}-{ends[i % 4]}" for i in range(count)]
+    
+    return [f"{2024 - i}-12-31" for i in range(count)]
+
+def synthetic_values(ticker: str, statement_type: str, periods: List[str]) -> Dict[str, List[str]]:
+    """Deterministic line item values for a ticker, shrinking into the past"""
+    rng = random.Random(f"{ticker}/{statement_type}")
+    scale = rng.randint(1, 500) * 10 ** 8
+    values = {}
+    for item in SYNTHETIC_LINE_ITEMS[statement_type]:
+        base = scale * rng.uniform(0.01, 1.0)
+        values[item] = [str(int(base * (1 - 0.07 * i) * rng.uniform(0.95, 1.05)))
+                        for i in range(len(periods))]
+    return values
+
+def synthetic_statement(statement_type: str, ticker: str, params: Dict[str, str],
+                        periods: int) -> bytes:
+    """Per-ticker statement: one row per line item, one column per period"""
+    dates = synthetic_periods(params, periods)
+    lines = [
+        ','.join(['date'] + dates),
+        ','.join(['symbol'] + [ticker] * len(dates))
+    ]
+    for item, values in synthetic_values(ticker, statement_type, dates).items():
+        lines.append(','.join([item] + values))
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+def synthetic_bulk(statement_type: str, params: Dict[str, str], tickers: int) -> bytes:
+    """Bulk statement for one fiscal year: one row per ticker and period"""
+    year = params.get('year', '2024')
+    quarter = params.get('period') == 'quarter'
+    dates = [f"{year}-{end}" for end in ('12-31', '09-30', '06-30', '03-31')] if quarter else [f"{year}-12-31"]
+    items = SYNTHETIC_LINE_ITEMS[statement_type]
+    
+    lines = [','.join(['symbol', 'date'] + items)]
+    for i in range(tickers):
+        ticker = f"T{i:04d}"
+        values = synthetic_values(ticker, statement_type, dates)
+        for j, date in enumerate(dates):
+            lines.append(','.join([ticker, date] + [values[item][j] for item in items]))
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the FMP API')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    serve = subparsers.add_parser('serve', help='Serve fixtures and synthetic data')
+    serve.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    serve.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    serve.add_argument('--latency', type=float, default=0.0, help='Response latency in seconds')
+    serve.add_argument('--jitter', type=float, default=0.0, help='Extra random latency in seconds')
+    serve.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 responses')
+    serve.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of HTTP 429 responses')
+    serve.add_argument('--fixtures', type=Path, help='Directory of recorded responses')
+    serve.add_argument('--no-synthetic', action='store_true', help='Answer 404 when no fixture exists')
+    serve.add_argument('--periods', type=int, default=5, help='Periods in synthetic statements')
+    serve.add_argument('--record', action='store_true',
+                       help='Record missing fixtures from the real API (needs --fixtures and an API key)')
+    serve.add_argument('--seed', type=int, help='Seed for error injection')
+    
+    args = parser.parse_args()
+    if args.command != 'serve':
+        parser.print_help()
+        return
+    if args.record and not args.fixtures:
+        parser.error('--record needs --fixtures')
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    record_from = api_key = None
+    if args.record:
+        from config import Config
+        record_from = Config.FINANCIAL_MODELING_PREP_BASE_URL
+        api_key = Config.FINANCIAL_MODELING_PREP_API_KEY
+    
+    server = FMPStandIn(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        fixtures_dir=args.fixtures,
+        synthetic=not args.no_synthetic,
+        periods=args.periods,
+        record_from=record_from,
+        api_key=api_key,
+        seed=args.seed
+    )
+    
+    print(f"FMP stand-in listening on {server.base_url} (bulk: {server.bulk_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {server.stats}")
+
+if __name__ == "__main__":
+    main()